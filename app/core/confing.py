@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from dataclasses import dataclass
 from functools import lru_cache
@@ -26,9 +27,28 @@ def _parse_csv(value: Optional[str], default: Tuple[str, ...]) -> Tuple[str, ...
     return tuple(items) if items else default
 
 
+def _parse_int(name: str, default: int) -> int:
+    raw_value = os.getenv(name, str(default))
+    try:
+        return int(raw_value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {raw_value}.")
+
+
 @dataclass(frozen=True)
 class Settings:
     database_url: str
+    async_database_url: Optional[str]
+    sqlite_journal_mode: str
+    sqlite_synchronous: str
+    sqlite_cache_size: int
+    sqlite_mmap_size: int
+    sqlite_temp_store: str
+    sqlite_busy_timeout_ms: int
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_timeout: int
+    db_pool_recycle: int
     sql_echo: bool
     cors_allow_origins: Tuple[str, ...]
     cors_allow_credentials: bool
@@ -50,6 +70,54 @@ class Settings:
     smtp_username: Optional[str]
     smtp_password: Optional[str]
     smtp_starttls: bool
+    smtp_keepalive_seconds: int
+    email_outbox_enabled: bool
+    email_outbox_mode: str
+    email_outbox_batch_size: int
+    email_outbox_poll_interval_ms: int
+    email_outbox_max_attempts: int
+    email_outbox_backoff_seconds: int
+    password_hash_executor: str
+    password_hash_workers: int
+    password_hash_max_pending: int
+    audit_sink_enabled: bool
+    audit_batch_size: int
+    audit_flush_interval_ms: int
+    audit_max_buffer: int
+    audit_overflow_policy: str
+    export_spool_max_bytes: int
+    export_spool_dir: str
+    export_job_workers: int
+    export_artifact_ttl_seconds: int
+    templates_auto_reload: bool
+    templates_precompile: bool
+    template_bytecode_cache_dir: str
+    principal_cache_ttl_seconds: int
+    principal_cache_max_entries: int
+    admin_interface_password: str
+    admin_lockout_minutes: int
+    admin_max_sessions: int
+    dashboard_stats_ttl_seconds: int
+    student_import_batch_size: int
+    student_import_hash_workers: int
+    student_import_max_rows: int
+    registration_uniqueness_mode: str
+    bcrypt_rounds: int
+    bcrypt_rounds_by_role: Tuple[str, ...]
+    bcrypt_calibrate_target_ms: int
+    bcrypt_calibrate_min_rounds: int
+    bcrypt_calibrate_max_rounds: int
+    state_store_backend: str
+    state_store_path: str
+    state_store_max_entries: int
+    national_code_checksum: bool
+    rate_limit_enabled: bool
+    rate_limit_backend: str
+    rate_limit_store_path: str
+    rate_limit_login: str
+    rate_limit_register: str
+    rate_limit_public_forms: str
+    rate_limit_trusted_proxies: Tuple[str, ...]
 
 
 
@@ -67,6 +135,17 @@ def get_settings() -> Settings:
 
     return Settings(
         database_url=os.getenv("DATABASE_URL", "sqlite:///./basij.db"),
+        async_database_url=os.getenv("ASYNC_DATABASE_URL"),
+        sqlite_journal_mode=os.getenv("SQLITE_JOURNAL_MODE", "WAL").strip().upper(),
+        sqlite_synchronous=os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper(),
+        sqlite_cache_size=_parse_int("SQLITE_CACHE_SIZE", -64000),
+        sqlite_mmap_size=_parse_int("SQLITE_MMAP_SIZE", 268435456),
+        sqlite_temp_store=os.getenv("SQLITE_TEMP_STORE", "MEMORY").strip().upper(),
+        sqlite_busy_timeout_ms=_parse_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+        db_pool_size=_parse_int("DB_POOL_SIZE", 5),
+        db_max_overflow=_parse_int("DB_MAX_OVERFLOW", 10),
+        db_pool_timeout=_parse_int("DB_POOL_TIMEOUT", 30),
+        db_pool_recycle=_parse_int("DB_POOL_RECYCLE", 1800),
         sql_echo=_parse_bool(os.getenv("SQL_ECHO"), False),
         cors_allow_origins=_parse_csv(os.getenv("CORS_ALLOW_ORIGINS"), ("http://kerman_bd", "http://127.0.0.1", "http://localhost")),
         cors_allow_credentials=_parse_bool(os.getenv("CORS_ALLOW_CREDENTIALS"), True),
@@ -88,6 +167,62 @@ def get_settings() -> Settings:
         smtp_username=os.getenv("SMTP_USERNAME"),
         smtp_password=os.getenv("SMTP_PASSWORD"),
         smtp_starttls=_parse_bool(os.getenv("SMTP_STARTTLS"), True),
+        smtp_keepalive_seconds=_parse_int("SMTP_KEEPALIVE_SECONDS", 60),
+        email_outbox_enabled=_parse_bool(os.getenv("EMAIL_OUTBOX_ENABLED"), True),
+        email_outbox_mode=os.getenv("EMAIL_OUTBOX_MODE", "thread").strip().lower(),
+        email_outbox_batch_size=_parse_int("EMAIL_OUTBOX_BATCH_SIZE", 20),
+        email_outbox_poll_interval_ms=_parse_int("EMAIL_OUTBOX_POLL_INTERVAL_MS", 5000),
+        email_outbox_max_attempts=_parse_int("EMAIL_OUTBOX_MAX_ATTEMPTS", 5),
+        email_outbox_backoff_seconds=_parse_int("EMAIL_OUTBOX_BACKOFF_SECONDS", 30),
+        password_hash_executor=os.getenv("PASSWORD_HASH_EXECUTOR", "thread").strip().lower(),
+        password_hash_workers=_parse_int("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)),
+        password_hash_max_pending=_parse_int("PASSWORD_HASH_MAX_PENDING", 256),
+        audit_sink_enabled=_parse_bool(os.getenv("AUDIT_SINK_ENABLED"), True),
+        audit_batch_size=_parse_int("AUDIT_BATCH_SIZE", 100),
+        audit_flush_interval_ms=_parse_int("AUDIT_FLUSH_INTERVAL_MS", 500),
+        audit_max_buffer=_parse_int("AUDIT_MAX_BUFFER", 10000),
+        audit_overflow_policy=os.getenv("AUDIT_OVERFLOW_POLICY", "drop_oldest").strip().lower(),
+        export_spool_max_bytes=_parse_int("EXPORT_SPOOL_MAX_BYTES", 8 * 1024 * 1024),
+        export_spool_dir=os.getenv("EXPORT_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "basij-exports")),
+        export_job_workers=_parse_int("EXPORT_JOB_WORKERS", 2),
+        export_artifact_ttl_seconds=_parse_int("EXPORT_ARTIFACT_TTL_SECONDS", 600),
+        templates_auto_reload=_parse_bool(os.getenv("TEMPLATES_AUTO_RELOAD"), False),
+        templates_precompile=_parse_bool(os.getenv("TEMPLATES_PRECOMPILE"), True),
+        template_bytecode_cache_dir=os.getenv(
+            "TEMPLATE_BYTECODE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "basij-jinja-cache")
+        ).strip(),
+        principal_cache_ttl_seconds=_parse_int("PRINCIPAL_CACHE_TTL_SECONDS", 60),
+        principal_cache_max_entries=_parse_int("PRINCIPAL_CACHE_MAX_ENTRIES", 2048),
+        admin_interface_password=os.getenv("ADMIN_INTERFACE_PASSWORD", admin_login_password),
+        admin_lockout_minutes=_parse_int("ADMIN_LOCKOUT_MINUTES", 15),
+        admin_max_sessions=_parse_int("ADMIN_MAX_SESSIONS", 1000),
+        dashboard_stats_ttl_seconds=_parse_int("DASHBOARD_STATS_TTL_SECONDS", 5),
+        student_import_batch_size=_parse_int("STUDENT_IMPORT_BATCH_SIZE", 500),
+        # 0 means one bcrypt worker process per CPU.
+        student_import_hash_workers=_parse_int("STUDENT_IMPORT_HASH_WORKERS", 0),
+        student_import_max_rows=_parse_int("STUDENT_IMPORT_MAX_ROWS", 20000),
+        registration_uniqueness_mode=os.getenv("REGISTRATION_UNIQUENESS_MODE", "probe").strip().lower(),
+        bcrypt_rounds=_parse_int("BCRYPT_ROUNDS", 12),
+        bcrypt_rounds_by_role=_parse_csv(os.getenv("BCRYPT_ROUNDS_BY_ROLE"), ()),
+        # 0 keeps BCRYPT_ROUNDS; otherwise the default cost is measured at startup to hit this verify time.
+        bcrypt_calibrate_target_ms=_parse_int("BCRYPT_CALIBRATE_TARGET_MS", 0),
+        bcrypt_calibrate_min_rounds=_parse_int("BCRYPT_CALIBRATE_MIN_ROUNDS", 10),
+        bcrypt_calibrate_max_rounds=_parse_int("BCRYPT_CALIBRATE_MAX_ROUNDS", 14),
+        state_store_backend=os.getenv("STATE_STORE_BACKEND", "memory").strip().lower(),
+        state_store_path=os.getenv(
+            "STATE_STORE_PATH", os.path.join(tempfile.gettempdir(), "basij-state.sqlite3")
+        ),
+        state_store_max_entries=_parse_int("STATE_STORE_MAX_ENTRIES", 10000),
+        national_code_checksum=_parse_bool(os.getenv("NATIONAL_CODE_CHECKSUM"), False),
+        rate_limit_enabled=_parse_bool(os.getenv("RATE_LIMIT_ENABLED"), True),
+        rate_limit_backend=os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower(),
+        rate_limit_store_path=os.getenv(
+            "RATE_LIMIT_STORE_PATH", os.path.join(tempfile.gettempdir(), "basij-rate-limit.sqlite3")
+        ),
+        rate_limit_login=os.getenv("RATE_LIMIT_LOGIN", "20/60"),
+        rate_limit_register=os.getenv("RATE_LIMIT_REGISTER", "10/60"),
+        rate_limit_public_forms=os.getenv("RATE_LIMIT_PUBLIC_FORMS", "30/60"),
+        rate_limit_trusted_proxies=_parse_csv(os.getenv("RATE_LIMIT_TRUSTED_PROXIES"), ()),
     )
 
 
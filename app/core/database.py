@@ -1,20 +1,106 @@
 # app/core/database.py
 import logging
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.confing import settings
 Base = declarative_base()
 _RUNTIME_SCHEMA_VERIFIED = False
 
 DATABASE_URL = settings.database_url
 
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_database_url(database_url: str) -> str:
+    """Map a sync SQLAlchemy URL onto its async driver (aiosqlite / asyncpg)."""
+    scheme, separator, rest = database_url.partition("://")
+    if not separator:
+        return database_url
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+ASYNC_DATABASE_URL = settings.async_database_url or to_async_database_url(DATABASE_URL)
+
+
+_SQLITE_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+
+def is_sqlite_url(database_url: str) -> bool:
+    return database_url.startswith("sqlite")
+
+
+def _is_sqlite_memory_url(database_url: str) -> bool:
+    return is_sqlite_url(database_url) and (":memory:" in database_url or database_url.rstrip("/").endswith(":"))
+
+
+def sqlite_pragmas() -> dict[str, str | int]:
+    """Per-connection PRAGMAs for the configured SQLite performance profile."""
+    pragmas: dict[str, str | int] = {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "cache_size": settings.sqlite_cache_size,
+        "mmap_size": settings.sqlite_mmap_size,
+        "temp_store": settings.sqlite_temp_store,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+    }
+    for name, allowed in _SQLITE_PRAGMA_CHOICES.items():
+        if pragmas[name] not in allowed:
+            raise ValueError(f"Unsupported SQLite {name}: {pragmas[name]}")
+    return pragmas
+
+
+def configure_sqlite_engine(target_engine) -> None:
+    """Apply the SQLite PRAGMA profile to every new DBAPI connection of an engine."""
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(target_engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def engine_options(database_url: str) -> dict:
+    options: dict = {"echo": settings.sql_echo}
+    if is_sqlite_url(database_url):
+        options["connect_args"] = {"check_same_thread": False}
+    if not _is_sqlite_memory_url(database_url):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=not is_sqlite_url(database_url),
+        )
+    return options
+
+
+def async_engine_options(async_database_url: str) -> dict:
+    options = engine_options(async_database_url)
+    if is_sqlite_url(async_database_url) and "pool_size" in options:
+        # aiosqlite defaults to NullPool for file databases, which rejects the pool sizing.
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=settings.sql_echo,
-)
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+if is_sqlite_url(DATABASE_URL):
+    configure_sqlite_engine(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -22,12 +108,46 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker | None = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Build the async engine on first use so the driver stays an optional import."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, **async_engine_options(ASYNC_DATABASE_URL))
+        if is_sqlite_url(ASYNC_DATABASE_URL):
+            configure_sqlite_engine(_async_engine.sync_engine)
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_factory
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
 
 def load_models():
     """Import ORM models so SQLAlchemy can register metadata before create_all."""
     import app.models.audit_log  # noqa: F401
+    import app.models.email_outbox  # noqa: F401
     import app.models.noor_program  # noqa: F401
     import app.models.role  # noqa: F401
+    import app.models.stat_counter  # noqa: F401
     import app.models.student_profile  # noqa: F401
     import app.models.user  # noqa: F401
 
@@ -173,11 +293,36 @@ def ensure_noor_program_schema():
 
 
 
+def ensure_audit_log_indexes(target_engine=None):
+    """Add the audit_logs filter/sort indexes to databases created before they existed."""
+    target_engine = target_engine or engine
+    load_models()
+    audit_logs = Base.metadata.tables["audit_logs"]
+    if "audit_logs" not in inspect(target_engine).get_table_names():
+        return
+
+    with target_engine.begin() as connection:
+        for index in audit_logs.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+
+def ensure_stat_counters(target_engine=None):
+    """Seed ``stat_counters`` from the source tables when it is empty (new table or fresh database)."""
+    from app.services.stat_counters import ensure_stat_counters as seed_stat_counters
+
+    target_engine = target_engine or engine
+    load_models()
+    with Session(bind=target_engine) as db:
+        seed_stat_counters(db)
+
+
 def create_database():
     load_models()
     Base.metadata.create_all(bind=engine)
     ensure_student_profiles_schema()
     ensure_noor_program_schema()
+    ensure_audit_log_indexes()
+    ensure_stat_counters()
     logging.getLogger(__name__).info("✅ دیتابیس در %s ایجاد شد", DATABASE_URL)
 
 def ensure_runtime_schema():
@@ -190,6 +335,8 @@ def ensure_runtime_schema():
     Base.metadata.create_all(bind=engine)
     ensure_student_profiles_schema()
     ensure_noor_program_schema()
+    ensure_audit_log_indexes()
+    ensure_stat_counters()
     _RUNTIME_SCHEMA_VERIFIED = True
 
 
@@ -206,4 +353,21 @@ def show_tables():
         for column in columns:
             print(f"    ├─ {column['name']}: {column['type']}")
 
-    return tables
\ No newline at end of file
+    return tables
+
+
+def describe_database() -> dict:
+    """Report the active engine, pool and (for SQLite) PRAGMA values for ops checks."""
+    info: dict = {
+        "database_url": engine.url.render_as_string(hide_password=True),
+        "dialect": engine.dialect.name,
+        "pool_class": type(engine.pool).__name__,
+        "pool_status": engine.pool.status(),
+    }
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            info["pragmas"] = {
+                name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in sqlite_pragmas()
+            }
+    return info
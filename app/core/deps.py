@@ -1,7 +1,8 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal, ensure_runtime_schema
+from app.core.database import SessionLocal, ensure_runtime_schema, get_async_session_factory
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -18,6 +19,16 @@ def DBDep() -> Session:
     return Depends(get_db)
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    ensure_runtime_schema()
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+def AsyncDBDep() -> AsyncSession:
+    return Depends(get_async_db)
+
+
 def CurrentUser():
     from app.core.security import get_current_user
     return Depends(get_current_user)
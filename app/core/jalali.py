@@ -0,0 +1,143 @@
+"""Gregorian -> Jalali conversion for templates and reports.
+
+The calendar is the 33-year arithmetic cycle the dashboard has always used:
+eight four-year groups whose first year is leap, then one common year. Jalali
+year starts are precomputed as day numbers, so a date converts with one
+``toordinal()`` and a bisect; dates outside the table fall back to the cycle
+arithmetic.
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+JalaliDate = Tuple[int, int, int]
+
+# Day 0 is 1 Farvardin 979 (1600-03-21).
+_EPOCH_ORDINAL = date(1600, 1, 1).toordinal() + 79
+_EPOCH_YEAR = 979
+_CYCLE_DAYS = 12053
+_FIRST_HALF_DAYS = 186  # months 1-6 have 31 days; months 7-12 have 30 (29 in Esfand of a common year)
+
+# Jalali years whose start day numbers are tabulated; covers Gregorian 1891-2111.
+TABLE_FIRST_YEAR = 1270
+TABLE_LAST_YEAR = 1490
+
+
+def _year_length(jalali_year: int) -> int:
+    position = (jalali_year - _EPOCH_YEAR) % 33
+    return 366 if position != 32 and position % 4 == 0 else 365
+
+
+def _build_year_starts() -> List[int]:
+    start = sum(_year_length(year) for year in range(_EPOCH_YEAR, TABLE_FIRST_YEAR))
+    starts = []
+    for year in range(TABLE_FIRST_YEAR, TABLE_LAST_YEAR + 2):
+        starts.append(start)
+        start += _year_length(year)
+    return starts
+
+
+_YEAR_STARTS = _build_year_starts()
+
+
+def _split_day_of_year(day_of_year: int) -> Tuple[int, int]:
+    if day_of_year < _FIRST_HALF_DAYS:
+        return day_of_year // 31 + 1, day_of_year % 31 + 1
+    day_of_year -= _FIRST_HALF_DAYS
+    return day_of_year // 30 + 7, day_of_year % 30 + 1
+
+
+def _from_cycle_arithmetic(day_number: int) -> Tuple[int, int]:
+    """``(jalali_year, day_of_year)`` for any day number, without the table."""
+    cycles, day_number = divmod(day_number, _CYCLE_DAYS)
+    groups, day_number = divmod(day_number, 1461)
+    year = _EPOCH_YEAR + 33 * cycles + 4 * groups
+    if day_number >= 366:
+        year += (day_number - 1) // 365
+        day_number = (day_number - 1) % 365
+    return year, day_number
+
+
+def _from_day_number(day_number: int) -> JalaliDate:
+    if _YEAR_STARTS[0] <= day_number < _YEAR_STARTS[-1]:
+        index = bisect_right(_YEAR_STARTS, day_number) - 1
+        year, day_of_year = TABLE_FIRST_YEAR + index, day_number - _YEAR_STARTS[index]
+    else:
+        year, day_of_year = _from_cycle_arithmetic(day_number)
+    month, day = _split_day_of_year(day_of_year)
+    return year, month, day
+
+
+@lru_cache(maxsize=4096)
+def _from_ordinal(ordinal: int) -> JalaliDate:
+    return _from_day_number(ordinal - _EPOCH_ORDINAL)
+
+
+def to_jalali(value: date) -> JalaliDate:
+    """``(year, month, day)`` of a ``date`` or ``datetime``; the time of day is ignored."""
+    return _from_ordinal(value.toordinal())
+
+
+def gregorian_to_jalali(gy: int, gm: int, gd: int) -> JalaliDate:
+    return to_jalali(date(gy, gm, gd))
+
+
+def to_jalali_many(values: Iterable[Optional[date]]) -> List[Optional[JalaliDate]]:
+    """Convert a whole column at once; each distinct day is computed once, ``None`` stays ``None``."""
+    converted = {}
+    results: List[Optional[JalaliDate]] = []
+    for value in values:
+        if value is None:
+            results.append(None)
+            continue
+        ordinal = value.toordinal()
+        jalali = converted.get(ordinal)
+        if jalali is None:
+            jalali = converted[ordinal] = _from_ordinal(ordinal)
+        results.append(jalali)
+    return results
+
+
+@lru_cache(maxsize=4096)
+def _date_part(ordinal: int) -> str:
+    return "%04d-%02d-%02d" % _from_ordinal(ordinal)
+
+
+def _with_time(value: date, date_part: str, include_time: bool) -> str:
+    if include_time and isinstance(value, datetime):
+        return f"{date_part} {value.strftime('%H:%M:%S')}"
+    return date_part
+
+
+def format_jalali(value: Optional[date], include_time: bool = False, default: str = "") -> str:
+    """``1403-01-01`` (or ``1403-01-01 08:30:00`` with ``include_time``); ``default`` for empty values."""
+    if not value:
+        return default
+    return _with_time(value, _date_part(value.toordinal()), include_time)
+
+
+def format_jalali_many(
+    values: Iterable[Optional[date]],
+    include_time: bool = False,
+    default: str = "",
+) -> List[str]:
+    """:func:`format_jalali` over a whole column, formatting each distinct day once."""
+    formatted = {}
+    results = []
+    for value in values:
+        if not value:
+            results.append(default)
+            continue
+        ordinal = value.toordinal()
+        date_part = formatted.get(ordinal)
+        if date_part is None:
+            date_part = formatted[ordinal] = _date_part(ordinal)
+        results.append(_with_time(value, date_part, include_time) if include_time else date_part)
+    return results
+
+
+def jalali_filter(value: Optional[date], include_time: bool = False, default: str = "-") -> str:
+    """Jinja2 ``jalali`` filter: ``{{ user.created_at | jalali }}`` / ``{{ value | jalali(True) }}``."""
+    return format_jalali(value, include_time, default)
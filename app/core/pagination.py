@@ -0,0 +1,135 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+T = TypeVar("T")
+
+CURSOR_VERSION = 1
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination token is malformed or belongs to another listing."""
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total: Optional[int] = None
+    limit: int = 0
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(scope: str, direction: str, keys: Sequence[Any], total: Optional[int] = None) -> str:
+    """Pack the boundary row's sort keys into an opaque, URL-safe token.
+
+    ``total`` is carried along so later pages can show the count computed on page one.
+    """
+    payload = {
+        "v": CURSOR_VERSION,
+        "s": scope,
+        "d": direction,
+        "k": [_encode_value(value) for value in keys],
+        "t": total,
+    }
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, scope: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        keys = [_decode_value(value) for value in payload["k"]]
+        direction = payload["d"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursorError("Malformed pagination cursor") from exc
+
+    if payload.get("v") != CURSOR_VERSION or payload.get("s") != scope or direction not in {"next", "prev"}:
+        raise InvalidCursorError("Pagination cursor does not match this listing")
+    return {"keys": keys, "direction": direction, "total": payload.get("t")}
+
+
+def keyset_paginate(
+        query: Query,
+        order_columns: Sequence[Any],
+        *,
+        scope: str,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        descending: bool = False,
+        include_total: bool = False,
+) -> KeysetPage:
+    """Page ``query`` by a unique tuple of columns instead of OFFSET.
+
+    Every page is a single indexed range scan of ``limit + 1`` rows, so deep
+    pages cost the same as the first one. The total is only counted on the
+    first page when ``include_total`` is set and is then carried in the cursor.
+    """
+    if limit < 1:
+        raise ValueError("limit must be positive")
+
+    state = decode_cursor(cursor, scope) if cursor else None
+    total = state["total"] if state else None
+    if state is None and include_total:
+        total = query.order_by(None).count()
+
+    backwards = state is not None and state["direction"] == "prev"
+    # "next" continues in display order; "prev" walks the other way and is flipped back below.
+    scan_descending = descending != backwards
+
+    if state is not None:
+        row_key = tuple_(*order_columns)
+        boundary = tuple_(*state["keys"])
+        query = query.filter(row_key < boundary if scan_descending else row_key > boundary)
+
+    ordering = [column.desc() if scan_descending else column.asc() for column in order_columns]
+    rows = query.order_by(None).order_by(*ordering).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    def keys_of(row) -> List[Any]:
+        return [getattr(row, column.key) for column in order_columns]
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more or backwards:
+            next_cursor = encode_cursor(scope, "next", keys_of(rows[-1]), total)
+        if state is not None and (has_more or not backwards):
+            prev_cursor = encode_cursor(scope, "prev", keys_of(rows[0]), total)
+
+    return KeysetPage(
+        items=rows,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        total=total,
+        limit=limit,
+    )
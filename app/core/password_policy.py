@@ -0,0 +1,94 @@
+import logging
+import re
+import time
+from typing import Callable, Dict, Mapping, Optional
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
+_BCRYPT_COST = re.compile(r"^\$2[aby]\$(\d{2})\$")
+CALIBRATION_PASSWORD = b"calibration-password"
+CALIBRATION_NAMESPACE = "bcrypt_calibration"
+CALIBRATION_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+def bcrypt_rounds(hashed_password: str) -> Optional[int]:
+    """The cost factor encoded in a bcrypt hash, or None if it is not one."""
+    match = _BCRYPT_COST.match(hashed_password or "")
+    return int(match.group(1)) if match else None
+
+
+def _clamp(rounds: int) -> int:
+    return max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, int(rounds)))
+
+
+def measure_bcrypt_ms(rounds: int, timer: Callable[[], float] = time.perf_counter) -> float:
+    started = timer()
+    hashed = bcrypt.hashpw(CALIBRATION_PASSWORD, bcrypt.gensalt(rounds))
+    bcrypt.checkpw(CALIBRATION_PASSWORD, hashed)
+    return (timer() - started) * 1000 / 2
+
+
+def calibrate_rounds(
+    target_ms: float,
+    *,
+    floor: int,
+    ceiling: int,
+    measure: Callable[[int], float] = measure_bcrypt_ms,
+) -> int:
+    """Highest cost in ``[floor, ceiling]`` whose verify time stays within ``target_ms``.
+
+    Only ``floor`` is measured; every extra round doubles bcrypt's work, so the
+    other costs are extrapolated instead of being timed one by one.
+    """
+    floor, ceiling = _clamp(floor), _clamp(max(floor, ceiling))
+    elapsed = max(measure(floor), 0.001)
+    rounds = floor
+    while rounds < ceiling and elapsed * 2 <= target_ms:
+        rounds += 1
+        elapsed *= 2
+    return rounds
+
+
+class PasswordPolicy:
+    """bcrypt cost per role, with a default for roles that have no override."""
+
+    def __init__(self, default_rounds: int = 12, role_rounds: Optional[Mapping[str, int]] = None):
+        self.default_rounds = _clamp(default_rounds)
+        self.role_rounds: Dict[str, int] = {role: _clamp(rounds) for role, rounds in (role_rounds or {}).items()}
+
+    def rounds_for(self, role: Optional[str] = None) -> int:
+        return self.role_rounds.get(role, self.default_rounds) if role else self.default_rounds
+
+    def needs_rehash(self, hashed_password: str, role: Optional[str] = None) -> bool:
+        rounds = bcrypt_rounds(hashed_password)
+        return rounds is not None and rounds != self.rounds_for(role)
+
+    def calibrate(self, target_ms: float, *, floor: int, ceiling: int, store=None, **kwargs) -> int:
+        """Replace the default cost with a measured one; explicit per-role costs are left alone.
+
+        With a shared ``store`` the first worker's result is kept and every other
+        worker adopts it; workers that each picked a cost near a boundary would
+        otherwise rehash the same accounts back and forth.
+        """
+        rounds = calibrate_rounds(target_ms, floor=floor, ceiling=ceiling, **kwargs)
+        if store is not None:
+            key = f"{target_ms}:{floor}:{ceiling}"
+            rounds = int(store.get_or_set(CALIBRATION_NAMESPACE, key, rounds, CALIBRATION_TTL_SECONDS))
+        self.default_rounds = rounds
+        logger.info("bcrypt calibrated to %s rounds for a %sms verify target", self.default_rounds, target_ms)
+        return self.default_rounds
+
+
+def parse_role_rounds(entries) -> Dict[str, int]:
+    """``("admin:13", "user:11")`` -> ``{"admin": 13, "user": 11}``."""
+    role_rounds = {}
+    for entry in entries:
+        role, separator, rounds = entry.partition(":")
+        if not separator or not rounds.strip().isdigit():
+            raise ValueError(f"BCRYPT_ROUNDS_BY_ROLE entries must look like role:rounds, got {entry}.")
+        role_rounds[role.strip()] = int(rounds)
+    return role_rounds
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """Raised when the hashing backlog is already at its configured limit."""
+
+
+def bcrypt_hash(password: bytes, rounds: int = 12) -> str:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def bcrypt_check(password: bytes, hashed_password: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed_password)
+
+
+class PasswordHashingPool:
+    """Runs bcrypt work on a bounded executor so it never blocks the event loop."""
+
+    def __init__(self, executor_kind: str = "thread", max_workers: int = 4, max_pending: int = 0):
+        if executor_kind not in {"thread", "process"}:
+            raise ValueError(f"Unsupported password hash executor: {executor_kind}")
+        self.executor_kind = executor_kind
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self._executor: Optional[Executor] = None
+        self._lock = Lock()
+        self._in_flight = 0
+        self._peak_queue_depth = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.executor_kind == "process":
+                    # Spawn, not fork: the server already runs threads whose locks a forked child would inherit.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="bcrypt",
+                    )
+            return self._executor
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.max_pending and self._in_flight >= self.max_pending:
+                self._rejected += 1
+                raise PasswordHashingBusyError("Password hashing backlog is full.")
+            self._in_flight += 1
+            queue_depth = max(0, self._in_flight - self.max_workers)
+            self._peak_queue_depth = max(self._peak_queue_depth, queue_depth)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executor": self.executor_kind,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.max_workers),
+                "peak_queue_depth": self._peak_queue_depth,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+            logger.info("Password hashing pool shut down (%s).", self.executor_kind)
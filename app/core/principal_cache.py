@@ -0,0 +1,143 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.confing import settings
+from app.models.user import User
+
+
+class PrincipalCache:
+    """TTL + LRU cache of authenticated users keyed by the token ``sub``.
+
+    Each key carries a version that :meth:`invalidate` bumps. A loader reads the
+    version before querying and hands it back to :meth:`put`, so a row loaded
+    while an update was committing is never cached over the newer state.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60,
+        max_entries: int = 2048,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[Any, int, float]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def version(self, key: str) -> int:
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, version, expires_at = entry
+                if expires_at > self._clock() and version == self._versions.get(key, 0):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def put(self, key: str, value: Any, version: int) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            if version != self._versions.get(key, 0):
+                return False
+            self._entries[key] = (value, version, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, *keys: Optional[str]) -> None:
+        with self._lock:
+            for key in keys:
+                if not key:
+                    continue
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+            }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    max_entries=settings.principal_cache_max_entries,
+)
+
+
+def _principal_statement(student_number: str):
+    return (
+        select(User)
+        .options(joinedload(User.role), joinedload(User.profile))
+        .where(User.student_number == student_number)
+    )
+
+
+def _detach(db, user: User) -> None:
+    # Cached users are shared across requests, so they must not stay bound to this session.
+    for instance in (user.profile, user.role, user):
+        if instance is not None and instance in db:
+            db.expunge(instance)
+
+
+def load_principal(db: Session, student_number: str) -> Optional[User]:
+    """Return the user for a token ``sub`` with role and profile loaded, from cache when fresh."""
+    cached = principal_cache.get(student_number)
+    if cached is not None:
+        return cached
+
+    version = principal_cache.version(student_number)
+    user = db.execute(_principal_statement(student_number)).scalars().first()
+    if user is not None and principal_cache.enabled:
+        _detach(db, user)
+        principal_cache.put(student_number, user, version)
+    return user
+
+
+async def load_principal_async(db: AsyncSession, student_number: str) -> Optional[User]:
+    cached = principal_cache.get(student_number)
+    if cached is not None:
+        return cached
+
+    version = principal_cache.version(student_number)
+    result = await db.execute(_principal_statement(student_number))
+    user = result.scalars().first()
+    if user is not None and principal_cache.enabled:
+        _detach(db, user)
+        principal_cache.put(student_number, user, version)
+    return user
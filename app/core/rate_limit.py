@@ -0,0 +1,201 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from ipaddress import ip_address, ip_network
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from app.core.confing import settings
+from app.core.state_store import StateStore, create_state_store
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_PREFIX = "rate_limit:"
+
+
+def parse_rate(value: str) -> Tuple[int, float]:
+    """``"20/60"`` -> ``(20, 60.0)``: a burst of 20 requests, refilled over 60 seconds."""
+    capacity, separator, period = value.partition("/")
+    try:
+        parsed = int(capacity), float(period)
+    except ValueError:
+        parsed = (0, 0.0)
+    if not separator or parsed[0] <= 0 or parsed[1] <= 0:
+        raise ValueError(f"Rate limits must look like requests/seconds, got {value}.")
+    return parsed
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """A token bucket shared by every route in the group.
+
+    ``paths`` match exactly; ``prefixes`` match any path below them. Only
+    ``methods`` are throttled, so page loads stay free.
+    """
+
+    name: str
+    capacity: int
+    period_seconds: float
+    paths: Tuple[str, ...] = ()
+    prefixes: Tuple[str, ...] = ()
+    methods: Tuple[str, ...] = ("POST",)
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period_seconds
+
+    def matches(self, method: str, path: str) -> bool:
+        if method not in self.methods:
+            return False
+        path = path.rstrip("/") or "/"
+        return path in self.paths or any(path.startswith(prefix) for prefix in self.prefixes)
+
+
+class TrustedProxies:
+    """Peers whose ``X-Forwarded-For`` is believed; entries are IPs, CIDRs or host names."""
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self.networks = []
+        self.names = set()
+        for entry in entries:
+            try:
+                self.networks.append(ip_network(entry, strict=False))
+            except ValueError:
+                self.names.add(entry)
+
+    def __contains__(self, host: Optional[str]) -> bool:
+        if not host:
+            return False
+        if host in self.names:
+            return True
+        try:
+            address = ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.networks)
+
+    def client_for(self, forwarded_for: Optional[str], peer: Optional[str]) -> str:
+        """The address a bucket is keyed on.
+
+        Anything the client sends in ``X-Forwarded-For`` is ignored unless the
+        direct peer is a trusted proxy. Behind one, the right-most hop that is
+        not itself a trusted proxy is the client; hops to its left are whatever
+        the client chose to send.
+        """
+        if peer not in self or not forwarded_for:
+            return peer or "unknown"
+        for hop in reversed([item.strip() for item in forwarded_for.split(",")]):
+            if hop in self:
+                continue
+            try:
+                return str(ip_address(hop))
+            except ValueError:
+                break
+        return peer
+
+
+class TokenBucketLimiter:
+    """Token buckets per (rule, client) kept in a :class:`StateStore`.
+
+    Each take is one atomic ``update`` on the store, so with the SQLite backend
+    every worker draws from the same buckets. A bucket left alone for a full
+    ``period_seconds`` is full again, so that is also its TTL.
+    """
+
+    def __init__(
+        self,
+        store: StateStore,
+        rules: Sequence[RateLimitRule],
+        clock: Callable[[], float] = time.time,
+        trusted_proxies: Iterable[str] = (),
+    ):
+        self.store = store
+        self.rules = tuple(rules)
+        self.trusted_proxies = TrustedProxies(trusted_proxies)
+        self._clock = clock
+        self._lock = Lock()
+        self._allowed: Dict[str, int] = {rule.name: 0 for rule in self.rules}
+        self._rejected: Dict[str, int] = {rule.name: 0 for rule in self.rules}
+
+    def rule_for(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    def take(self, rule: RateLimitRule, client: str) -> Tuple[bool, int]:
+        """Spend one token; returns ``(allowed, retry_after_seconds)``."""
+        now = self._clock()
+        outcome = {}
+
+        def refill_and_take(bucket: Optional[Any]) -> Any:
+            tokens, updated_at = bucket if bucket else (rule.capacity, now)
+            tokens = min(rule.capacity, tokens + max(0.0, now - updated_at) * rule.refill_per_second)
+            outcome["allowed"] = tokens >= 1
+            if outcome["allowed"]:
+                tokens -= 1
+            else:
+                outcome["retry_after"] = math.ceil((1 - tokens) / rule.refill_per_second)
+            return [tokens, now]
+
+        self.store.update(f"{NAMESPACE_PREFIX}{rule.name}", client, refill_and_take, rule.period_seconds)
+        with self._lock:
+            counters = self._allowed if outcome["allowed"] else self._rejected
+            counters[rule.name] += 1
+        return outcome["allowed"], outcome.get("retry_after", 0)
+
+    def check(self, method: str, path: str, client: str) -> Tuple[Optional[RateLimitRule], bool, int]:
+        rule = self.rule_for(method, path)
+        if rule is None:
+            return None, True, 0
+        allowed, retry_after = self.take(rule, client)
+        return rule, allowed, retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                rule.name: {
+                    "capacity": rule.capacity,
+                    "period_seconds": rule.period_seconds,
+                    "allowed": self._allowed[rule.name],
+                    "rejected": self._rejected[rule.name],
+                }
+                for rule in self.rules
+            }
+
+
+def default_rules() -> Tuple[RateLimitRule, ...]:
+    return (
+        RateLimitRule(
+            "login",
+            *parse_rate(settings.rate_limit_login),
+            paths=(
+                "/auth/login",
+                "/ui-auth/login",
+                "/admin/login",
+                "/admin/authenticate",
+                "/admin/api/login",
+                "/ui-auth/admin/login",
+                "/admin/student-login",
+            ),
+        ),
+        RateLimitRule(
+            "register",
+            *parse_rate(settings.rate_limit_register),
+            paths=("/auth/register", "/ui-auth/register", "/public/register"),
+        ),
+        RateLimitRule(
+            "public_forms",
+            *parse_rate(settings.rate_limit_public_forms),
+            prefixes=("/public/",),
+        ),
+    )
+
+
+def create_rate_limiter() -> TokenBucketLimiter:
+    store = create_state_store(settings.rate_limit_backend, settings.rate_limit_store_path)
+    return TokenBucketLimiter(store, default_rules(), trusted_proxies=settings.rate_limit_trusted_proxies)
+
+
+rate_limiter = create_rate_limiter()
@@ -10,6 +10,9 @@ from sqlalchemy.orm import Session
 from app.core.deps import DBDep
 from app.models.user import User
 from app.core.confing import settings
+from app.core.password_policy import PasswordPolicy, parse_role_rounds
+from app.core.password_pool import PasswordHashingPool, bcrypt_check, bcrypt_hash
+from app.core.principal_cache import load_principal
 
 
 SECRET_KEY = settings.secret_key
@@ -17,6 +20,15 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 MAX_BCRYPT_PASSWORD_BYTES = 72
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+password_hashing_pool = PasswordHashingPool(
+    executor_kind=settings.password_hash_executor,
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
+password_policy = PasswordPolicy(
+    default_rounds=settings.bcrypt_rounds,
+    role_rounds=parse_role_rounds(settings.bcrypt_rounds_by_role),
+)
 
 
 if SECRET_KEY == "CHANGE_THIS_SECRET_KEY":
@@ -31,9 +43,9 @@ credentials_exception = HTTPException(
 )
 
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, role: Optional[str] = None) -> str:
     safe_password = normalize_password(password)
-    return bcrypt.hashpw(safe_password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return bcrypt_hash(safe_password.encode("utf-8"), password_policy.rounds_for(role))
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -51,6 +63,34 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         logging.getLogger(__name__).warning("Invalid password hash encountered.")
         return False
 
+
+async def ahash_password(password: str, role: Optional[str] = None) -> str:
+    """Hash on the bounded bcrypt pool instead of the event loop thread."""
+    safe_password = normalize_password(password)
+    return await password_hashing_pool.run(
+        bcrypt_hash,
+        safe_password.encode("utf-8"),
+        password_policy.rounds_for(role),
+    )
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify on the bounded bcrypt pool instead of the event loop thread."""
+    try:
+        safe_password = normalize_password(plain_password)
+    except ValueError:
+        return False
+
+    try:
+        return await password_hashing_pool.run(
+            bcrypt_check,
+            safe_password.encode("utf-8"),
+            hashed_password.encode("utf-8"),
+        )
+    except ValueError:
+        logging.getLogger(__name__).warning("Invalid password hash encountered.")
+        return False
+
 def normalize_password(password: str) -> str:
 
     password_bytes = password.encode("utf-8")
@@ -108,7 +148,7 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.student_number == student_number).first()
+    user = load_principal(db, student_number)
 
     if user is None:
         raise credentials_exception
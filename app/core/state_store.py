@@ -0,0 +1,406 @@
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.confing import settings
+
+logger = logging.getLogger(__name__)
+
+STATE_STORE_BACKENDS = {"memory", "sqlite"}
+
+
+class StateStore(ABC):
+    """Small key/value store with per-entry expiry for auth state (sessions, CSRF, lockouts).
+
+    Values must be JSON-serialisable so every backend can hold them. Keys live in
+    a ``namespace`` so unrelated features never collide. ``ttl_seconds`` is
+    relative; expired entries are invisible immediately and removed by sweeps.
+    """
+
+    _namespace_limits: Dict[str, int]
+
+    def limit_namespace(self, namespace: str, max_entries: int) -> None:
+        """Cap ``namespace`` at ``max_entries`` live keys; writes beyond it evict the stalest key."""
+        self._namespace_limits[namespace] = max(1, max_entries)
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> None:
+        ...
+
+    @abstractmethod
+    def get_or_set(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> Any:
+        """Return the live value for ``key``, storing ``value`` first if there is none."""
+
+    @abstractmethod
+    def incr(self, namespace: str, key: str, ttl_seconds: float, amount: int = 1) -> int:
+        """Atomically add ``amount`` to an integer counter; a new counter starts its TTL."""
+
+    @abstractmethod
+    def update(self, namespace: str, key: str, func: Callable[[Optional[Any]], Any], ttl_seconds: float) -> Any:
+        """Atomically replace the value with ``func(current)`` (``None`` if absent) and restart its TTL."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Remove expired entries and return how many were dropped."""
+
+    @abstractmethod
+    def count(self, namespace: str) -> int:
+        """Number of live (unexpired) keys in ``namespace``."""
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryStateStore(StateStore):
+    """Per-process store with O(1) lookups and LRU-bounded namespaces.
+
+    Expiry times also go into a min-heap, so purging only touches entries that
+    have actually expired. Each write purges at most ``purge_batch_size`` of
+    them, which spreads the cost instead of scanning every key on a timer.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10000,
+        purge_batch_size: int = 64,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.purge_batch_size = max(1, purge_batch_size)
+        self._clock = clock
+        self._namespaces: Dict[str, "OrderedDict[str, Tuple[Any, float]]"] = {}
+        self._namespace_limits = {}
+        self._expiry_heap: List[Tuple[float, str, str]] = []
+        self._lock = threading.Lock()
+        self._evicted = 0
+
+    def _entries(self, namespace: str) -> "OrderedDict[str, Tuple[Any, float]]":
+        return self._namespaces.setdefault(namespace, OrderedDict())
+
+    def _live(self, namespace: str, key: str, now: float) -> Optional[Tuple[Any, float]]:
+        entries = self._entries(namespace)
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del entries[key]
+            return None
+        entries.move_to_end(key)
+        return entry
+
+    def _store(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        entries = self._entries(namespace)
+        previous = entries.get(key)
+        entries[key] = (value, expires_at)
+        entries.move_to_end(key)
+        if previous is None or previous[1] != expires_at:
+            heapq.heappush(self._expiry_heap, (expires_at, namespace, key))
+        limit = self._namespace_limits.get(namespace, self.max_entries)
+        while len(entries) > limit:
+            entries.popitem(last=False)
+            self._evicted += 1
+        self._compact_heap()
+
+    def _compact_heap(self) -> None:
+        # Overwrites, deletes and evictions leave stale heap items behind; rebuild once they dominate.
+        live = sum(len(entries) for entries in self._namespaces.values())
+        if len(self._expiry_heap) > 2 * live + 1024:
+            self._expiry_heap = [
+                (expires_at, namespace, key)
+                for namespace, entries in self._namespaces.items()
+                for key, (_, expires_at) in entries.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    def _purge_expired(self, now: float, limit: Optional[int] = None) -> int:
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            expires_at, namespace, key = heapq.heappop(heap)
+            entries = self._namespaces.get(namespace)
+            entry = entries.get(key) if entries is not None else None
+            if entry is not None and entry[1] == expires_at:
+                del entries[key]
+                removed += 1
+        return removed
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        now = self._clock()
+        with self._lock:
+            entry = self._live(namespace, key, now)
+            return entry[0] if entry else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> None:
+        now = self._clock()
+        with self._lock:
+            self._purge_expired(now, self.purge_batch_size)
+            self._store(namespace, key, value, now + ttl_seconds)
+
+    def get_or_set(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> Any:
+        now = self._clock()
+        with self._lock:
+            entry = self._live(namespace, key, now)
+            if entry is not None:
+                return entry[0]
+            self._purge_expired(now, self.purge_batch_size)
+            self._store(namespace, key, value, now + ttl_seconds)
+            return value
+
+    def incr(self, namespace: str, key: str, ttl_seconds: float, amount: int = 1) -> int:
+        now = self._clock()
+        with self._lock:
+            entry = self._live(namespace, key, now)
+            if entry is None:
+                count, expires_at = amount, now + ttl_seconds
+            else:
+                count, expires_at = int(entry[0]) + amount, entry[1]
+            self._purge_expired(now, self.purge_batch_size)
+            self._store(namespace, key, count, expires_at)
+            return count
+
+    def update(self, namespace: str, key: str, func: Callable[[Optional[Any]], Any], ttl_seconds: float) -> Any:
+        now = self._clock()
+        with self._lock:
+            entry = self._live(namespace, key, now)
+            value = func(entry[0] if entry else None)
+            self._purge_expired(now, self.purge_batch_size)
+            self._store(namespace, key, value, now + ttl_seconds)
+            return value
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._entries(namespace).pop(key, None)
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._purge_expired(self._clock())
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            self._purge_expired(self._clock())
+            return len(self._entries(namespace))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "namespaces": {namespace: len(entries) for namespace, entries in self._namespaces.items()},
+                "evicted": self._evicted,
+                "heap_size": len(self._expiry_heap),
+            }
+
+
+class SQLiteStateStore(StateStore):
+    """Store backed by one SQLite file so every uvicorn worker on the host sees the same state."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        sweep_interval: float = 60.0,
+        busy_timeout_ms: int = 5000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self.busy_timeout_ms = busy_timeout_ms
+        self._clock = clock
+        self._namespace_limits = {}
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._next_sweep = clock() + sweep_interval
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._transaction() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS state_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_state_entries_expires_at ON state_entries (expires_at)"
+            )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Each thread gets its own connection; check_same_thread is off only so close() can reach them all.
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout_ms / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._get_connection())
+
+    def _maybe_sweep(self, connection: sqlite3.Connection, now: float) -> None:
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            connection.execute("DELETE FROM state_entries WHERE expires_at <= ?", (now,))
+
+    def _enforce_limit(self, connection: sqlite3.Connection, namespace: str) -> None:
+        limit = self._namespace_limits.get(namespace)
+        if limit is None:
+            return
+        # Entries share a namespace TTL, so the soonest-expiring keys (expired ones first) are
+        # the least recently written.
+        connection.execute(
+            "DELETE FROM state_entries WHERE rowid IN ("
+            "SELECT rowid FROM state_entries WHERE namespace = ? ORDER BY expires_at "
+            "LIMIT max(0, (SELECT COUNT(*) FROM state_entries WHERE namespace = ?) - ?))",
+            (namespace, namespace, limit),
+        )
+
+    @staticmethod
+    def _read(connection: sqlite3.Connection, namespace: str, key: str, now: float) -> Optional[Tuple[Any, float]]:
+        row = connection.execute(
+            "SELECT value, expires_at FROM state_entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, now),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    @staticmethod
+    def _write(connection: sqlite3.Connection, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        connection.execute(
+            "INSERT INTO state_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (namespace, key, json.dumps(value), expires_at),
+        )
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        # A lone SELECT in autocommit mode never takes the write lock; under WAL it reads a snapshot.
+        entry = self._read(self._get_connection(), namespace, key, self._clock())
+        return entry[0] if entry else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> None:
+        now = self._clock()
+        with self._transaction() as connection:
+            self._maybe_sweep(connection, now)
+            self._write(connection, namespace, key, value, now + ttl_seconds)
+            self._enforce_limit(connection, namespace)
+
+    def get_or_set(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> Any:
+        now = self._clock()
+        entry = self._read(self._get_connection(), namespace, key, now)
+        if entry is not None:
+            return entry[0]
+        with self._transaction() as connection:
+            entry = self._read(connection, namespace, key, now)
+            if entry is not None:
+                return entry[0]
+            self._maybe_sweep(connection, now)
+            self._write(connection, namespace, key, value, now + ttl_seconds)
+            self._enforce_limit(connection, namespace)
+            return value
+
+    def incr(self, namespace: str, key: str, ttl_seconds: float, amount: int = 1) -> int:
+        now = self._clock()
+        with self._transaction() as connection:
+            entry = self._read(connection, namespace, key, now)
+            if entry is None:
+                count, expires_at = amount, now + ttl_seconds
+            else:
+                count, expires_at = int(entry[0]) + amount, entry[1]
+            self._write(connection, namespace, key, count, expires_at)
+            return count
+
+    def update(self, namespace: str, key: str, func: Callable[[Optional[Any]], Any], ttl_seconds: float) -> Any:
+        now = self._clock()
+        with self._transaction() as connection:
+            entry = self._read(connection, namespace, key, now)
+            value = func(entry[0] if entry else None)
+            self._maybe_sweep(connection, now)
+            self._write(connection, namespace, key, value, now + ttl_seconds)
+            self._enforce_limit(connection, namespace)
+            return value
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM state_entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def sweep(self) -> int:
+        now = self._clock()
+        with self._transaction() as connection:
+            self._next_sweep = now + self.sweep_interval
+            return connection.execute("DELETE FROM state_entries WHERE expires_at <= ?", (now,)).rowcount
+
+    def count(self, namespace: str) -> int:
+        return self._get_connection().execute(
+            "SELECT COUNT(*) FROM state_entries WHERE namespace = ? AND expires_at > ?",
+            (namespace, self._clock()),
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT`` around a block so read-modify-write is atomic across workers.
+
+    Only writers use it; plain reads run in autocommit mode and never queue for the write lock.
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.connection.execute("COMMIT")
+        else:
+            self.connection.execute("ROLLBACK")
+
+
+def create_state_store(backend: Optional[str] = None, path: Optional[str] = None) -> StateStore:
+    backend = (backend or settings.state_store_backend).strip().lower()
+    if backend not in STATE_STORE_BACKENDS:
+        raise ValueError(f"Unsupported state store backend: {backend}")
+    if backend == "sqlite":
+        store_path = path or settings.state_store_path
+        logger.info("Using shared SQLite state store at %s", store_path)
+        return SQLiteStateStore(store_path)
+    return InMemoryStateStore(max_entries=settings.state_store_max_entries)
+
+
+state_store = create_state_store()
@@ -0,0 +1,52 @@
+import logging
+import os
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+from app.core.confing import settings
+from app.core.jalali import jalali_filter
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIRECTORY = "app/templates"
+TEMPLATE_EXTENSIONS = ("html",)
+
+
+def _bytecode_cache() -> FileSystemBytecodeCache | None:
+    cache_dir = settings.template_bytecode_cache_dir
+    if not cache_dir:
+        return None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        logger.warning("Template bytecode cache disabled; cannot create %s", cache_dir)
+        return None
+    return FileSystemBytecodeCache(cache_dir, pattern="basij-%s.cache")
+
+
+def create_templates() -> Jinja2Templates:
+    created = Jinja2Templates(
+        directory=TEMPLATES_DIRECTORY,
+        auto_reload=settings.templates_auto_reload,
+        bytecode_cache=_bytecode_cache(),
+    )
+    created.env.filters["jalali"] = jalali_filter
+    return created
+
+
+# Shared by every router and ``app.state.templates`` so one compiled cache serves them all.
+templates = create_templates()
+
+
+def precompile_templates(target: Jinja2Templates = templates) -> int:
+    """Load every template once so the first request after a deploy doesn't pay for compilation."""
+    compiled = 0
+    for name in target.env.list_templates(extensions=TEMPLATE_EXTENSIONS):
+        try:
+            target.env.get_template(name)
+        except TemplateError:
+            logger.exception("Failed to precompile template %s", name)
+            continue
+        compiled += 1
+    return compiled
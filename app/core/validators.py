@@ -1,14 +1,23 @@
 import re
 import unicodedata
-from typing import Any, Optional
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Pattern, Tuple, Union
 
 
+from app.core.confing import settings
+
 _PERSIAN_DIGITS = "۰۱۲۳۴۵۶۷۸۹"
 _ARABIC_DIGITS = "٠١٢٣٤٥٦٧٨٩"
 _DIGIT_TRANSLATION = str.maketrans(
     {**{ord(d): str(i) for i, d in enumerate(_PERSIAN_DIGITS)},
      **{ord(d): str(i) for i, d in enumerate(_ARABIC_DIGITS)}}
 )
+_TO_PERSIAN_DIGITS = str.maketrans("0123456789", _PERSIAN_DIGITS)
+
+# Separators users type inside numbers; \s also covers everything str.strip() would remove.
+_SEPARATORS = re.compile(r"[\s\u200c\u200f\-_()]+")
+_DIGITS = re.compile(r"\d+")
+_PHONE_NUMBER = re.compile(r"\d{11}")
 
 
 def _coerce_to_text(value: Any) -> Optional[str]:
@@ -18,15 +27,23 @@ def _coerce_to_text(value: Any) -> Optional[str]:
         return value
     return str(value)
 
+
+def _is_digits(text: str) -> bool:
+    # For ASCII text str.isdigit() is exactly \d+; other scripts keep the regex's Unicode semantics.
+    if text.isascii():
+        return text.isdigit()
+    return _DIGITS.fullmatch(text) is not None
+
+
 def _normalize_and_require_pattern(
     value: Optional[str],
-    pattern: str,
+    pattern: Union[str, Pattern[str]],
     error_message: str,
 ) -> Optional[str]:
     if value is None:
         return value
     normalized_value = normalize_digits(value)
-    if not re.fullmatch(pattern, normalized_value):
+    if not re.compile(pattern).fullmatch(normalized_value):
         raise ValueError(error_message)
     return normalized_value
 
@@ -35,9 +52,14 @@ def normalize_digits(value: Any) -> Optional[str]:
         if text_value is None:
             return None
 
-        normalized = unicodedata.normalize("NFKC", text_value).translate(_DIGIT_TRANSLATION).strip()
-        normalized = re.sub(r"[\s\u200c\u200f\-_()]+", "", normalized)
-        return normalized
+        if text_value.isascii():
+            # NFKC and the Persian/Arabic digit table are no-ops on ASCII.
+            if text_value.isdigit():
+                return text_value
+            return _SEPARATORS.sub("", text_value)
+
+        normalized = unicodedata.normalize("NFKC", text_value).translate(_DIGIT_TRANSLATION)
+        return _SEPARATORS.sub("", normalized)
 
 def _normalize_fixed_digits(
     value: Any,
@@ -46,22 +68,18 @@ def _normalize_fixed_digits(
     field_name: str,
     invalid_message: Optional[str] = None,
 ) -> str:
-    text_value = _coerce_to_text(value)
-    normalized = normalize_digits(text_value) if text_value is not None else None
+    normalized = normalize_digits(value)
     if normalized is None or normalized == "":
         raise ValueError(f"{field_name} الزامی است")
-    if re.fullmatch(r"\d+", normalized) and len(normalized) != length:
-        raise ValueError(f"{field_name} باید {length} رقم باشد")
-
-
-
-    if not re.fullmatch(rf"\d{{{length}}}", normalized):
-        if invalid_message:
-            raise ValueError(invalid_message)
-        persian_length = str(length).translate(str.maketrans("0123456789", _PERSIAN_DIGITS))
-        raise ValueError(f"{field_name} باید {persian_length} رقم باشد")
+    if _is_digits(normalized):
+        if len(normalized) != length:
+            raise ValueError(f"{field_name} باید {length} رقم باشد")
+        return normalized
 
-    return normalized
+    if invalid_message:
+        raise ValueError(invalid_message)
+    persian_length = str(length).translate(_TO_PERSIAN_DIGITS)
+    raise ValueError(f"{field_name} باید {persian_length} رقم باشد")
 
 def validate_student_number(value: Any) -> Optional[str]:
     if value is None:
@@ -73,22 +91,65 @@ def validate_phone_number(value: Any) -> Optional[str]:
         return value
 
     text_value = _coerce_to_text(value)
-    value = unicodedata.normalize("NFKC", text_value).translate(_DIGIT_TRANSLATION) if text_value is not None else None
+    if text_value.isascii():
+        if len(text_value) == 11 and text_value.isdigit():
+            return text_value
+        raise ValueError("شماره تماس باید ۱۱ رقم باشد")
 
-    if not re.fullmatch(r"\d{11}", value):
+    value = unicodedata.normalize("NFKC", text_value).translate(_DIGIT_TRANSLATION)
+    if not _PHONE_NUMBER.fullmatch(value):
         raise ValueError("شماره تماس باید ۱۱ رقم باشد")
     return value
 
 
+_checksum_lock = Lock()
+_checksum_rejections = 0
+
+
+def national_code_checksum_ok(code: str) -> bool:
+    """Iranian national-code check digit; ``code`` is 10 ASCII digits.
+
+    The last digit must equal ``r`` when ``r < 2`` and ``11 - r`` otherwise, where
+    ``r`` is the sum of the first nine digits weighted 10..2, modulo 11. Codes made
+    of one repeated digit satisfy that formula but are never issued.
+    """
+    if len(code) != 10 or not code.isdigit() or code == code[0] * 10:
+        return False
+    remainder = sum(int(digit) * weight for digit, weight in zip(code[:9], range(10, 1, -1))) % 11
+    check_digit = int(code[9])
+    return check_digit == (remainder if remainder < 2 else 11 - remainder)
+
+
+def passes_national_code_checksum(code: str) -> bool:
+    """The cheap pre-filter: True when the checksum is disabled or ``code`` passes it.
+
+    Failures are counted (see :func:`national_code_checksum_rejections`) so the
+    traffic turned away before any database or bcrypt work is visible.
+    """
+    global _checksum_rejections
+    if not settings.national_code_checksum or national_code_checksum_ok(code):
+        return True
+    with _checksum_lock:
+        _checksum_rejections += 1
+    return False
+
+
+def national_code_checksum_rejections() -> int:
+    return _checksum_rejections
+
+
 def validate_national_code(value: Any) -> Optional[str]:
     if value is None:
         return value
-    return _normalize_fixed_digits(
+    normalized = _normalize_fixed_digits(
         value,
         length=10,
         field_name="کد ملی",
         invalid_message="کد ملی معتبر نیست",
     )
+    if not passes_national_code_checksum(normalized):
+        raise ValueError("کد ملی معتبر نیست")
+    return normalized
 
 def validate_gender(value: Optional[str]) -> Optional[str]:
     if value is None:
@@ -103,4 +164,48 @@ def validate_gender(value: Optional[str]) -> Optional[str]:
     normalized_gender = allowed_values.get(normalized_value)
     if not normalized_gender:
         raise ValueError("gender must be 'sister' or 'brother'")
-    return normalized_gender
\ No newline at end of file
+    return normalized_gender
+
+FIELD_VALIDATORS: Dict[str, Callable[[Any], Optional[str]]] = {
+    "student_number": validate_student_number,
+    "national_code": validate_national_code,
+    "phone_number": validate_phone_number,
+    "gender": validate_gender,
+}
+
+
+def validate_many(
+    rows: Iterable[Mapping[str, Any]],
+    validators: Mapping[str, Callable[[Any], Optional[str]]] = FIELD_VALIDATORS,
+) -> List[Tuple[Dict[str, Any], Dict[str, str]]]:
+    """Validate the ``validators`` fields of every row, for bulk imports.
+
+    Returns ``(cleaned_row, errors)`` per row, where ``errors`` maps field -> message
+    (the same message the single-value validator raises). A value repeated across
+    rows, such as a gender column, is validated once per call.
+    """
+    outcomes: Dict[Tuple[str, str], Tuple[bool, Any]] = {}
+    results = []
+    for row in rows:
+        cleaned = dict(row)
+        errors: Dict[str, str] = {}
+        for field, validator in validators.items():
+            if field not in row:
+                continue
+            raw = row[field]
+            cacheable = isinstance(raw, str)
+            outcome = outcomes.get((field, raw)) if cacheable else None
+            if outcome is None:
+                try:
+                    outcome = (True, validator(raw))
+                except ValueError as exc:
+                    outcome = (False, str(exc))
+                if cacheable:
+                    outcomes[(field, raw)] = outcome
+            valid, result = outcome
+            if valid:
+                cleaned[field] = result
+            else:
+                errors[field] = result
+        results.append((cleaned, errors))
+    return results
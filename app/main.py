@@ -1,21 +1,35 @@
 import os
+import sqlite3
 import time
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import JSONResponse, HTMLResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 import logging
 from sqlalchemy.exc import SQLAlchemyError
 from app.routers import admin_audit
+from app.routers.admin_access import admin_session_metrics
+from app.services.admin_auth_service import admin_verifier
+from app.services.auth_service import login_metrics
 from app.routers import student, admin, test, user, admin_ui, admin_dashboard, ui_dashboard, admin_auth, admin_auth_ui
-from app.core.database import create_database
+from app.core.database import create_database, dispose_async_engine
 from app.routers.auth import router as auth_router
 from app.routers.ui_auth import router as ui_auth_router
 from app.routers.public_registration import router as public_registration_router
 from app.core.confing import settings
+from app.core.deps import AdminDep
+from app.core.security import password_hashing_pool, password_policy
+from app.core.rate_limit import rate_limiter
+from app.core.state_store import state_store
+from app.core.validators import national_code_checksum_rejections
+from app.core.templates import precompile_templates, templates
+from app.services.audit_service import audit_sink
+from app.services.audit_export_jobs import export_job_manager
+from app.services.email_outbox import email_outbox
+from app.services.student_import import shutdown_import_executor
 from app.core.json_utils import make_json_safe
 from app.core.geo_access import parse_client_ip, looks_like_browser, is_iran_country
 from app.core.version_checks import validate_runtime_compatibility
@@ -49,10 +63,39 @@ async def lifespan(app: FastAPI):
     # ایجاد نقش‌های پیش‌فرض
     await create_default_roles()
 
+    if settings.audit_sink_enabled:
+        audit_sink.start()
+
+    if settings.templates_precompile:
+        logger.info("✅ %s templates precompiled", precompile_templates())
+
+    if settings.bcrypt_calibrate_target_ms > 0:
+        password_policy.calibrate(
+            settings.bcrypt_calibrate_target_ms,
+            floor=settings.bcrypt_calibrate_min_rounds,
+            ceiling=settings.bcrypt_calibrate_max_rounds,
+            store=state_store,
+        )
+
+    if settings.email_outbox_enabled and settings.smtp_host:
+        if settings.email_outbox_mode == "async":
+            email_outbox.start_async()
+        else:
+            email_outbox.start()
+
     yield
 
     # Shutdown
     logger.info("👋 Shutting down Basij Management System...")
+    audit_sink.stop()
+    export_job_manager.shutdown()
+    shutdown_import_executor()
+    email_outbox.stop()
+    await email_outbox.stop_async()
+    password_hashing_pool.shutdown()
+    state_store.close()
+    rate_limiter.store.close()
+    await dispose_async_engine()
 
 async def create_default_roles():
     """ایجاد نقش‌های پیش‌فرض سیستم."""
@@ -116,8 +159,10 @@ app = FastAPI(
         {"name": "Users", "description": "مدیریت کاربران"},
     ]
 )
+# FastAPI 0.80 accepts but ignores ``lifespan=``; hand it to the router so startup/shutdown actually run.
+app.router.lifespan_context = lifespan
 
-app.state.templates = Jinja2Templates(directory="app/templates")
+app.state.templates = templates
 
 # تنظیمات CORS
 cors_allow_origins = list(settings.cors_allow_origins)
@@ -212,6 +257,40 @@ async def enforce_geo_policy(request: Request, call_next):
     return await call_next(request)
 
 
+@app.middleware("http")
+async def enforce_rate_limit(request: Request, call_next):
+    """Token-bucket throttling of login/registration/public forms, before the body is read."""
+    if not settings.rate_limit_enabled:
+        return await call_next(request)
+
+    client_ip = rate_limiter.trusted_proxies.client_for(
+        request.headers.get("x-forwarded-for"),
+        request.client.host if request.client else None,
+    )
+    try:
+        # The sqlite backend can wait on another worker's write lock; keep that off the event loop.
+        rule, allowed, retry_after = await run_in_threadpool(
+            rate_limiter.check, request.method, request.url.path, client_ip
+        )
+    except sqlite3.OperationalError as exc:
+        logger.warning("⚠️ Rate limit store unavailable, allowing request: path=%s error=%s", request.url.path, exc)
+        return await call_next(request)
+    if allowed:
+        return await call_next(request)
+
+    logger.warning(
+        "⛔ Rate limit exceeded: group=%s path=%s ip=%s",
+        rule.name,
+        request.url.path,
+        client_ip,
+    )
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"تعداد درخواست‌ها بیش از حد مجاز است. لطفاً {retry_after} ثانیه دیگر تلاش کنید."},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
 
 # سرویس فایل‌های استاتیک
 static_dir = "app/static"
@@ -403,6 +482,19 @@ async def health_check():
     }
 
 
+@app.get("/health/metrics", tags=["System"], dependencies=[AdminDep()])
+async def health_metrics():
+    """شاخص‌های داخلی (ورود، قفل شدن، محدودیت نرخ)؛ فقط برای ادمین، چون به مهاجم برای تنظیم حمله کمک می‌کند."""
+    return {
+        "admin_sessions": admin_session_metrics(),
+        "admin_verifier": admin_verifier.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "email_outbox": email_outbox.stats(),
+        "national_code_checksum_rejections": national_code_checksum_rejections(),
+        "login": login_metrics.stats(),
+    }
+
+
 
 
 # شامل کردن routerها
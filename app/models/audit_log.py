@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.core.database import Base
@@ -6,6 +6,14 @@ from app.core.database import Base
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    # Every admin listing/export orders by (created_at, id); each filter gets an
+    # index that leads with its equality column and keeps that order.
+    __table_args__ = (
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+        Index("ix_audit_logs_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_audit_logs_action_created_at", "action", "created_at", "id"),
+        Index("ix_audit_logs_entity_created_at", "entity", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
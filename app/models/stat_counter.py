@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class StatCounter(Base):
+    """Running total kept in step with inserts and deletes; see ``app.services.stat_counters``."""
+
+    __tablename__ = "stat_counters"
+
+    name = Column(String(100), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<StatCounter(name='{self.name}', value={self.value})>"
@@ -2,7 +2,6 @@ from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Bool
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
-from fastapi import HTTPException
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -60,18 +59,11 @@ class StudentProfile(Base):
 
     @staticmethod
     def check_unique(db, national_code: str, student_number: str, exclude_user_id: int = None):
-        conflict_query = db.query(StudentProfile).filter(
-            (StudentProfile.national_code == national_code)
-            | (StudentProfile.student_number == student_number)
-        )
-
-        if exclude_user_id is not None:
-            conflict_query = conflict_query.filter(StudentProfile.user_id != exclude_user_id)
+        from app.services.uniqueness import student_probe
 
-        conflict = conflict_query.first()
-
-        if conflict:
-            raise HTTPException(
-                status_code=400,
-                detail="کد ملی یا شماره دانشجویی تکراری است"
-            )
+        student_probe.ensure_unique(
+            db,
+            student_number=student_number,
+            national_code=national_code,
+            exclude_user_id=exclude_user_id,
+        )
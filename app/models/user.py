@@ -2,7 +2,6 @@ from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
-from fastapi import HTTPException
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -95,24 +94,11 @@ class User(Base):
 
     @staticmethod
     def check_unique(db, national_code: str, student_number: str, exclude_user_id: int = None):
-        from app.models.student_profile import StudentProfile
-
-        user_query = db.query(User).filter(User.student_number == student_number)
-        if exclude_user_id is not None:
-            user_query = user_query.filter(User.id != exclude_user_id)
-        if user_query.first():
-            raise HTTPException(
-                status_code=400,
-                detail="شماره دانشجویی تکراری است",
-            )
-
-        conflict_query = db.query(StudentProfile).filter(StudentProfile.national_code == national_code)
-        if exclude_user_id is not None:
-            conflict_query = conflict_query.filter(StudentProfile.user_id != exclude_user_id)
-        conflict = conflict_query.first()
-
-        if conflict:
-            raise HTTPException(
-                status_code=400,
-                detail="کد ملی یا شماره دانشجویی تکراری است"
-            )
+        from app.services.uniqueness import student_probe
+
+        student_probe.ensure_unique(
+            db,
+            student_number=student_number,
+            national_code=national_code,
+            exclude_user_id=exclude_user_id,
+        )
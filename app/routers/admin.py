@@ -16,7 +16,7 @@ router = APIRouter(
 def list_students(db: Session = Depends(get_db)):
     return user_service.get_all_students(db)
 
-@router.get("/students/{student_id}", response_model=StudentProfileOut)
+@router.get("/students/{student_id:int}", response_model=StudentProfileOut)
 def get_student(student_id: int, db: Session = Depends(get_db)):
     return user_service.get_student_by_id(db, student_id)
 
@@ -1,25 +1,27 @@
 from __future__ import annotations
 
 import secrets
-from datetime import datetime, timedelta, timezone
+import time
 from hmac import compare_digest
 
 from fastapi import APIRouter, Form, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 
 from app.core.confing import settings
+from app.core.state_store import state_store
 
 router = APIRouter(prefix="/admin", tags=["Admin Interface"])
 
 ADMIN_AUTH_COOKIE = "admin_interface_token"
+ADMIN_SESSION_TTL_SECONDS = 8 * 60 * 60
+CSRF_TOKEN_TTL_SECONDS = 60 * 60
 
-_failed_attempts: dict[str, datetime] = {}
-_csrf_tokens: dict[str, str] = {}
-_active_sessions: dict[str, datetime] = {}
+# Namespaces in the shared state store, so every worker sees the same sessions and lockouts.
+SESSIONS_NAMESPACE = "admin_interface_sessions"
+CSRF_NAMESPACE = "admin_interface_csrf"
+LOCKOUTS_NAMESPACE = "admin_interface_lockouts"
 
-
-def _now_utc() -> datetime:
-    return datetime.now(timezone.utc)
+state_store.limit_namespace(SESSIONS_NAMESPACE, settings.admin_max_sessions)
 
 
 def _request_identity(request: Request) -> str:
@@ -28,32 +30,33 @@ def _request_identity(request: Request) -> str:
     return f"{client_ip}:{user_agent}"
 
 
-def _cleanup_expired_sessions() -> None:
-    now = _now_utc()
-    expired_tokens = [token for token, exp in _active_sessions.items() if exp <= now]
-    for token in expired_tokens:
-        _active_sessions.pop(token, None)
+def create_admin_session(token: str | None = None) -> str:
+    session_token = token or secrets.token_urlsafe(32)
+    state_store.set(SESSIONS_NAMESPACE, session_token, True, ADMIN_SESSION_TTL_SECONDS)
+    return session_token
 
 
-def _read_lock_until(identity: str) -> datetime | None:
-    lock_until = _failed_attempts.get(identity)
-    if lock_until and lock_until > _now_utc():
-        return lock_until
+def admin_session_metrics() -> dict[str, int]:
+    return {
+        "live_sessions": state_store.count(SESSIONS_NAMESPACE),
+        "max_sessions": settings.admin_max_sessions,
+    }
+
 
-    _failed_attempts.pop(identity, None)
+def _read_lock_until(identity: str) -> float | None:
+    lock_until = state_store.get(LOCKOUTS_NAMESPACE, identity)
+    if lock_until and lock_until > time.time():
+        return lock_until
     return None
 
 
-def _remaining_seconds(lock_until: datetime) -> int:
-    delta = lock_until - _now_utc()
-    return max(0, int(delta.total_seconds()))
+def _remaining_seconds(lock_until: float) -> int:
+    return max(0, int(lock_until - time.time()))
 
 
 def ensure_admin_interface_auth(request: Request) -> RedirectResponse | None:
-    _cleanup_expired_sessions()
-
     token = request.cookies.get(ADMIN_AUTH_COOKIE)
-    if token and token in _active_sessions:
+    if token and state_store.get(SESSIONS_NAMESPACE, token):
         return None
 
     return RedirectResponse(
@@ -65,10 +68,9 @@ def ensure_admin_interface_auth(request: Request) -> RedirectResponse | None:
 @router.get("/login", response_class=HTMLResponse)
 def show_admin_login(request: Request):
     identity = _request_identity(request)
-    csrf_token = _csrf_tokens.get(identity)
-    if not csrf_token:
-        csrf_token = secrets.token_urlsafe(32)
-        _csrf_tokens[identity] = csrf_token
+    csrf_token = state_store.get_or_set(
+        CSRF_NAMESPACE, identity, secrets.token_urlsafe(32), CSRF_TOKEN_TTL_SECONDS
+    )
 
     lock_until = _read_lock_until(identity)
     remaining_seconds = _remaining_seconds(lock_until) if lock_until else 0
@@ -93,7 +95,7 @@ def submit_admin_login(
     csrf_token: str = Form(...),
 ):
     identity = _request_identity(request)
-    session_csrf_token = _csrf_tokens.get(identity)
+    session_csrf_token = state_store.get(CSRF_NAMESPACE, identity)
 
     if not session_csrf_token or not compare_digest(csrf_token, session_csrf_token):
         return request.app.state.templates.TemplateResponse(
@@ -126,9 +128,8 @@ def submit_admin_login(
         )
 
     if compare_digest(password, settings.admin_interface_password):
-        session_token = secrets.token_urlsafe(32)
-        _active_sessions[session_token] = _now_utc() + timedelta(hours=8)
-        _failed_attempts.pop(identity, None)
+        session_token = create_admin_session()
+        state_store.delete(LOCKOUTS_NAMESPACE, identity)
 
         response = RedirectResponse(
             url="/admin/dashboard",
@@ -137,15 +138,16 @@ def submit_admin_login(
         response.set_cookie(
             key=ADMIN_AUTH_COOKIE,
             value=session_token,
-            max_age=8 * 60 * 60,
+            max_age=ADMIN_SESSION_TTL_SECONDS,
             httponly=True,
             secure=settings.cookie_secure,
             samesite="lax",
         )
         return response
 
-    lock_until = _now_utc() + timedelta(minutes=settings.admin_lockout_minutes)
-    _failed_attempts[identity] = lock_until
+    lockout_seconds = settings.admin_lockout_minutes * 60
+    lock_until = time.time() + lockout_seconds
+    state_store.set(LOCKOUTS_NAMESPACE, identity, lock_until, lockout_seconds)
 
     return request.app.state.templates.TemplateResponse(
         "admin/login.html",
@@ -165,7 +167,7 @@ def submit_admin_login(
 def admin_logout(request: Request):
     token = request.cookies.get(ADMIN_AUTH_COOKIE)
     if token:
-        _active_sessions.pop(token, None)
+        state_store.delete(SESSIONS_NAMESPACE, token)
 
     response = RedirectResponse(
         url="/admin/login",
@@ -1,13 +1,18 @@
-import csv
-from io import StringIO
+import os
 from fastapi import APIRouter, Depends, Query, Request, HTTPException
 from sqlalchemy.orm import Session
 from datetime import datetime
-from io import BytesIO
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from app.core.deps import get_db
 from app.routers.admin_access import  ensure_admin_interface_auth
-from app.models.audit_log import AuditLog
+from app.services.audit_export import (
+    audit_log_export_statement,
+    build_audit_log_xlsx,
+    excel_export_available,
+    iter_audit_log_csv,
+    iter_file,
+)
+from app.services.audit_export_jobs import EXPORT_FORMATS, JOB_DONE, export_job_manager
 
 
 router = APIRouter(
@@ -28,41 +33,10 @@ def export_audit_logs_csv(
     if unauthorized:
         return unauthorized
 
-    query = db.query(AuditLog)
-    if user_id:
-        query = query.filter(AuditLog.user_id == user_id)
-    if action:
-        query = query.filter(AuditLog.action == action)
-    if date_from:
-        query = query.filter(AuditLog.created_at >= date_from)
-    if date_to:
-        query = query.filter(AuditLog.created_at <= date_to)
-
-    logs = query.order_by(AuditLog.created_at.desc()).all()
-
-    output = StringIO()
-    writer = csv.writer(output)
-
-    writer.writerow([
-        "ID", "User ID", "Action", "Entity", "Entity ID", "Description", "IP Address", "Created At",
-    ])
-
-    for log in logs:
-        writer.writerow([
-            log.id,
-            log.user_id,
-            log.action,
-            log.entity,
-            log.entity_id,
-            log.description,
-            log.ip_address,
-            log.created_at,
-        ])
-
-    output.seek(0)
+    statement = audit_log_export_statement(user_id, action, date_from, date_to)
 
     return StreamingResponse(
-        output,
+        iter_audit_log_csv(db, statement),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=audit_logs.csv"}
     )
@@ -81,61 +55,86 @@ def export_audit_logs_excel(
     if unauthorized:
         return unauthorized
 
-    query = db.query(AuditLog)
-    if user_id:
-        query = query.filter(AuditLog.user_id == user_id)
-    if action:
-        query = query.filter(AuditLog.action == action)
-    if date_from:
-        query = query.filter(AuditLog.created_at >= date_from)
-    if date_to:
-        query = query.filter(AuditLog.created_at <= date_to)
-
-    logs = query.order_by(AuditLog.created_at.desc()).all()
-    try:
-        from openpyxl import Workbook
-    except ModuleNotFoundError as exc:
-        raise HTTPException(status_code=503, detail="کتابخانه openpyxl در محیط نصب نیست.") from exc
-    try:
-        from openpyxl import Workbook
-    except ImportError as exc:
-        raise HTTPException(status_code=500, detail="کتابخانه openpyxl نصب نشده است") from exc
-
-    try:
-        from openpyxl import Workbook
-    except ModuleNotFoundError as exc:
+    if not excel_export_available():
         raise HTTPException(
             status_code=503,
             detail="Excel export نیازمند نصب openpyxl است. دستور: pip install -r app/requirements.txt",
-        ) from exc
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Audit Logs"
-
-    ws.append([
-        "ID", "User ID", "Action", "Entity", "Entity ID", "Description", "IP Address", "Created At",
-    ])
-
-    for log in logs:
-        ws.append([
-            log.id,
-            log.user_id,
-            log.action,
-            log.entity,
-            log.entity_id,
-            log.description,
-            log.ip_address,
-            log.created_at.strftime("%Y-%m-%d %H:%M"),
-        ])
-
-    stream = BytesIO()
-    wb.save(stream)
-    stream.seek(0)
+        )
+
+    statement = audit_log_export_statement(user_id, action, date_from, date_to)
+    spool = build_audit_log_xlsx(db, statement)
 
     return StreamingResponse(
-        stream,
+        iter_file(spool),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": "attachment; filename=audit_logs.xlsx"}
     )
 
+
+def _export_job_payload(request: Request, job) -> dict:
+    payload = job.to_dict()
+    payload.pop("artifact_path", None)
+    payload["status_url"] = str(request.url_for("get_audit_export_job", job_id=job.id))
+    if job.status == JOB_DONE:
+        payload["download_url"] = str(request.url_for("download_audit_export_job", job_id=job.id))
+    return payload
+
+
+@router.post("/export/jobs", status_code=202)
+def create_audit_export_job(
+    request: Request,
+    format: str = Query("csv"),
+    user_id: int | None = Query(None),
+    action: str | None = Query(None),
+    date_from: datetime | None = Query(None),
+    date_to: datetime | None = Query(None),
+):
+    unauthorized = ensure_admin_interface_auth(request)
+    if unauthorized:
+        return unauthorized
+
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"فرمت خروجی نامعتبر است. فرمت‌های مجاز: {', '.join(EXPORT_FORMATS)}",
+        )
+    if format == "xlsx" and not excel_export_available():
+        raise HTTPException(
+            status_code=503,
+            detail="Excel export نیازمند نصب openpyxl است. دستور: pip install -r app/requirements.txt",
+        )
+
+    job = export_job_manager.submit(
+        format,
+        {"user_id": user_id, "action": action, "date_from": date_from, "date_to": date_to},
+    )
+    return JSONResponse(status_code=202, content=_export_job_payload(request, job))
+
+
+@router.get("/export/jobs/{job_id}", name="get_audit_export_job")
+def get_audit_export_job(request: Request, job_id: str):
+    unauthorized = ensure_admin_interface_auth(request)
+    if unauthorized:
+        return unauthorized
+
+    job = export_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="درخواست خروجی یافت نشد")
+    return _export_job_payload(request, job)
+
+
+@router.get("/export/jobs/{job_id}/download", name="download_audit_export_job")
+def download_audit_export_job(request: Request, job_id: str):
+    unauthorized = ensure_admin_interface_auth(request)
+    if unauthorized:
+        return unauthorized
+
+    job = export_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="درخواست خروجی یافت نشد")
+    if job.status != JOB_DONE:
+        raise HTTPException(status_code=409, detail="فایل خروجی هنوز آماده نشده است")
+    if not job.artifact_path or not os.path.exists(job.artifact_path):
+        raise HTTPException(status_code=410, detail="فایل خروجی منقضی شده است؛ دوباره درخواست دهید")
+
+    return FileResponse(job.artifact_path, media_type=job.media_type, filename=job.filename)
@@ -2,16 +2,16 @@ from typing import Optional
 
 from fastapi import APIRouter, Form, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 
+from app.core.templates import templates
 from app.services.admin_auth_service import (
-    authenticate_admin_password,
-    create_admin_token,
+    authenticate_admin_password_async,
+    admin_verifier,
+    create_admin_session_token_async,
     is_admin_authenticated,
 )
 
 router = APIRouter(prefix="/ui-auth/admin", tags=["Admin UI Authentication"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/login", response_class=HTMLResponse)
@@ -36,7 +36,7 @@ async def admin_login_submit(
     password: str = Form(...),
     redirect_url: Optional[str] = Form("/admin/dashboard"),
 ):
-    authenticated, error_message = authenticate_admin_password(request, password)
+    authenticated, error_message = await authenticate_admin_password_async(request, password)
     if not authenticated:
         return templates.TemplateResponse(
             "admin/login.html",
@@ -52,7 +52,7 @@ async def admin_login_submit(
     response = RedirectResponse(url=redirect_url, status_code=status.HTTP_303_SEE_OTHER)
     response.set_cookie(
         key="admin_access_token",
-        value=create_admin_token(),
+        value=await create_admin_session_token_async(password),
         httponly=True,
         secure=False,
         samesite="lax",
@@ -62,7 +62,8 @@ async def admin_login_submit(
 
 
 @router.get("/logout")
-async def admin_logout():
+def admin_logout(request: Request):
+    admin_verifier.forget(request.cookies.get("admin_access_token"))
     response = RedirectResponse(url="/ui-auth/admin/login", status_code=status.HTTP_303_SEE_OTHER)
     response.delete_cookie("admin_access_token")
     return response
\ No newline at end of file
@@ -4,26 +4,26 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.exc import OperationalError
-from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 from app.core.database import ensure_noor_program_schema
 from app.core.deps import get_db
+from app.core.templates import templates
 from app.models.audit_log import AuditLog
 from app.models.noor_program import LightPathStudent, QuranClass, QuranClassRequest
 from app.models.user import User
 from app.services.admin_auth_service import (
-    authenticate_admin_password,
-    create_admin_token,
+    authenticate_admin_password_async,
+    admin_verifier,
+    create_admin_session_token_async,
     is_admin_authenticated,
 )
-from app.services.audit_service import create_audit_log, format_persian_datetime, get_simple_audit_stats
+from app.services.audit_service import create_audit_log
+from app.services.dashboard_stats import get_dashboard_stats, invalidate_dashboard_stats
 
 
 
 router = APIRouter(prefix="/admin", tags=["Admin Dashboard"])
-templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
 
@@ -45,8 +45,8 @@ def admin_login_page(request: Request, error_message: Optional[str] = None):
 
 
 @router.post("/login", response_class=HTMLResponse)
-def admin_login_submit(request: Request, password: str = Form(...)):
-    authenticated, error_message = authenticate_admin_password(request, password)
+async def admin_login_submit(request: Request, password: str = Form(...)):
+    authenticated, error_message = await authenticate_admin_password_async(request, password)
     if not authenticated:
 
         return templates.TemplateResponse(
@@ -63,7 +63,7 @@ def admin_login_submit(request: Request, password: str = Form(...)):
     response = RedirectResponse(url="/admin/dashboard", status_code=status.HTTP_303_SEE_OTHER)
     response.set_cookie(
         key="admin_access_token",
-        value=create_admin_token(),
+        value=await create_admin_session_token_async(password),
         max_age=60 * 60,
         httponly=True,
         secure=False,
@@ -73,15 +73,15 @@ def admin_login_submit(request: Request, password: str = Form(...)):
 
 
 @router.post("/authenticate")
-def admin_authenticate(request: Request, password: str = Form(...)):
-    authenticated, error_message = authenticate_admin_password(request, password)
+async def admin_authenticate(request: Request, password: str = Form(...)):
+    authenticated, error_message = await authenticate_admin_password_async(request, password)
     if not authenticated:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_message)
 
     response = JSONResponse(content={"detail": "ورود ادمین موفق بود"})
     response.set_cookie(
         key="admin_access_token",
-        value=create_admin_token(),
+        value=await create_admin_session_token_async(password),
         max_age=60 * 60,
         httponly=True,
         secure=False,
@@ -91,7 +91,8 @@ def admin_authenticate(request: Request, password: str = Form(...)):
 
 
 @router.get("/logout")
-def admin_logout():
+def admin_logout(request: Request):
+    admin_verifier.forget(request.cookies.get("admin_access_token"))
     response = RedirectResponse(url="/admin/login", status_code=status.HTTP_303_SEE_OTHER)
     response.delete_cookie("admin_access_token")
     return response
@@ -105,21 +106,6 @@ def _query_with_noor_schema_repair(db: Session, build_query):
         ensure_noor_program_schema()
         return build_query().all()
 
-def _count_with_noor_schema_repair(db: Session, build_query) -> int:
-    def run_count() -> int:
-        # Use an explicit COUNT(*) over a subquery so this helper works
-        # consistently for both plain and filtered query builders.
-        query = build_query().order_by(None)
-        counted_rows = db.query(func.count()).select_from(query.subquery()).scalar()
-        return counted_rows or 0
-    try:
-        return run_count()
-    except OperationalError:
-        db.rollback()
-        logger.exception("Noor program count query failed; attempting schema repair and retry")
-        ensure_noor_program_schema()
-        return run_count()
-
 def _build_quran_request_lookup(records: list[QuranClassRequest]) -> dict[int, QuranClassRequest]:
     latest_by_user: dict[int, QuranClassRequest] = {}
     for request_item in records:
@@ -137,7 +123,9 @@ def admin_dashboard(request: Request, db: Session = Depends(get_db)):
 
 
 
-    stats = get_simple_audit_stats(db)
+    # Every counter comes from one cached aggregate query; only the lists below hit the database.
+    counters = get_dashboard_stats(db)
+    stats = {"total_logs": counters["total_logs"], "total_changes": counters["total_changes"]}
 
     users = (
         db.query(User)
@@ -167,28 +155,13 @@ def admin_dashboard(request: Request, db: Session = Depends(get_db)):
         .limit(100),
     )
 
-    users_count = db.query(User).count()
-    light_path_students_count = _count_with_noor_schema_repair(
-        db,
-        lambda: db.query(LightPathStudent),
-    )
-    quran_class_requests_count = _count_with_noor_schema_repair(
-        db,
-        lambda: db.query(QuranClassRequest),
-    )
+    users_count = counters["users_count"]
+    light_path_students_count = counters["light_path_students_count"]
+    quran_class_requests_count = counters["quran_class_requests_count"]
     total_users = users_count  + quran_class_requests_count
 
-
-    deleted_events = (
-        db.query(AuditLog)
-        .filter(
-            AuditLog.action == "delete",
-            AuditLog.entity.in_(["light_path_student", "quran_scholar"]),
-        )
-        .count()
-    )
     all_events = light_path_students_count + quran_class_requests_count
-    total_events = all_events + deleted_events
+    total_events = all_events + counters["deleted_events"]
 
 
     latest_request_by_user = _build_quran_request_lookup(quran_class_requests)
@@ -218,7 +191,6 @@ def admin_dashboard(request: Request, db: Session = Depends(get_db)):
             "light_path_students_count": light_path_students_count,
             "quran_class_requests_count": quran_class_requests_count,
             "total_events": total_events,
-            "format_persian_datetime": format_persian_datetime,
         },
     )
 
@@ -250,6 +222,7 @@ def create_light_path_student(
     db.add(record)
     db.commit()
     db.refresh(record)
+    invalidate_dashboard_stats()
 
     create_audit_log(
         db=db,
@@ -284,6 +257,7 @@ def create_quran_class(
         )
     )
     db.commit()
+    invalidate_dashboard_stats()
 
     return RedirectResponse(url="/admin/dashboard", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -311,6 +285,7 @@ def edit_quran_class(
     class_record.level = level
     class_record.description = description.strip() or None
     db.commit()
+    invalidate_dashboard_stats()
 
     return RedirectResponse(url="/admin/dashboard", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -324,6 +299,7 @@ def delete_quran_class(class_id: int, request: Request, db: Session = Depends(ge
     if class_record:
         db.delete(class_record)
         db.commit()
+        invalidate_dashboard_stats()
 
     return RedirectResponse(url="/admin/dashboard", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -338,6 +314,7 @@ def delete_quran_class_request(request_id: int, request: Request, db: Session =
         record_id = record.id
         db.delete(record)
         db.commit()
+        invalidate_dashboard_stats()
         create_audit_log(
             db=db,
             action="delete",
@@ -377,6 +354,7 @@ def edit_light_path_student(
     record.is_active = is_active == "active"
     record.student_number = student_number.strip() or None
     db.commit()
+    invalidate_dashboard_stats()
 
     return RedirectResponse(url="/admin/dashboard", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -391,6 +369,7 @@ def delete_light_path_student(student_id: int, request: Request, db: Session = D
         record_id = record.id
         db.delete(record)
         db.commit()
+        invalidate_dashboard_stats()
         create_audit_log(
             db=db,
             action="delete",
@@ -439,6 +418,5 @@ def admin_user_details(user_id: int, request: Request, db: Session = Depends(get
             "request": request,
             "user": user,
             "user_total_changes": user_total_changes,
-            "format_persian_datetime": format_persian_datetime,
         },
     )
\ No newline at end of file
@@ -2,28 +2,39 @@ from datetime import datetime
 from urllib.parse import quote
 from typing import Optional
 from jose import JWTError, jwt
-from fastapi import APIRouter, Depends, Request, Query, Form, HTTPException, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Depends, File, Request, Query, Form, HTTPException, UploadFile, status
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from app.core.confing import settings
 from app.core.deps import get_db
+from app.core.pagination import InvalidCursorError, keyset_paginate
+from app.core.principal_cache import load_principal
 from app.core.security import ALGORITHM, create_access_token
 from app.models.audit_log import AuditLog
 from app.models.user import User
-from app.routers.admin_auth_ui import templates
+from app.core.templates import templates
 from app.schemas.student import AdminStudentUpdate
 from app.services import user_service
-from app.services.auth_service import authenticate_user
+from app.services.auth_service import login_user
+from app.services.student_import import (
+    StudentImportError,
+    detect_import_format,
+    import_upload_async,
+)
 from app.core.validators import validate_national_code, validate_student_number
 
 # ایجاد router
 router = APIRouter()
 
+AUDIT_LOGS_PAGE_SIZE = 100
+AUDIT_LOGS_CURSOR_SCOPE = "audit_logs"
+INVALID_CURSOR_MESSAGE = "نشانگر صفحه‌بندی نامعتبر است"
+
 
 def get_templates() -> Jinja2Templates:
-    return Jinja2Templates(directory="app/templates")
+    return templates
 
 
 def get_current_admin_from_cookie(
@@ -31,7 +42,6 @@ def get_current_admin_from_cookie(
         db: Session = Depends(get_db),
 ) -> User:
     token = request.cookies.get("access_token")
-    print(f"Access token received: {token}")  # دیباگ
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="نیاز به ورود")
 
@@ -43,7 +53,7 @@ def get_current_admin_from_cookie(
     except JWTError as exc:
         raise HTTPException(status_code=401, detail="توکن نامعتبر") from exc
 
-    user = db.query(User).filter(User.student_number == student_number).first()
+    user = load_principal(db, student_number)
     if not user:
         raise HTTPException(status_code=401, detail="کاربر یافت نشد")
     if not user.role or user.role.name != "admin":
@@ -69,8 +79,6 @@ def admin_login(
         password: str = Form(...),
         db: Session = Depends(get_db),
 ):
-    print(f"Attempting login with national_code: {national_code}, password: {password}")  # دیباگ
-
     try:
         normalized_national_code = validate_national_code(national_code)
         normalized_student_number = validate_student_number(password)
@@ -80,29 +88,22 @@ def admin_login(
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    user = authenticate_user(db, normalized_national_code, normalized_student_number)
-    print(f"Authenticated user: {user}")  # دیباگ
+    # This form never flagged has_authenticated; only the student login flows do.
+    result = login_user(db, normalized_national_code, normalized_student_number, mark_authenticated=False)
 
-    if not user:
+    if not result.authenticated:
         return RedirectResponse(
             url="/admin/login?error_message=کد+ملی+یا+شماره+دانشجویی+اشتباه+است",
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    if not user.is_active or not user.role or user.role.name != "admin":
+    if not result.is_active or result.role_name != "admin":
         return RedirectResponse(
             url="/admin/login?error_message=شما+دسترسی+ادمین+ندارید",
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    access_token = create_access_token(
-        data={
-            "sub": user.student_number,
-            "user_id": user.id,
-            "national_code": user.profile.national_code if user.profile else None,
-            "role": user.role.name,
-        }
-    )
+    access_token = create_access_token(data=result.claims)
 
     response = RedirectResponse(url="/admin/dashboard", status_code=status.HTTP_303_SEE_OTHER)
     response.set_cookie(
@@ -125,8 +126,10 @@ def audit_logs_page(
         action: Optional[str] = Query(None, description="Filter by action"),
         date_from: Optional[datetime] = Query(None, description="Filter from date"),
         date_to: Optional[datetime] = Query(None, description="Filter to date"),
+        cursor: Optional[str] = Query(None, description="Opaque pagination cursor"),
+        limit: int = Query(AUDIT_LOGS_PAGE_SIZE, ge=1, le=500),
 ):
-    query = db.query(AuditLog)
+    query = db.query(AuditLog).options(joinedload(AuditLog.user).joinedload(User.profile))
 
     if user_id is not None:
         query = query.filter(AuditLog.user_id == user_id)
@@ -140,7 +143,18 @@ def audit_logs_page(
     if date_to:
         query = query.filter(AuditLog.created_at <= date_to)
 
-    logs = query.order_by(AuditLog.created_at.desc()).limit(500).all()
+    try:
+        page = keyset_paginate(
+            query,
+            (AuditLog.created_at, AuditLog.id),
+            scope=AUDIT_LOGS_CURSOR_SCOPE,
+            cursor=cursor,
+            limit=limit,
+            descending=True,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR_MESSAGE)
+    logs = page.items
 
     for log in logs:
         if log.user:
@@ -155,6 +169,8 @@ def audit_logs_page(
         {
             "request": request,
             "logs": logs,
+            "next_url": str(request.url.include_query_params(cursor=page.next_cursor)) if page.next_cursor else None,
+            "prev_url": str(request.url.include_query_params(cursor=page.prev_cursor)) if page.prev_cursor else None,
             "filters": {
                 "user_id": user_id or "",
                 "action": action or "",
@@ -170,13 +186,16 @@ def manage_students_page(
         request: Request,
         db: Session = Depends(get_db),
         _: User = Depends(get_current_admin_from_cookie),
-        skip: int = Query(0, ge=0),
+        cursor: Optional[str] = Query(None),
         limit: int = Query(25, ge=1, le=100),
         edit_id: Optional[int] = Query(None),
         error_message: Optional[str] = Query(None),
         success_message: Optional[str] = Query(None),
 ):
-    result = user_service.get_students_paginated(db, skip=skip, limit=limit)
+    try:
+        result = user_service.get_students_paginated(db, cursor=cursor, limit=limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR_MESSAGE)
     edit_student = user_service.get_student_by_id(db, edit_id) if edit_id else None
     return templates.TemplateResponse(
         "admin/student_mangement.html",
@@ -184,7 +203,12 @@ def manage_students_page(
             "request": request,
             "students": result["students"],
             "total": result["total"],
-            "skip": skip,
+            "next_url": (
+                str(request.url.include_query_params(cursor=result["next_cursor"])) if result["next_cursor"] else None
+            ),
+            "prev_url": (
+                str(request.url.include_query_params(cursor=result["prev_cursor"])) if result["prev_cursor"] else None
+            ),
             "limit": limit,
             "edit_student": edit_student,
             "error_message": error_message,
@@ -229,6 +253,19 @@ def add_student(
         )
 
 
+@router.post("/admin/students/manage/import")
+async def import_students_file(
+        file: UploadFile = File(...),
+        _: User = Depends(get_current_admin_from_cookie),
+):
+    try:
+        import_format = detect_import_format(file.filename)
+        report = await import_upload_async(file.file, import_format)
+    except StudentImportError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return JSONResponse(report.as_dict())
+
+
 @router.post("/admin/students/manage/{student_id}/edit")
 def edit_student(
         student_id: int,
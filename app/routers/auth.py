@@ -1,16 +1,15 @@
 from fastapi import APIRouter, Depends, status, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.core.deps import DBDep, CurrentUser, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import AsyncDBDep, CurrentUser
 from app.schemas.auth import RegisterRequest, Token, RegisterResponse
 from app.schemas.user import UserOut
 from app.services.auth_service import (
-    register_user,
-    authenticate_user,
-    create_token_for_user,
-    enforce_single_national_id_authentication
+    register_user_async,
+    login_user_async,
 )
 from app.models.user import User
+from app.services.user_service import get_user_with_profile_async
 from app.core.validators import validate_national_code
 
 router = APIRouter(
@@ -36,9 +35,9 @@ router = APIRouter(
 )
 async def register(
         data: RegisterRequest,
-        db: Session = DBDep()
+        db: AsyncSession = AsyncDBDep()
 ):
-    user = register_user(db=db, data=data)
+    user = await register_user_async(db=db, data=data)
     return {
         "message": "ثبت‌نام با موفقیت انجام شد",
         "user_id": user.id,
@@ -54,7 +53,7 @@ async def register(
 )
 async def login(
         form_data: OAuth2PasswordRequestForm = Depends(),
-        db: Session = DBDep()
+        db: AsyncSession = AsyncDBDep()
 ):
     try:
         national_code = validate_national_code(form_data.username)
@@ -64,27 +63,26 @@ async def login(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail = str(exc)
         ) from exc
-    user = authenticate_user(
+    result = await login_user_async(
         db,
         national_code=national_code,
         password=password
     )
 
-    if not user:
+    if not result.authenticated:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="کد ملی یا شماره دانشجویی اشتباه است",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not user.is_active:
+    if not result.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="حساب کاربری غیرفعال شده است"
         )
-    enforce_single_national_id_authentication(db, user)
 
-    return create_token_for_user(user)
+    return result.token()
 
 
 @router.get(
@@ -98,7 +96,7 @@ async def get_me(
     return current_user
 
 @router.get("/check/{student_number}")
-async def check_student_number(student_number: str, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.student_number == student_number).first()
+async def check_student_number(student_number: str, db: AsyncSession = AsyncDBDep()):
+    existing_user = await get_user_with_profile_async(db, student_number)
     return {"available": existing_user is None}
 
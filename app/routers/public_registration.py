@@ -1,15 +1,15 @@
 import re
 from urllib.parse import urlencode
 
-from fastapi import APIRouter, BackgroundTasks, Form, Request, status
+from fastapi import APIRouter, Form, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 
 from app.core.confing import settings
+from app.core.templates import templates
 from app.services.email_service import send_registration_confirmation_email
 
 router = APIRouter(prefix="/public", tags=["Public Registration"])
-templates = Jinja2Templates(directory="app/templates")
 
 EMAIL_PATTERN = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
 PASSWORD_PATTERN = re.compile(r"^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[^A-Za-z0-9]).{8,64}$")
@@ -38,7 +38,6 @@ async def public_registration_page(request: Request, error_message: str | None =
 @router.post("/register", response_class=HTMLResponse)
 async def submit_public_registration(
     request: Request,
-    background_tasks: BackgroundTasks,
     full_name: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
@@ -107,7 +106,8 @@ async def submit_public_registration(
             status_code=400,
         )
 
-    background_tasks.add_task(send_registration_confirmation_email, email, full_name)
+    # Writes the outbox row now; the outbox worker sends it on its pooled SMTP connection.
+    await run_in_threadpool(send_registration_confirmation_email, email, full_name)
     query = urlencode({"name": full_name, "email": email})
     return RedirectResponse(
         url=f"/public/thank-you?{query}",
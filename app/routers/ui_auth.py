@@ -12,12 +12,15 @@ from fastapi.responses import (
     RedirectResponse,
     HTMLResponse
 )
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import DBDep
+from app.core.deps import AsyncDBDep
+from app.core.templates import templates
 from app.schemas.auth import RegisterRequest, GenderEnum
-from app.services.auth_service import register_user, enforce_single_national_id_authentication, authenticate_user
+from app.services.auth_service import (
+    login_user_async,
+    register_user_async,
+)
 from app.core.security import create_access_token
 from app.core.confing import settings
 from app.core.validators import validate_national_code
@@ -28,7 +31,6 @@ router = APIRouter(
     tags=["UI Authentication"]
 )
 
-templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
 @router.get("/", response_class=HTMLResponse)
@@ -74,7 +76,7 @@ async def submit_register(
     phone_number: str = Form(...),
     gender: str = Form(...),
     address: Optional[str] = Form(""),
-    db: Session = DBDep()
+    db: AsyncSession = AsyncDBDep()
 ):
     try:
         gender_enum = GenderEnum(gender)
@@ -89,7 +91,7 @@ async def submit_register(
             address=address or None
         )
 
-        register_user(db, register_data)
+        await register_user_async(db, register_data)
 
         return templates.TemplateResponse(
             "auth/login.html",
@@ -163,7 +165,7 @@ async def submit_login(
     password: str = Form(...),
     remember_me: Optional[str] = Form(None),
     redirect_url: Optional[str] = Form(None),
-    db: Session = DBDep()
+    db: AsyncSession = AsyncDBDep()
 ):
     logger.info("UI login attempt received")
     try:
@@ -181,27 +183,29 @@ async def submit_login(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY
         )
 
-    user = authenticate_user(
-        db,
-        national_code=normalized_national_code,
-        password=password,
+    try:
+        result = await login_user_async(
+            db,
+            national_code=normalized_national_code,
+            password=password,
         )
-    if not user:
+    except HTTPException as e:
+        logger.exception("UI login pipeline failed")
         return templates.TemplateResponse(
             "auth/login.html",
             {
                 "request": request,
                 "title": "ورود به سامانه",
-                "error_message": "در حال حاضر امکان ورود وجود ندارد. لطفاً دوباره تلاش کنید.",
+                "error_message": e.detail,
                 "national_code": national_code,
                 "redirect_url": redirect_url,
             },
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=e.status_code
         )
 
-    logger.info("UI login candidate lookup completed: user_found=%s", bool(user))
+    logger.info("UI login candidate lookup completed: user_found=%s", result.authenticated)
 
-    if not user:
+    if not result.authenticated:
         logger.warning("UI login failed due to invalid credentials")
         return templates.TemplateResponse(
             "auth/login.html",
@@ -215,8 +219,8 @@ async def submit_login(
             status_code=status.HTTP_401_UNAUTHORIZED
         )
 
-    if not user.is_active:
-        logger.warning("UI login blocked for inactive user: user_id=%s", user.id)
+    if not result.is_active:
+        logger.warning("UI login blocked for inactive user: user_id=%s", result.claims["user_id"])
         return templates.TemplateResponse(
             "auth/login.html",
             {
@@ -229,37 +233,15 @@ async def submit_login(
             status_code=status.HTTP_403_FORBIDDEN
         )
 
-    try:
-        enforce_single_national_id_authentication(db, user)
-    except HTTPException as e:
-        logger.exception("UI login post-authentication state update failed")
-        return templates.TemplateResponse(
-            "auth/login.html",
-            {
-                "request": request,
-                "title": "ورود به سامانه",
-                "error_message": e.detail,
-                "national_code": national_code,
-                "redirect_url": redirect_url,
-            },
-            status_code=status.HTTP_403_FORBIDDEN
-        )
-
-    access_token = create_access_token(
-        data={
-            "sub": user.student_number,
-            "user_id": user.id,
-            "national_code": user.profile.national_code if user.profile else None
-        }
-    )
+    access_token = create_access_token(data=result.claims)
 
     max_age = 30 * 24 * 60 * 60 if remember_me else 24 * 60 * 60
 
     target_url = redirect_url or (
-        "/admin/dashboard" if user.role and user.role.name == "admin" else "/ui-auth/dashboard"
+        "/admin/dashboard" if result.role_name == "admin" else "/ui-auth/dashboard"
     )
 
-    logger.info("UI login success: user_id=%s", user.id)
+    logger.info("UI login success: user_id=%s", result.claims["user_id"])
     response = RedirectResponse(
         url=target_url,
         status_code=status.HTTP_303_SEE_OTHER
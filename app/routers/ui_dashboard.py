@@ -5,25 +5,32 @@ import logging
 
 from fastapi import APIRouter, Form, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from jose import JWTError, jwt
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.confing import settings
-from app.core.deps import DBDep
+from app.core.deps import AsyncDBDep
+from app.core.principal_cache import load_principal_async, principal_cache
 from app.core.validators import validate_phone_number
+from app.core.templates import templates
 from app.models.noor_program import LightPathStudent, QuranClassRequest
-from app.models.student_profile import StudentProfile
 from app.models.user import User
+from app.services.dashboard_stats import invalidate_dashboard_stats
+from app.services.user_service import get_user_with_profile_async, is_phone_number_taken_async
 
 router = APIRouter(prefix="/ui/dashboard", tags=["UI Dashboard"])
 
-templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
 
-def _get_current_user_from_cookie(request: Request, db: Session) -> Optional[User]:
+async def _get_current_user_from_cookie(
+    request: Request,
+    db: AsyncSession,
+    *,
+    for_update: bool = False,
+) -> Optional[User]:
+    """Resolve the cookie user; cached and detached unless ``for_update`` needs a session-bound row."""
     token = request.cookies.get("access_token")
     if not token:
         return None
@@ -37,18 +44,15 @@ def _get_current_user_from_cookie(request: Request, db: Session) -> Optional[Use
     if not student_number:
         return None
 
-    return (
-        db.query(User)
-        .options(joinedload(User.profile), joinedload(User.role))
-        .filter(User.student_number == student_number)
-        .first()
-    )
+    if for_update:
+        return await get_user_with_profile_async(db, student_number)
+    return await load_principal_async(db, student_number)
 
 
 
 @router.get("/", response_class=HTMLResponse)
-async def dashboard_page(request: Request, db: Session = DBDep()):
-    user = _get_current_user_from_cookie(request, db)
+async def dashboard_page(request: Request, db: AsyncSession = AsyncDBDep()):
+    user = await _get_current_user_from_cookie(request, db)
     if not user:
         return RedirectResponse(
             url="/ui-auth/login?redirect=/ui/dashboard",
@@ -70,9 +74,9 @@ async def quran_class_request_page(
     request: Request,
     success_message: Optional[str] = None,
     error_message: Optional[str] = None,
-    db: Session = DBDep(),
+    db: AsyncSession = AsyncDBDep(),
 ):
-    user = _get_current_user_from_cookie(request, db)
+    user = await _get_current_user_from_cookie(request, db)
     profile = user.profile if user else None
 
     return templates.TemplateResponse(
@@ -96,9 +100,9 @@ async def quran_class_request_submit(
     first_name: str = Form(...),
     last_name: str = Form(...),
     level: int = Form(...),
-    db: Session = DBDep(),
+    db: AsyncSession = AsyncDBDep(),
 ):
-    user = _get_current_user_from_cookie(request, db)
+    user = await _get_current_user_from_cookie(request, db)
     profile = user.profile if user else None
 
     if level not in range(1, 10):
@@ -124,9 +128,10 @@ async def quran_class_request_submit(
     )
     try:
         db.add(request_record)
-        db.commit()
+        await db.commit()
+        invalidate_dashboard_stats()
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         logger.exception(
             "Failed to persist Quran class request. user_id=%s first_name=%s last_name=%s level=%s",
             user.id if user else None,
@@ -162,8 +167,8 @@ async def quran_class_request_submit(
 
 
 @router.get("/masir-noor")
-async def redirect_to_light_path(request: Request, db: Session = DBDep()):
-    user = _get_current_user_from_cookie(request, db)
+async def redirect_to_light_path(request: Request, db: AsyncSession = AsyncDBDep()):
+    user = await _get_current_user_from_cookie(request, db)
     if not user:
         return RedirectResponse(
             url="/ui-auth/login?redirect=/ui/dashboard/masir-noor",
@@ -185,7 +190,8 @@ async def redirect_to_light_path(request: Request, db: Session = DBDep()):
             student_number=user.student_number,
         )
     )
-    db.commit()
+    await db.commit()
+    invalidate_dashboard_stats()
 
     return RedirectResponse(
         url="http://kerman_bd/ui-auth/",
@@ -193,8 +199,8 @@ async def redirect_to_light_path(request: Request, db: Session = DBDep()):
     )
 
 @router.get("/profile", response_class=HTMLResponse)
-async def profile_view_page(request: Request, db: Session = DBDep()):
-    user = _get_current_user_from_cookie(request, db)
+async def profile_view_page(request: Request, db: AsyncSession = AsyncDBDep()):
+    user = await _get_current_user_from_cookie(request, db)
     if not user:
         return RedirectResponse(
             url="/ui-auth/login?redirect=/ui/dashboard/profile",
@@ -216,9 +222,9 @@ async def profile_edit_page(
     request: Request,
     success_message: Optional[str] = None,
     error_message: Optional[str] = None,
-    db: Session = DBDep(),
+    db: AsyncSession = AsyncDBDep(),
 ):
-    user = _get_current_user_from_cookie(request, db)
+    user = await _get_current_user_from_cookie(request, db)
     if not user:
         return RedirectResponse(
             url="/ui-auth/login?redirect=/ui/dashboard/profile/edit",
@@ -242,9 +248,9 @@ async def profile_edit_submit(
     request: Request,
     phone_number: str = Form(...),
     address: Optional[str] = Form(None),
-    db: Session = DBDep(),
+    db: AsyncSession = AsyncDBDep(),
 ):
-    user = _get_current_user_from_cookie(request, db)
+    user = await _get_current_user_from_cookie(request, db, for_update=True)
     if not user:
         return RedirectResponse(
             url="/ui-auth/login?redirect=/ui/dashboard/profile/edit",
@@ -277,15 +283,7 @@ async def profile_edit_submit(
             },
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         )
-    existing_phone = (
-        db.query(StudentProfile)
-        .filter(
-            StudentProfile.phone_number == normalized_phone,
-            StudentProfile.user_id != user.id,
-        )
-        .first()
-    )
-    if existing_phone:
+    if await is_phone_number_taken_async(db, normalized_phone, user.id):
         return templates.TemplateResponse(
             "profile/edit.html",
             {
@@ -301,9 +299,10 @@ async def profile_edit_submit(
     profile.address = address.strip() if address else None
 
     try:
-        db.commit()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
+        await db.refresh(profile)
         return templates.TemplateResponse(
             "profile/edit.html",
             {
@@ -315,6 +314,7 @@ async def profile_edit_submit(
             status_code=status.HTTP_400_BAD_REQUEST,
         )
 
+    principal_cache.invalidate(user.student_number)
     return RedirectResponse(
         url="/ui/dashboard/profile",
         status_code=status.HTTP_303_SEE_OTHER,
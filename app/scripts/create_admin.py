@@ -27,7 +27,7 @@ def create_admin_user():
 
     admin_user = User(
         student_number="00000000",
-        hashed_password=hash_password("admin123"),
+        hashed_password=hash_password("admin123", "admin"),
         role_id=admin_role.id
     )
 
@@ -0,0 +1,39 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from app.core.database import SessionLocal, create_database
+from app.services.stat_counters import read_counters, rebuild_counters
+
+
+def reconcile_counters():
+    print("=" * 50)
+    print("🔢 بازسازی شمارنده‌های آماری از جداول اصلی")
+    print("=" * 50)
+
+    create_database()
+
+    db = SessionLocal()
+    try:
+        before = read_counters(db)
+        after = rebuild_counters(db)
+    finally:
+        db.close()
+
+    drifted = 0
+    for name in sorted(set(before) | set(after)):
+        old_value = before.get(name, 0)
+        new_value = after.get(name, 0)
+        marker = "⚠️" if old_value != new_value else "✅"
+        drifted += old_value != new_value
+        print(f"  {marker} {name}: {old_value} → {new_value}")
+
+    print(f"\n{drifted} شمارنده اصلاح شد.")
+    return after
+
+
+if __name__ == "__main__":
+    reconcile_counters()
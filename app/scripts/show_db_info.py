@@ -3,57 +3,29 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.database import SessionLocal
-from app.models.user import User
-from app.models.role import Role
-from app.models.student_profile import StudentProfile
-from app.core.security import hash_password
+from app.core.database import describe_database, show_tables
 
 
-def create_admin_user():
-    db = SessionLocal()
+def show_db_info():
+    info = describe_database()
 
-    admin_role = db.query(Role).filter(Role.name == "admin").first()
+    print("=" * 50)
+    print("🗄️ اطلاعات دیتابیس")
+    print("=" * 50)
+    print(f"   آدرس: {info['database_url']}")
+    print(f"   نوع: {info['dialect']}")
+    print(f"   Pool: {info['pool_class']}")
+    print(f"   وضعیت Pool: {info['pool_status']}")
 
-    if not admin_role:
-        print("❌ نقش admin وجود ندارد. اول roles را ایجاد کنید.")
-        return None
+    pragmas = info.get("pragmas")
+    if pragmas:
+        print("\n⚙️ تنظیمات فعال SQLite:")
+        for name, value in pragmas.items():
+            print(f"  - {name} = {value}")
 
-    admin_user = db.query(User).filter(User.student_number == "00000000").first()
-
-    if admin_user:
-        print("ℹ️ کاربر ادمین از قبل وجود دارد")
-        return admin_user
-
-    admin_user = User(
-        student_number="00000000",
-        hashed_password=hash_password("admin123"),
-        role_id=admin_role.id
-    )
-
-    db.add(admin_user)
-    db.commit()
-    db.refresh(admin_user)
-
-    profile = StudentProfile(
-        user_id=admin_user.id,
-        national_code="0000000000",
-        phone_number="09120000000",
-        gender="brother",
-        address="دفتر مرکزی"
-    )
-
-    db.add(profile)
-    db.commit()
-
-    print("✅ کاربر ادمین ایجاد شد:")
-    print(f"   شماره دانشجویی: 00000000")
-    print(f"   رمز عبور: admin123")
-    print(f"   نقش: admin")
-
-    db.close()
-    return admin_user
+    show_tables()
+    return info
 
 
 if __name__ == "__main__":
-    create_admin_user()
\ No newline at end of file
+    show_db_info()
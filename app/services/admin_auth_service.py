@@ -1,43 +1,66 @@
+import asyncio
 import os
+import hashlib
+import hmac
 import logging
-from datetime import datetime, timedelta, timezone
+import sqlite3
+import time
 from threading import Lock
-from typing import Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 from jose import JWTError, jwt
 from fastapi import Request
 
-from app.core.security import create_access_token, hash_password, verify_password, SECRET_KEY, ALGORITHM
+from app.core.password_pool import PasswordHashingBusyError
+from app.core.state_store import state_store
+from app.core.security import (
+    ALGORITHM,
+    SECRET_KEY,
+    ahash_password,
+    averify_password,
+    create_access_token,
+    hash_password,
+    verify_password,
+)
 
 MAX_ADMIN_LOGIN_ATTEMPTS = int(os.getenv("ADMIN_MAX_LOGIN_ATTEMPTS", "5"))
 ADMIN_LOCKOUT_MINUTES = int(os.getenv("ADMIN_LOCKOUT_MINUTES", "15"))
+ADMIN_TOKEN_COOKIE = "admin_access_token"
+ADMIN_TOKEN_TTL_SECONDS = 60 * 60
 logger = logging.getLogger(__name__)
 
 def _looks_like_bcrypt_hash(value: str) -> bool:
     return value.startswith(("$2a$", "$2b$", "$2y$")) and len(value) >= 60
 
 
-def _resolve_admin_password_hash() -> str:
+def _configured_admin_secret() -> tuple[str | None, str | None]:
+    """``(bcrypt_hash, None)`` when a usable hash is configured, else ``(None, plain_password)``."""
     configured_hash = os.getenv("ADMIN_PASSWORD_HASH")
     if configured_hash:
         if _looks_like_bcrypt_hash(configured_hash):
             logger.debug("Using ADMIN_PASSWORD_HASH from environment for admin auth.")
-            return configured_hash
+            return configured_hash, None
 
         logger.warning(
             "ADMIN_PASSWORD_HASH is set but does not look like a bcrypt hash; "
-            "treating it as plain password and hashing once at startup."
+            "treating it as plain password and hashing it once on first use."
         )
-        return hash_password(configured_hash)
+        return None, configured_hash
 
-    fallback_password = os.getenv("ADMIN_LOGIN_PASSWORD") or os.getenv("ADMIN_DEFAULT_PASSWORD", "admin123456")
     logger.debug("ADMIN_PASSWORD_HASH not set; deriving hash from ADMIN_LOGIN_PASSWORD/ADMIN_DEFAULT_PASSWORD.")
-    return hash_password(fallback_password)
+    return None, os.getenv("ADMIN_LOGIN_PASSWORD") or os.getenv("ADMIN_DEFAULT_PASSWORD", "admin123456")
+
+
+def _resolve_admin_password_hash() -> str:
+    configured_hash, plain_password = _configured_admin_secret()
+    return configured_hash or hash_password(plain_password, "admin")
 
 
-_ADMIN_PASSWORD_HASH = _resolve_admin_password_hash()
+FAILED_ATTEMPTS_NAMESPACE = "admin_login_failures"
+LOCKOUTS_NAMESPACE = "admin_login_lockouts"
+# token -> keyed digest of the password it was issued for; lets a re-login skip bcrypt.
+VERIFIED_SESSIONS_NAMESPACE = "admin_verified_sessions"
 
-_failed_attempts: Dict[str, Dict[str, datetime | int]] = {}
-_attempts_lock = Lock()
+BUSY_MESSAGE = "سامانه در حال حاضر شلوغ است. لطفاً چند لحظه دیگر تلاش کنید."
 
 
 def get_client_identifier(request: Request) -> str:
@@ -46,62 +69,256 @@ def get_client_identifier(request: Request) -> str:
         return forwarded_for.split(",")[0].strip()
     return request.client.host if request.client else "unknown"
 
-def is_locked_out(request: Request) -> tuple[bool, int]:
-    key = get_client_identifier(request)
-    now = datetime.now(timezone.utc)
 
-    with _attempts_lock:
-        entry = _failed_attempts.get(key)
-        if not entry:
-            return False, 0
+def _lockout_message(minutes: int) -> str:
+    return f"ورود شما موقتاً قفل شده است. لطفاً {minutes} دقیقه دیگر تلاش کنید."
 
-        locked_until = entry.get("locked_until")
-        if isinstance(locked_until, datetime) and locked_until > now:
-            remaining_seconds = int((locked_until - now).total_seconds())
-            return True, max(1, remaining_seconds // 60)
 
-        if isinstance(locked_until, datetime) and locked_until <= now:
-            _failed_attempts.pop(key, None)
+def is_locked_out(request: Request) -> tuple[bool, int]:
+    locked_until = state_store.get(LOCKOUTS_NAMESPACE, get_client_identifier(request))
+    now = time.time()
+    if locked_until and locked_until > now:
+        remaining_seconds = int(locked_until - now)
+        return True, max(1, remaining_seconds // 60)
 
     return False, 0
 
+
+def _lock_client(key: str) -> str:
+    lockout_seconds = ADMIN_LOCKOUT_MINUTES * 60
+    state_store.set(LOCKOUTS_NAMESPACE, key, time.time() + lockout_seconds, lockout_seconds)
+    state_store.delete(FAILED_ATTEMPTS_NAMESPACE, key)
+    return f"به دلیل ورود ناموفق متوالی، دسترسی شما به مدت {ADMIN_LOCKOUT_MINUTES} دقیقه قفل شد."
+
+
+def _reserve_attempt(key: str) -> int:
+    # The attempt is counted before bcrypt runs and un-counted on success. incr is atomic in the
+    # shared store, so concurrent attempts from several workers can never exceed the limit together.
+    return state_store.incr(FAILED_ATTEMPTS_NAMESPACE, key, ADMIN_LOCKOUT_MINUTES * 60)
+
+
+def _release_attempt(key: str) -> None:
+    state_store.incr(FAILED_ATTEMPTS_NAMESPACE, key, ADMIN_LOCKOUT_MINUTES * 60, -1)
+
+
+def _failed_attempt_message(key: str, count: int) -> str:
+    if count >= MAX_ADMIN_LOGIN_ATTEMPTS:
+        return _lock_client(key)
+    remaining = MAX_ADMIN_LOGIN_ATTEMPTS - count
+    return f"رمز عبور ادمین اشتباه است. {remaining} تلاش دیگر باقی مانده است."
+
+
 def _register_failed_attempt(request: Request) -> str:
     key = get_client_identifier(request)
-    now = datetime.now(timezone.utc)
-    with _attempts_lock:
-        entry = _failed_attempts.get(key, {"count": 0, "locked_until": None})
-        entry["count"] = int(entry["count"]) + 1
-        if entry["count"] >= MAX_ADMIN_LOGIN_ATTEMPTS:
-            entry["locked_until"] = now + timedelta(minutes=ADMIN_LOCKOUT_MINUTES)
-            _failed_attempts[key] = entry
-            return f"به دلیل ورود ناموفق متوالی، دسترسی شما به مدت {ADMIN_LOCKOUT_MINUTES} دقیقه قفل شد."
-        _failed_attempts[key] = entry
-        remaining = MAX_ADMIN_LOGIN_ATTEMPTS - int(entry["count"])
+    return _failed_attempt_message(key, _reserve_attempt(key))
+
+
+class AdminPasswordVerifier:
+    """Checks the admin password: lockout first, then the per-token cache, then bcrypt.
+
+    The bcrypt hash is resolved on first use rather than at import. Attempts are
+    reserved in the shared state store before hashing, so a locked-out or
+    over-limit client never costs a bcrypt round, on any worker.
+    """
+
+    def __init__(
+        self,
+        resolve_hash: Callable[[], str] = _resolve_admin_password_hash,
+        resolve_hash_async: Optional[Callable[[], Awaitable[str]]] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self._resolve_hash = resolve_hash
+        self._resolve_hash_async = resolve_hash_async
+        self._clock = clock
+        self._password_hash: Optional[str] = None
+        self._lock = Lock()
+        self._metrics = {
+            "attempts": 0,
+            "locked_out": 0,
+            "cache_hits": 0,
+            "verified": 0,
+            "rejected": 0,
+            "busy": 0,
+            "bcrypt_calls": 0,
+            "bcrypt_total_ms": 0.0,
+            "bcrypt_max_ms": 0.0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._metrics[name] += 1
+
+    def _record_bcrypt(self, started: float) -> None:
+        elapsed_ms = (self._clock() - started) * 1000
+        with self._lock:
+            self._metrics["bcrypt_calls"] += 1
+            self._metrics["bcrypt_total_ms"] += elapsed_ms
+            self._metrics["bcrypt_max_ms"] = max(self._metrics["bcrypt_max_ms"], elapsed_ms)
+
+    def password_hash(self) -> str:
+        if self._password_hash is None:
+            resolved = self._resolve_hash()
+            with self._lock:
+                self._password_hash = self._password_hash or resolved
+        return self._password_hash
+
+    async def password_hash_async(self) -> str:
+        if self._password_hash is None and self._resolve_hash_async is not None:
+            resolved = await self._resolve_hash_async()
+            with self._lock:
+                self._password_hash = self._password_hash or resolved
+        return self.password_hash()
+
+    @staticmethod
+    def _digest(password: str) -> str:
+        return hmac.new(SECRET_KEY.encode("utf-8"), password.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def remember(self, token: str, password: str) -> None:
+        """Cache that ``password`` verified for the session ``token`` for as long as the token lives."""
+        try:
+            state_store.set(VERIFIED_SESSIONS_NAMESPACE, token, self._digest(password.strip()), ADMIN_TOKEN_TTL_SECONDS)
+        except sqlite3.OperationalError as exc:
+            # Only a shortcut for the next login; the session itself does not depend on it.
+            logger.warning("⚠️ Could not cache admin session: %s", exc)
+
+    def forget(self, token: Optional[str]) -> None:
+        if not token:
+            return
+        try:
+            state_store.delete(VERIFIED_SESSIONS_NAMESPACE, token)
+        except sqlite3.OperationalError as exc:
+            logger.warning("⚠️ Could not drop cached admin session: %s", exc)
+
+    def _cached(self, request: Request, password: str) -> bool:
+        token = request.cookies.get(ADMIN_TOKEN_COOKIE)
+        cached_digest = state_store.get(VERIFIED_SESSIONS_NAMESPACE, token) if token else None
+        return bool(cached_digest) and hmac.compare_digest(cached_digest, self._digest(password))
+
+    def _precheck(self, request: Request, password: str) -> tuple[Optional[tuple[bool, str | None]], str, int]:
+        """Everything that happens before bcrypt; returns an early result or the reserved attempt."""
+        self._count("attempts")
+        locked, minutes = is_locked_out(request)
+        if locked:
+            self._count("locked_out")
+            return (False, _lockout_message(minutes)), "", 0
+
+        if self._cached(request, password):
+            self._count("cache_hits")
+            clear_failed_attempts(request)
+            return (True, None), "", 0
+
+        key = get_client_identifier(request)
+        count = _reserve_attempt(key)
+        if count > MAX_ADMIN_LOGIN_ATTEMPTS:
+            # Other attempts already used up the budget while this one was in flight.
+            self._count("locked_out")
+            return (False, _lock_client(key)), key, count
+        return None, key, count
+
+    def _finish(self, request: Request, key: str, count: int, verified: bool) -> tuple[bool, str | None]:
+        if verified:
+            self._count("verified")
+            clear_failed_attempts(request)
+            return True, None
+        self._count("rejected")
+        return False, _failed_attempt_message(key, count)
+
+    def authenticate(self, request: Request, password: str) -> tuple[bool, str | None]:
+        password = password.strip()
+        early, key, count = self._precheck(request, password)
+        if early:
+            return early
+
+        password_hash = self.password_hash()
+        started = self._clock()
+        verified = verify_password(password, password_hash)
+        self._record_bcrypt(started)
+        return self._finish(request, key, count, verified)
+
+    def _store_unavailable(self, error: sqlite3.OperationalError) -> tuple[bool, str | None]:
+        logger.warning("⚠️ Admin login state store unavailable: %s", error)
+        self._count("busy")
+        return False, BUSY_MESSAGE
+
+    async def authenticate_async(self, request: Request, password: str) -> tuple[bool, str | None]:
+        # State-store calls can wait on another worker's sqlite write lock, so they run off the event loop.
+        password = password.strip()
+        try:
+            early, key, count = await asyncio.to_thread(self._precheck, request, password)
+        except sqlite3.OperationalError as exc:
+            return self._store_unavailable(exc)
+        if early:
+            return early
+
+        try:
+            password_hash = await self.password_hash_async()
+            started = self._clock()
+            verified = await averify_password(password, password_hash)
+        except PasswordHashingBusyError:
+            # The pool refused the work, so this was not a real attempt; hand the slot back.
+            try:
+                await asyncio.to_thread(_release_attempt, key)
+            except sqlite3.OperationalError as exc:
+                logger.warning("⚠️ Could not hand back admin login attempt: %s", exc)
+            self._count("busy")
+            return False, BUSY_MESSAGE
+        self._record_bcrypt(started)
+        try:
+            return await asyncio.to_thread(self._finish, request, key, count, verified)
+        except sqlite3.OperationalError as exc:
+            return self._store_unavailable(exc)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        calls = metrics["bcrypt_calls"]
+        metrics["bcrypt_avg_ms"] = round(metrics["bcrypt_total_ms"] / calls, 2) if calls else 0.0
+        metrics["bcrypt_total_ms"] = round(metrics["bcrypt_total_ms"], 2)
+        metrics["bcrypt_max_ms"] = round(metrics["bcrypt_max_ms"], 2)
+        return metrics
+
+
+async def _resolve_admin_password_hash_async() -> str:
+    configured_hash, plain_password = _configured_admin_secret()
+    return configured_hash or await ahash_password(plain_password, "admin")
+
+
+admin_verifier = AdminPasswordVerifier(resolve_hash_async=_resolve_admin_password_hash_async)
 
-    return f"رمز عبور ادمین اشتباه است. {remaining} تلاش دیگر باقی مانده است."
 
 def authenticate_admin_password(request: Request, password: str) -> tuple[bool, str | None]:
-    locked, minutes = is_locked_out(request)
-    if locked:
-        return False, f"ورود شما موقتاً قفل شده است. لطفاً {minutes} دقیقه دیگر تلاش کنید."
+    return admin_verifier.authenticate(request, password)
 
-    if verify_password(password.strip(), _ADMIN_PASSWORD_HASH):
-        clear_failed_attempts(request)
-        return True, None
 
-    return False, _register_failed_attempt(request)
+async def authenticate_admin_password_async(request: Request, password: str) -> tuple[bool, str | None]:
+    """Same as authenticate_admin_password, but bcrypt runs on the shared hashing pool."""
+    return await admin_verifier.authenticate_async(request, password)
+
 
 def clear_failed_attempts(request: Request) -> None:
-    with _attempts_lock:
-        _failed_attempts.pop(get_client_identifier(request), None)
+    key = get_client_identifier(request)
+    state_store.delete(FAILED_ATTEMPTS_NAMESPACE, key)
+    state_store.delete(LOCKOUTS_NAMESPACE, key)
 
 
 def create_admin_token() -> str:
     return create_access_token(data={"sub": "admin", "role": "admin"})
 
 
+def create_admin_session_token(password: str) -> str:
+    """Issue an admin token and remember its verified password so re-logins skip bcrypt."""
+    token = create_admin_token()
+    admin_verifier.remember(token, password)
+    return token
+
+
+async def create_admin_session_token_async(password: str) -> str:
+    """Same as create_admin_session_token, with the state-store write kept off the event loop."""
+    return await asyncio.to_thread(create_admin_session_token, password)
+
+
 def is_admin_authenticated(request: Request) -> bool:
-    token = request.cookies.get("admin_access_token")
+    token = request.cookies.get(ADMIN_TOKEN_COOKIE)
     if not token:
         return False
 
@@ -0,0 +1,184 @@
+import csv
+from datetime import datetime
+from io import StringIO
+from tempfile import SpooledTemporaryFile
+from typing import IO, Callable, Iterator, Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.core.confing import settings
+from app.models.audit_log import AuditLog
+
+try:
+    from openpyxl import Workbook
+except ModuleNotFoundError:  # pragma: no cover - depends on the deployment
+    Workbook = None
+
+EXPORT_CHUNK_SIZE = 1000
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_SHEET_TITLE = "Audit Logs"
+FILE_STREAM_BLOCK_SIZE = 64 * 1024
+
+AUDIT_EXPORT_HEADERS = [
+    "ID", "User ID", "Action", "Entity", "Entity ID", "Description", "IP Address", "Created At",
+]
+
+AUDIT_EXPORT_COLUMNS = (
+    AuditLog.id,
+    AuditLog.user_id,
+    AuditLog.action,
+    AuditLog.entity,
+    AuditLog.entity_id,
+    AuditLog.description,
+    AuditLog.ip_address,
+    AuditLog.created_at,
+)
+
+
+def audit_log_export_statement(
+        user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+) -> Select:
+    """Column-only SELECT for exports; avoids building AuditLog entities per row."""
+    statement = select(*AUDIT_EXPORT_COLUMNS)
+    if user_id:
+        statement = statement.where(AuditLog.user_id == user_id)
+    if action:
+        statement = statement.where(AuditLog.action == action)
+    if date_from:
+        statement = statement.where(AuditLog.created_at >= date_from)
+    if date_to:
+        statement = statement.where(AuditLog.created_at <= date_to)
+    return statement.order_by(AuditLog.created_at.desc())
+
+
+ProgressCallback = Callable[[int], None]
+
+
+def iter_audit_log_chunks(
+        db: Session,
+        statement: Select,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        on_progress: Optional[ProgressCallback] = None,
+) -> Iterator[Sequence[tuple]]:
+    """Yield row tuples in fixed-size chunks from a server-side cursor.
+
+    ``on_progress`` receives the running row count after each chunk.
+    """
+    result = db.execute(
+        statement.execution_options(stream_results=True, yield_per=chunk_size)
+    )
+    rows_seen = 0
+    try:
+        for partition in result.partitions(chunk_size):
+            yield partition
+            rows_seen += len(partition)
+            if on_progress is not None:
+                on_progress(rows_seen)
+    finally:
+        result.close()
+
+
+def iter_audit_log_csv(
+        db: Session,
+        statement: Select,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        on_progress: Optional[ProgressCallback] = None,
+) -> Iterator[bytes]:
+    """Encode the export as UTF-8 CSV blocks, one block per fetched chunk."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(AUDIT_EXPORT_HEADERS)
+    yield buffer.getvalue().encode("utf-8")
+
+    for rows in iter_audit_log_chunks(db, statement, chunk_size, on_progress):
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def excel_export_available() -> bool:
+    return Workbook is not None
+
+
+def _excel_row(row: Sequence) -> list:
+    values = list(row)
+    created_at = values[-1]
+    values[-1] = created_at.strftime("%Y-%m-%d %H:%M") if created_at else None
+    return values
+
+
+def write_audit_log_xlsx(
+        db: Session,
+        statement: Select,
+        target: IO[bytes],
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        max_rows_per_sheet: int = EXCEL_MAX_ROWS,
+        on_progress: Optional[ProgressCallback] = None,
+) -> int:
+    """Write the export with write-only worksheets, starting a new sheet at the row cap.
+
+    Returns the number of data rows written.
+    """
+    if Workbook is None:
+        raise RuntimeError("openpyxl is not installed")
+    if max_rows_per_sheet < 2:
+        raise ValueError("max_rows_per_sheet must leave room for the header row")
+
+    workbook = Workbook(write_only=True)
+    sheet_index = 0
+    sheet_rows = max_rows_per_sheet
+    worksheet = None
+    total_rows = 0
+
+    for rows in iter_audit_log_chunks(db, statement, chunk_size, on_progress):
+        for row in rows:
+            if sheet_rows >= max_rows_per_sheet:
+                sheet_index += 1
+                title = EXCEL_SHEET_TITLE if sheet_index == 1 else f"{EXCEL_SHEET_TITLE} {sheet_index}"
+                worksheet = workbook.create_sheet(title)
+                worksheet.append(AUDIT_EXPORT_HEADERS)
+                sheet_rows = 1
+            worksheet.append(_excel_row(row))
+            sheet_rows += 1
+            total_rows += 1
+
+    if worksheet is None:
+        worksheet = workbook.create_sheet(EXCEL_SHEET_TITLE)
+        worksheet.append(AUDIT_EXPORT_HEADERS)
+
+    workbook.save(target)
+    return total_rows
+
+
+def build_audit_log_xlsx(
+        db: Session,
+        statement: Select,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> SpooledTemporaryFile:
+    """Render the workbook into a spooled file that moves to disk past the threshold."""
+    spool = SpooledTemporaryFile(max_size=settings.export_spool_max_bytes, mode="w+b")
+    try:
+        write_audit_log_xlsx(db, statement, spool, chunk_size)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def iter_file(file: IO[bytes], block_size: int = FILE_STREAM_BLOCK_SIZE) -> Iterator[bytes]:
+    """Stream a file in blocks and close it once exhausted."""
+    try:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+            yield block
+    finally:
+        file.close()
@@ -0,0 +1,273 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.confing import settings
+from app.core.database import SessionLocal
+from app.services.audit_export import (
+    audit_log_export_statement,
+    iter_audit_log_csv,
+    write_audit_log_xlsx,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv.gz": ("csv.gz", "application/gzip"),
+}
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class ExportJob:
+    id: str
+    format: str
+    filters: Dict[str, Any]
+    cache_key: str
+    status: str = JOB_PENDING
+    rows_written: int = 0
+    total_rows: Optional[int] = None
+    artifact_path: Optional[str] = None
+    error: Optional[str] = None
+    reused: bool = False
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == JOB_DONE:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return min(1.0, self.rows_written / self.total_rows)
+
+    @property
+    def filename(self) -> str:
+        extension, _ = EXPORT_FORMATS[self.format]
+        return f"audit_logs.{extension}"
+
+    @property
+    def media_type(self) -> str:
+        _, media_type = EXPORT_FORMATS[self.format]
+        return media_type
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["progress"] = round(self.progress, 4)
+        return data
+
+
+def _serialize_filter(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def export_cache_key(export_format: str, filters: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {"format": export_format, "filters": {k: _serialize_filter(v) for k, v in sorted(filters.items())}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class ExportJobManager:
+    """Runs audit log exports on a worker pool and keeps artifacts in a spool directory.
+
+    Job state is mirrored to ``<spool>/jobs/<id>.json`` so any uvicorn worker can
+    report progress, and finished artifacts are named by their filter hash so an
+    identical request within ``artifact_ttl`` seconds reuses the existing file.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        spool_dir: str,
+        *,
+        max_workers: int = 2,
+        artifact_ttl: int = 600,
+        chunk_size: int = 1000,
+    ):
+        self.session_factory = session_factory
+        self.spool_dir = Path(spool_dir)
+        self.max_workers = max(1, max_workers)
+        self.artifact_ttl = artifact_ttl
+        self.chunk_size = chunk_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = Lock()
+
+    @property
+    def jobs_dir(self) -> Path:
+        return self.spool_dir / "jobs"
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self.jobs_dir.mkdir(parents=True, exist_ok=True)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="audit-export",
+                )
+            return self._executor
+
+    def _artifact_path(self, export_format: str, cache_key: str) -> Path:
+        extension, _ = EXPORT_FORMATS[export_format]
+        return self.spool_dir / f"{cache_key}.{extension}"
+
+    def _artifact_is_fresh(self, path: Path) -> bool:
+        try:
+            return time.time() - path.stat().st_mtime < self.artifact_ttl
+        except FileNotFoundError:
+            return False
+
+    def _save(self, job: ExportJob) -> None:
+        path = self.jobs_dir / f"{job.id}.json"
+        temp_path = path.with_suffix(".json.tmp")
+        temp_path.write_text(json.dumps(job.to_dict()), encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def submit(self, export_format: str, filters: Dict[str, Any]) -> ExportJob:
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        executor = self._get_executor()
+        self.purge_expired()
+        cache_key = export_cache_key(export_format, filters)
+        artifact_path = self._artifact_path(export_format, cache_key)
+
+        with self._lock:
+            for existing in self._jobs.values():
+                if existing.cache_key == cache_key and existing.status in {JOB_PENDING, JOB_RUNNING}:
+                    return existing
+
+            job = ExportJob(
+                id=uuid.uuid4().hex,
+                format=export_format,
+                filters={k: _serialize_filter(v) for k, v in filters.items()},
+                cache_key=cache_key,
+            )
+            if self._artifact_is_fresh(artifact_path):
+                job.status = JOB_DONE
+                job.reused = True
+                job.artifact_path = str(artifact_path)
+                job.finished_at = time.time()
+            self._jobs[job.id] = job
+
+        self._save(job)
+        if job.status == JOB_PENDING:
+            executor.submit(self._run, job, filters)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        if not job_id.isalnum():
+            return None
+        path = self.jobs_dir / f"{job_id}.json"
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        data.pop("progress", None)
+        return ExportJob(**data)
+
+    def _run(self, job: ExportJob, filters: Dict[str, Any]) -> None:
+        job.status = JOB_RUNNING
+        self._save(job)
+        statement = audit_log_export_statement(**filters)
+        final_path = self._artifact_path(job.format, job.cache_key)
+        temp_path = final_path.with_name(f"{final_path.name}.{job.id}.part")
+
+        def on_progress(rows_written: int) -> None:
+            job.rows_written = rows_written
+            self._save(job)
+
+        db = self.session_factory()
+        try:
+            job.total_rows = db.execute(
+                select(func.count()).select_from(statement.order_by(None).subquery())
+            ).scalar() or 0
+            self._save(job)
+
+            if job.format == "xlsx":
+                with open(temp_path, "wb") as target:
+                    write_audit_log_xlsx(db, statement, target, self.chunk_size, on_progress=on_progress)
+            else:
+                opener = gzip.open if job.format == "csv.gz" else open
+                with opener(temp_path, "wb") as target:
+                    for block in iter_audit_log_csv(db, statement, self.chunk_size, on_progress):
+                        target.write(block)
+
+            os.replace(temp_path, final_path)
+            job.artifact_path = str(final_path)
+            job.status = JOB_DONE
+        except Exception as exc:
+            logger.exception("Audit export job %s failed", job.id)
+            job.status = JOB_FAILED
+            job.error = str(exc)
+            temp_path.unlink(missing_ok=True)
+        finally:
+            db.close()
+            job.finished_at = time.time()
+            self._save(job)
+
+    def purge_expired(self) -> int:
+        """Forget finished jobs and delete artifacts and job files older than the TTL."""
+        removed = 0
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.finished_at is not None and now - job.finished_at >= self.artifact_ttl
+            ]
+            for job_id in expired:
+                self._jobs.pop(job_id, None)
+        for directory in (self.spool_dir, self.jobs_dir):
+            if not directory.exists():
+                continue
+            for path in directory.iterdir():
+                try:
+                    is_stale = path.is_file() and now - path.stat().st_mtime >= self.artifact_ttl
+                except FileNotFoundError:
+                    continue
+                if is_stale:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+export_job_manager = ExportJobManager(
+    SessionLocal,
+    settings.export_spool_dir,
+    max_workers=settings.export_job_workers,
+    artifact_ttl=settings.export_artifact_ttl_seconds,
+)
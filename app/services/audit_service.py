@@ -1,11 +1,24 @@
 from fastapi import Request
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import Dict, Any
+from typing import Dict
 
 from app.models.audit_log import AuditLog
 from app.models.user import User
+from app.core.confing import settings
+from app.core.database import SessionLocal
+from app.core.jalali import format_jalali, gregorian_to_jalali
+from app.services.audit_sink import AuditSink
+
+
+audit_sink = AuditSink(
+    SessionLocal,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval_ms / 1000,
+    max_buffer=settings.audit_max_buffer,
+    overflow_policy=settings.audit_overflow_policy,
+)
 
 
 def create_audit_log(
@@ -17,15 +30,20 @@ def create_audit_log(
         entity_id: int | None = None,
         description: str | None = None,
 ):
-    log = AuditLog(
-        user_id=user.id if user else None,
-        action=action,
-        entity=entity,
-        entity_id=entity_id,
-        description=description,
-        ip_address=request.client.host if request.client else None,
-    )
-    db.add(log)
+    record = {
+        "user_id": user.id if user else None,
+        "action": action,
+        "entity": entity,
+        "entity_id": entity_id,
+        "description": description,
+        "ip_address": request.client.host if request.client else None,
+        "created_at": datetime.now(timezone.utc),
+    }
+    if audit_sink.running:
+        audit_sink.enqueue(record)
+        return
+
+    db.add(AuditLog(**record))
     db.commit()
 
 
@@ -44,49 +62,11 @@ def get_simple_audit_stats(db: Session) -> Dict:
         "total_changes": total_changes,
     }
 
-def _gregorian_to_jalali(gy: int, gm: int, gd: int) -> tuple[int | Any, int | Any, int | Any]:
-    g_days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-    j_days_in_month = [31, 31, 31, 31, 31, 31, 30, 30, 30, 30, 30, 29]
-
-    gy -= 1600
-    gm -= 1
-    gd -= 1
-
-    g_day_no = 365 * gy + (gy + 3) // 4 - (gy + 99) // 100 + (gy + 399) // 400
-    for i in range(gm):
-        g_day_no += g_days_in_month[i]
-    if gm > 1 and ((gy % 4 == 0 and gy % 100 != 0) or (gy % 400 == 0)):
-        g_day_no += 1
-    g_day_no += gd
-
-    j_day_no = g_day_no - 79
-    j_np = j_day_no // 12053
-    j_day_no %= 12053
-
-
-    jy = 979 + 33 * j_np + 4 * (j_day_no // 1461)
-    j_day_no %= 1461
-
-    if j_day_no >= 366:
-        jy += (j_day_no - 1) // 365
-        j_day_no = (j_day_no - 1) % 365
-
-    jm = 0
-    while jm < 11 and j_day_no >= j_days_in_month[jm]:
-        j_day_no -= j_days_in_month[jm]
-        jm += 1
-
-    jd = j_day_no + 1
-    return jy, jm + 1, jd
+def _gregorian_to_jalali(gy: int, gm: int, gd: int) -> tuple[int, int, int]:
+    return gregorian_to_jalali(gy, gm, gd)
 
 
 def format_persian_datetime(dt: datetime, include_time: bool = False) -> str:
-    if not dt:
-        return ""
-    jy, jm, jd = _gregorian_to_jalali(dt.year, dt.month, dt.day)
-    date_part = f"{jy:04d}-{jm:02d}-{jd:02d}"
-    if include_time:
-        return f"{date_part} {dt.strftime('%H:%M:%S')}"
-    return date_part
+    return format_jalali(dt, include_time)
 
 
@@ -0,0 +1,186 @@
+import logging
+import time
+from collections import deque
+from threading import Condition, Thread
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.audit_log import AuditLog
+from app.services.stat_counters import apply_counter_deltas, audit_log_deltas
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = {"drop_oldest", "drop_newest", "block"}
+
+
+class AuditSink:
+    """In-process audit buffer flushed to the database in bulk INSERTs.
+
+    Records are flushed when ``batch_size`` rows are pending or when the oldest
+    pending row is ``flush_interval`` seconds old, whichever comes first. The
+    buffer holds at most ``max_buffer`` rows; ``overflow_policy`` decides what
+    happens when it is full.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        max_buffer: int = 10000,
+        overflow_policy: str = "drop_oldest",
+        block_timeout: float = 1.0,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported audit overflow policy: {overflow_policy}")
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.01, flush_interval)
+        self.max_buffer = max(self.batch_size, max_buffer)
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+        self._running = False
+        self._oldest_enqueued_at: Optional[float] = None
+        self._counters = {
+            "enqueued": 0,
+            "flushed": 0,
+            "dropped": 0,
+            "batches": 0,
+            "flush_errors": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = Thread(target=self._run, name="audit-sink", daemon=True)
+            self._thread.start()
+        logger.info("Audit sink started (batch_size=%s, flush_interval=%ss)", self.batch_size, self.flush_interval)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the worker and flush everything still buffered."""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+        logger.info("Audit sink stopped: %s", self.stats())
+
+    def enqueue(self, record: Dict[str, Any]) -> bool:
+        with self._condition:
+            if len(self._buffer) >= self.max_buffer and not self._make_room():
+                self._counters["dropped"] += 1
+                return False
+            if not self._buffer:
+                self._oldest_enqueued_at = time.monotonic()
+            self._buffer.append(record)
+            self._counters["enqueued"] += 1
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+            return True
+
+    def _make_room(self) -> bool:
+        # Caller holds the condition lock.
+        if self.overflow_policy == "drop_oldest":
+            self._buffer.popleft()
+            self._counters["dropped"] += 1
+            return True
+        if self.overflow_policy == "block":
+            self._condition.notify_all()
+            deadline = time.monotonic() + self.block_timeout
+            while len(self._buffer) >= self.max_buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._running:
+                    return False
+                self._condition.wait(remaining)
+            return True
+        return False
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        # Caller holds the condition lock.
+        count = min(self.batch_size, len(self._buffer))
+        batch = [self._buffer.popleft() for _ in range(count)]
+        self._oldest_enqueued_at = time.monotonic() if self._buffer else None
+        self._condition.notify_all()
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and not self._batch_due():
+                    self._condition.wait(self._wait_timeout())
+                if not self._running:
+                    return
+                batch = self._take_batch()
+            self._write(batch)
+
+    def _batch_due(self) -> bool:
+        if len(self._buffer) >= self.batch_size:
+            return True
+        if self._oldest_enqueued_at is None:
+            return False
+        return time.monotonic() - self._oldest_enqueued_at >= self.flush_interval
+
+    def _wait_timeout(self) -> Optional[float]:
+        if self._oldest_enqueued_at is None:
+            return None
+        return max(0.0, self.flush_interval - (time.monotonic() - self._oldest_enqueued_at))
+
+    def flush(self) -> int:
+        """Synchronously write every buffered row; returns how many were flushed."""
+        written = 0
+        while True:
+            with self._condition:
+                if not self._buffer:
+                    return written
+                batch = self._take_batch()
+            written += self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> int:
+        if not batch:
+            return 0
+        db = self.session_factory()
+        try:
+            db.execute(insert(AuditLog), batch)
+            # Core inserts skip the ORM flush hook, so count the batch in the same transaction here.
+            apply_counter_deltas(db.connection(), audit_log_deltas(batch))
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to flush %s audit log records", len(batch))
+            with self._condition:
+                self._counters["flush_errors"] += 1
+                self._counters["dropped"] += len(batch)
+            return 0
+        finally:
+            db.close()
+
+        with self._condition:
+            self._counters["flushed"] += len(batch)
+            self._counters["batches"] += 1
+        return len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                **self._counters,
+                "buffered": len(self._buffer),
+                "running": self._running,
+                "overflow_policy": self.overflow_policy,
+            }
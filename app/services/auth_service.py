@@ -1,27 +1,40 @@
 
 import logging
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
 
+from sqlalchemy import false, select, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 from datetime import timedelta
 from app.models.user import User
 from app.models.role import Role
 from app.models.student_profile import StudentProfile
 from app.schemas.auth import RegisterRequest
+from app.core.confing import settings
+from app.core.password_pool import PasswordHashingBusyError
+from app.core.principal_cache import principal_cache
 from app.core.security import (
+    ahash_password,
+    averify_password,
     hash_password,
+    password_hashing_pool,
+    password_policy,
     verify_password,
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     MAX_BCRYPT_PASSWORD_BYTES,
 )
-from app.core.validators import normalize_digits
+from app.core.validators import normalize_digits, passes_national_code_checksum
+from app.services.uniqueness import registration_probe
 
 logger = logging.getLogger(__name__)
 
-def register_user(db: Session, data: RegisterRequest):
-
+def _normalize_registration(data: RegisterRequest) -> tuple[str, str, str]:
 
     student_number = normalize_digits(data.student_number)
     national_code = normalize_digits(data.national_code)
@@ -40,35 +53,83 @@ def register_user(db: Session, data: RegisterRequest):
             detail="شماره دانشجویی نباید بیشتر از ۷۲ بایت باشد."
         )
 
+    return student_number, national_code, phone_number
 
-    existing_user = db.query(User).filter(
-        User.student_number == student_number).first()
 
-    existing_national_code = db.query(StudentProfile).filter(
-        StudentProfile.national_code == national_code
-    ).first()
-    existing_profile_student_number = db.query(StudentProfile).filter(
-        StudentProfile.student_number == student_number
-    ).first()
-    existing_phone_number = db.query(StudentProfile).filter(
-        StudentProfile.phone_number == phone_number
-    ).first()
+def _registration_values(normalized: tuple[str, str, str]) -> dict:
+    student_number, national_code, phone_number = normalized
+    return {"student_number": student_number, "national_code": national_code, "phone_number": phone_number}
 
-    if existing_user or existing_profile_student_number:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="این شماره دانشجویی قبلاً ثبت شده است"
-        )
-    if existing_national_code:
-        raise HTTPException(
+
+def _probe_before_insert() -> bool:
+    # "optimistic" skips the probe and relies on the unique indexes, probing only after a failed insert.
+    return settings.registration_uniqueness_mode != "optimistic"
+
+
+def _build_registered_user(
+        data: RegisterRequest,
+        normalized: tuple[str, str, str],
+        hashed_password: str,
+        role: Role,
+) -> User:
+    student_number, national_code, phone_number = normalized
+    user = User(
+        student_number=student_number,
+        hashed_password=hashed_password,
+        role=role,
+    )
+    user.profile = StudentProfile(
+        first_name=data.first_name,
+        last_name=data.last_name,
+        national_code=national_code,
+        student_number=student_number,
+        phone_number=phone_number,
+        gender=data.gender.value if hasattr(data.gender, "value") else data.gender,
+        address=data.address
+    )
+    return user
+
+
+def _registration_error(exc: Exception) -> HTTPException:
+    if isinstance(exc, IntegrityError):
+        logging.exception("Integrity error while registering user.")
+        return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="کد ملی قبلاً ثبت شده است"
+            detail="اطلاعات وارد شده تکراری یا نامعتبر است."
         )
-    if existing_phone_number:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="این شماره تلفن قبلاً ثبت شده است"
+    if isinstance(exc, ValueError):
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc)
         )
+    logging.exception("Database error while registering user.")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="ثبت‌نام با خطا مواجه شد. لطفاً دوباره تلاش کنید."
+    )
+
+
+def _log_registration_success(user: User, normalized: tuple[str, str, str]) -> None:
+    logger.info(
+        "Register success: user_id=%s national_code=%s student_number=%s",
+        user.id,
+        normalized[1],
+        normalized[0],
+    )
+
+
+def _hashing_busy_exception(exc: PasswordHashingBusyError) -> HTTPException:
+    logger.warning("Password hashing pool saturated: %s", password_hashing_pool.stats())
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="سامانه در حال حاضر شلوغ است. لطفاً چند لحظه دیگر تلاش کنید.",
+    )
+
+
+def register_user(db: Session, data: RegisterRequest):
+    normalized = _normalize_registration(data)
+    if _probe_before_insert():
+        registration_probe.ensure_unique(db, **_registration_values(normalized))
 
     try:
         role = db.query(Role).filter(Role.name == "user").first()
@@ -78,116 +139,390 @@ def register_user(db: Session, data: RegisterRequest):
             db.add(role)
             db.flush()
 
+        user = _build_registered_user(data, normalized, hash_password(normalized[0], "user"), role)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    except (SQLAlchemyError, ValueError) as exc:
+        db.rollback()
+        if isinstance(exc, IntegrityError):
+            registration_probe.ensure_unique(db, **_registration_values(normalized))
+        raise _registration_error(exc) from exc
 
-        hashed_password = hash_password(student_number)
+    _log_registration_success(user, normalized)
+    return user
 
 
-        user = User(
-            student_number=student_number,
-            hashed_password=hashed_password,
-            role_id=role.id
-        )
+async def register_user_async(db: AsyncSession, data: RegisterRequest):
+    """Async-session variant of register_user; bcrypt runs on the shared hashing pool."""
+    normalized = _normalize_registration(data)
+    if _probe_before_insert():
+        await registration_probe.ensure_unique_async(db, **_registration_values(normalized))
+
+    try:
+        hashed_password = await ahash_password(normalized[0], "user")
+    except PasswordHashingBusyError as exc:
+        raise _hashing_busy_exception(exc) from exc
+    except ValueError as exc:
+        raise _registration_error(exc) from exc
+
+    try:
+        role = (await db.execute(select(Role).where(Role.name == "user"))).scalars().first()
+
+        if not role:
+            role = Role(name="user", description="کاربر عادی")
+            db.add(role)
+            await db.flush()
 
+        user = _build_registered_user(data, normalized, hashed_password, role)
         db.add(user)
-        db.flush()
-
-        profile = StudentProfile(
-            user_id=user.id,
-            first_name=data.first_name,
-            last_name=data.last_name,
-            national_code=national_code,
-            student_number=student_number,
-            phone_number=phone_number,
-            gender=data.gender.value if hasattr(data.gender, "value") else data.gender,
-            address=data.address
-        )
+        await db.commit()
+    except (SQLAlchemyError, ValueError) as exc:
+        await db.rollback()
+        if isinstance(exc, IntegrityError):
+            await registration_probe.ensure_unique_async(db, **_registration_values(normalized))
+        raise _registration_error(exc) from exc
+
+    _log_registration_success(user, normalized)
+    return user
+
+
+def _login_candidates_statement(normalized_national_code: str):
+    return (
+        select(User)
+        .join(StudentProfile, StudentProfile.user_id == User.id)
+        .options(joinedload(User.role), joinedload(User.profile))
+        .where(StudentProfile.national_code == normalized_national_code)
+    )
+
+
+def _login_query_failed(exc: SQLAlchemyError, normalized_national_code: str) -> HTTPException:
+    logger.exception(
+        "Login query failed: national_code=%s",
+        normalized_national_code,
+    )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="خطا در بازیابی اطلاعات ورود. لطفاً دوباره تلاش کنید.",
+    )
+
+
+def _log_login_candidates(normalized_national_code: str, matched_users: int) -> None:
+    logger.info(
+        "Login attempt: national_code=%s matched_users=%s",
+        normalized_national_code,
+        matched_users,
+    )
+
+
+def _candidate_password(candidate: User, password: str, normalized_password: str) -> str:
+    return (
+        normalized_password
+        if candidate.role and candidate.role.name != "admin"
+        else password
+    )
 
 
-        db.add(profile)
+def _role_name(user: User) -> str | None:
+    return user.role.name if user.role else None
+
+
+def _rehash_if_needed(db: Session, user: User, password: str) -> None:
+    """Bring a verified password's bcrypt cost in line with the current policy."""
+    role_name = _role_name(user)
+    if not password_policy.needs_rehash(user.hashed_password, role_name):
+        return
+    user.hashed_password = hash_password(password, role_name)
+    try:
         db.commit()
-        db.refresh(user)
+    except SQLAlchemyError:
+        db.rollback()
+        logger.exception("Password rehash failed: user_id=%s", user.id)
+
+
+def _log_login_result(user: User | None, normalized_national_code: str) -> None:
+    if user is not None:
         logger.info(
-            "Register success: user_id=%s national_code=%s student_number=%s",
+            "Login success: user_id=%s national_code=%s",
             user.id,
-            national_code,
-            student_number,
+            normalized_national_code,
         )
+        return
+    logger.warning(
+        "Login failed: national_code=%s reason=invalid_password_or_not_found",
+        normalized_national_code,
+    )
 
-    except IntegrityError as exc:
-        db.rollback()
-        logging.exception("Integrity error while registering user.")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="اطلاعات وارد شده تکراری یا نامعتبر است."
-        ) from exc
 
-    except ValueError as exc:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=str(exc)
-        ) from exc
+def _token_claims(user: User) -> Dict[str, Any]:
+    profile = getattr(user, "profile", None)
+    return {
+        "sub": user.student_number,
+        "user_id": user.id,
+        "national_code": profile.national_code if profile else None,
+        "role": user.role.name if user.role else "user",
+    }
 
-    except SQLAlchemyError as exc:
-        db.rollback()
-        logging.exception("Database error while registering user.")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="ثبت‌نام با خطا مواجه شد. لطفاً دوباره تلاش کنید."
-        ) from exc
 
-    return user
+def _token_response(claims: Dict[str, Any]) -> Dict[str, Any]:
+    access_token = create_access_token(
+        data=claims,
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
 
 
+@dataclass
+class LoginResult:
+    """Outcome of one pass through the login pipeline.
 
-def authenticate_user(db: Session, national_code: str, password: str):
+    Everything a route needs is captured before the pipeline commits, so reading
+    it never reloads expired attributes from the database.
+    """
+
+    user: Optional[User] = None
+    is_active: bool = False
+    role_name: Optional[str] = None
+    claims: Dict[str, Any] = field(default_factory=dict)
+    first_authentication: bool = False
+
+    @property
+    def authenticated(self) -> bool:
+        return self.user is not None
+
+    def token(self) -> Dict[str, Any]:
+        return _token_response(self.claims)
+
+
+class LoginMetrics:
+    """Per-stage wall time and outcomes of the login pipeline, reported on /health."""
 
+    STAGES = ("lookup", "verify", "rehash", "mark_authenticated", "total")
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self._lock = Lock()
+        self._outcomes = {"attempts": 0, "succeeded": 0, "rejected": 0, "first_authentications": 0}
+        self._stages = {stage: {"calls": 0, "total_ms": 0.0, "max_ms": 0.0} for stage in self.STAGES}
+
+    def now(self) -> float:
+        return self._clock()
+
+    def record(self, stage: str, started: float) -> float:
+        elapsed_ms = (self._clock() - started) * 1000
+        with self._lock:
+            timing = self._stages[stage]
+            timing["calls"] += 1
+            timing["total_ms"] += elapsed_ms
+            timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+        return elapsed_ms
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            self._outcomes[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics: Dict[str, Any] = dict(self._outcomes)
+            stages = {stage: dict(timing) for stage, timing in self._stages.items()}
+        for timing in stages.values():
+            calls = timing["calls"]
+            timing["avg_ms"] = round(timing["total_ms"] / calls, 2) if calls else 0.0
+            timing["total_ms"] = round(timing["total_ms"], 2)
+            timing["max_ms"] = round(timing["max_ms"], 2)
+        metrics["stages"] = stages
+        return metrics
+
+
+login_metrics = LoginMetrics()
+
+
+def _mark_authenticated_statement(user_id: int):
+    """Flip has_authenticated once; the WHERE guard makes concurrent first logins race-free."""
+    return (
+        update(StudentProfile)
+        .where(StudentProfile.user_id == user_id, StudentProfile.has_authenticated == false())
+        .values(has_authenticated=True)
+        .execution_options(synchronize_session="evaluate")
+    )
+
+
+def _mark_authenticated_failed(exc: SQLAlchemyError) -> HTTPException:
+    logger.exception("Database error while updating authentication status.")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="خطا در ثبت وضعیت احراز هویت. لطفاً دوباره تلاش کنید."
+    )
+
+
+def _begin_login(national_code: str) -> Optional[str]:
+    """Count the attempt and normalize the code; None when the check digit rules it out."""
+    login_metrics.count("attempts")
     normalized_national_code = normalize_digits(national_code)
+    if not passes_national_code_checksum(normalized_national_code):
+        # No issued code fails the check digit; skip the lookup and bcrypt entirely.
+        logger.warning("Login rejected: national_code=%s reason=invalid_checksum", normalized_national_code)
+        return None
+    return normalized_national_code
+
+
+def _accept_login(user: User, normalized_national_code: str) -> LoginResult:
+    _log_login_result(user, normalized_national_code)
+    return LoginResult(
+        user=user,
+        is_active=bool(user.is_active),
+        role_name=_role_name(user),
+        claims=_token_claims(user),
+    )
+
+
+def _should_mark_authenticated(result: LoginResult, mark_authenticated: bool) -> bool:
+    profile = result.user.profile
+    return mark_authenticated and result.is_active and profile is not None and not profile.has_authenticated
+
+
+def _finish_login(result: LoginResult, started: float, normalized_national_code: Optional[str]) -> LoginResult:
+    total_ms = login_metrics.record("total", started)
+    if result.authenticated:
+        login_metrics.count("succeeded")
+        if result.first_authentication:
+            login_metrics.count("first_authentications")
+            principal_cache.invalidate(result.claims["sub"])
+    else:
+        login_metrics.count("rejected")
+        if normalized_national_code is not None:
+            _log_login_result(None, normalized_national_code)
+    logger.debug("Login pipeline finished in %.1fms: national_code=%s", total_ms, normalized_national_code)
+    return result
+
+
+def login_user(db: Session, national_code: str, password: str, *, mark_authenticated: bool = True) -> LoginResult:
+    """Authenticate a login attempt in as few round trips as possible.
+
+    One eager query loads the user with its profile and role, bcrypt runs at
+    most once, and a policy rehash plus the first-login flag share a single
+    commit. With ``mark_authenticated=False`` the flag is left alone.
+    """
+    started = login_metrics.now()
+    normalized_national_code = _begin_login(national_code)
+    if normalized_national_code is None:
+        return _finish_login(LoginResult(), started, None)
     normalized_password = normalize_digits(password)
 
+    stage = login_metrics.now()
     try:
-        candidates = (
-            db.query(User)
-            .join(StudentProfile, StudentProfile.user_id == User.id)
-            .filter(StudentProfile.national_code == normalized_national_code)
-            .all()
-        )
+        user = db.execute(_login_candidates_statement(normalized_national_code)).scalars().first()
     except SQLAlchemyError as exc:
-        logger.exception(
-            "Login query failed: national_code=%s",
-            normalized_national_code,
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="خطا در بازیابی اطلاعات ورود. لطفاً دوباره تلاش کنید.",
-        ) from exc
+        raise _login_query_failed(exc, normalized_national_code) from exc
+    login_metrics.record("lookup", stage)
+    _log_login_candidates(normalized_national_code, int(user is not None))
+    if user is None:
+        return _finish_login(LoginResult(), started, normalized_national_code)
+
+    candidate_password = _candidate_password(user, password, normalized_password)
+    stage = login_metrics.now()
+    verified = verify_password(candidate_password, user.hashed_password)
+    login_metrics.record("verify", stage)
+    if not verified:
+        return _finish_login(LoginResult(), started, normalized_national_code)
+    result = _accept_login(user, normalized_national_code)
+
+    rehash = password_policy.needs_rehash(user.hashed_password, result.role_name)
+    if rehash:
+        stage = login_metrics.now()
+        user.hashed_password = hash_password(candidate_password, result.role_name)
+        login_metrics.record("rehash", stage)
+    marking = _should_mark_authenticated(result, mark_authenticated)
+    if not (rehash or marking):
+        return _finish_login(result, started, normalized_national_code)
+
+    stage = login_metrics.now()
+    try:
+        if marking:
+            result.first_authentication = db.execute(_mark_authenticated_statement(user.id)).rowcount == 1
+        db.commit()
+    except SQLAlchemyError as exc:
+        db.rollback()
+        if marking:
+            raise _mark_authenticated_failed(exc) from exc
+        logger.exception("Password rehash failed: user_id=%s", result.claims["user_id"])
+    login_metrics.record("mark_authenticated", stage)
+    return _finish_login(result, started, normalized_national_code)
+
+
+async def login_user_async(
+    db: AsyncSession,
+    national_code: str,
+    password: str,
+    *,
+    mark_authenticated: bool = True,
+) -> LoginResult:
+    """Async-session variant of login_user; bcrypt runs on the shared hashing pool."""
+    started = login_metrics.now()
+    normalized_national_code = _begin_login(national_code)
+    if normalized_national_code is None:
+        return _finish_login(LoginResult(), started, None)
+    normalized_password = normalize_digits(password)
 
-    logger.info(
-        "Login attempt: national_code=%s matched_users=%s",
-        normalized_national_code,
-        len(candidates),
-    )
+    stage = login_metrics.now()
+    try:
+        user = (await db.execute(_login_candidates_statement(normalized_national_code))).scalars().first()
+    except SQLAlchemyError as exc:
+        raise _login_query_failed(exc, normalized_national_code) from exc
+    login_metrics.record("lookup", stage)
+    _log_login_candidates(normalized_national_code, int(user is not None))
+    if user is None:
+        return _finish_login(LoginResult(), started, normalized_national_code)
+
+    candidate_password = _candidate_password(user, password, normalized_password)
+    stage = login_metrics.now()
+    try:
+        verified = await averify_password(candidate_password, user.hashed_password)
+    except PasswordHashingBusyError as exc:
+        raise _hashing_busy_exception(exc) from exc
+    login_metrics.record("verify", stage)
+    if not verified:
+        return _finish_login(LoginResult(), started, normalized_national_code)
+    result = _accept_login(user, normalized_national_code)
+
+    rehash = password_policy.needs_rehash(user.hashed_password, result.role_name)
+    if rehash:
+        stage = login_metrics.now()
+        try:
+            user.hashed_password = await ahash_password(candidate_password, result.role_name)
+        except PasswordHashingBusyError:
+            # The login already succeeded; the rehash can happen on a later one.
+            rehash = False
+        login_metrics.record("rehash", stage)
+    marking = _should_mark_authenticated(result, mark_authenticated)
+    if not (rehash or marking):
+        return _finish_login(result, started, normalized_national_code)
+
+    stage = login_metrics.now()
+    try:
+        if marking:
+            result.first_authentication = (await db.execute(_mark_authenticated_statement(user.id))).rowcount == 1
+        await db.commit()
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        if marking:
+            raise _mark_authenticated_failed(exc) from exc
+        logger.exception("Password rehash failed: user_id=%s", result.claims["user_id"])
+    login_metrics.record("mark_authenticated", stage)
+    return _finish_login(result, started, normalized_national_code)
 
-    for candidate in candidates:
-        candidate_password = (
-            normalized_password
-            if candidate.role and candidate.role.name != "admin"
-            else password
-        )
 
-        if verify_password(candidate_password, candidate.hashed_password):
-            logger.info(
-                "Login success: user_id=%s national_code=%s",
-                candidate.id,
-                normalized_national_code,
-            )
-            return candidate
+def authenticate_user(db: Session, national_code: str, password: str):
+    return login_user(db, national_code, password, mark_authenticated=False).user
 
-    logger.warning(
-        "Login failed: national_code=%s reason=invalid_password_or_not_found",
-        normalized_national_code,
-    )
-    return None
+
+async def authenticate_user_async(db: AsyncSession, national_code: str, password: str):
+    """Async-session variant of authenticate_user; bcrypt runs on the shared hashing pool."""
+    return (await login_user_async(db, national_code, password, mark_authenticated=False)).user
 
 
 def authenticate_admin_password(db: Session, password: str):
@@ -213,6 +548,7 @@ def authenticate_admin_password(db: Session, password: str):
 
     for admin_user in admin_users:
         if verify_password(normalized_password, admin_user.hashed_password):
+            _rehash_if_needed(db, admin_user, normalized_password)
             logger.info("Admin login success: user_id=%s", admin_user.id)
             return admin_user
 
@@ -221,42 +557,29 @@ def authenticate_admin_password(db: Session, password: str):
 
 def enforce_single_national_id_authentication(db: Session, user: User) -> None:
 
-    profile = db.query(StudentProfile).filter(
-        StudentProfile.user_id == user.id
-    ).first()
+    student_number = user.student_number
+    try:
+        marked = db.execute(_mark_authenticated_statement(user.id)).rowcount == 1
+        db.commit()
+    except SQLAlchemyError as exc:
+        db.rollback()
+        raise _mark_authenticated_failed(exc) from exc
+    if marked:
+        principal_cache.invalidate(student_number)
 
-    if not profile:
-        return
 
-    if profile.has_authenticated:
-        return
+async def enforce_single_national_id_authentication_async(db: AsyncSession, user: User) -> None:
 
-    profile.has_authenticated = True
+    student_number = user.student_number
     try:
-        db.commit()
+        marked = (await db.execute(_mark_authenticated_statement(user.id))).rowcount == 1
+        await db.commit()
     except SQLAlchemyError as exc:
-        db.rollback()
-        logging.exception("Database error while updating authentication status.")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="خطا در ثبت وضعیت احراز هویت. لطفاً دوباره تلاش کنید."
-        ) from exc
+        await db.rollback()
+        raise _mark_authenticated_failed(exc) from exc
+    if marked:
+        principal_cache.invalidate(student_number)
 
 
 def create_token_for_user(user: User):
-    national_code = user.profile.national_code if getattr(user, "profile", None) else None
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={
-            "sub": user.student_number,
-            "user_id": user.id,
-            "national_code": national_code,
-            "role": user.role.name if user.role else "user",
-        },
-        expires_delta=access_token_expires,
-    )
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
-    }
+    return _token_response(_token_claims(user))
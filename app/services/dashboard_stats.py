@@ -0,0 +1,76 @@
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.confing import settings
+from app.services import stat_counters
+from app.services.stat_counters import read_counters
+
+CHANGE_ACTIONS = ("create", "update", "delete")
+
+
+def compute_dashboard_stats(db: Session) -> Dict[str, int]:
+    """Every dashboard counter, read from the maintained ``stat_counters`` rows in one query."""
+    counters = read_counters(db)
+    return {
+        "users_count": counters.get(stat_counters.USERS, 0),
+        "light_path_students_count": counters.get(stat_counters.LIGHT_PATH_STUDENTS, 0),
+        "quran_class_requests_count": counters.get(stat_counters.QURAN_CLASS_REQUESTS, 0),
+        "total_logs": counters.get(stat_counters.AUDIT_LOGS, 0),
+        "total_changes": sum(
+            counters.get(stat_counters.audit_action_counter(action), 0) for action in CHANGE_ACTIONS
+        ),
+        "deleted_events": counters.get(stat_counters.AUDIT_DELETED_NOOR_EVENTS, 0),
+    }
+
+
+class DashboardStatsCache:
+    """Holds the last computed stats for ``ttl_seconds``; writes call :meth:`invalidate`.
+
+    A generation counter guards the fill: stats computed while a write was
+    invalidating are returned to that caller but not cached.
+    """
+
+    def __init__(self, ttl_seconds: float = 5, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = Lock()
+        self._value: Optional[Dict[str, int]] = None
+        self._expires_at = 0.0
+        self._generation = 0
+
+    def get(self, db: Session) -> Dict[str, int]:
+        with self._lock:
+            if self._value is not None and self._expires_at > self._clock():
+                return dict(self._value)
+            generation = self._generation
+
+        value = compute_dashboard_stats(db)
+        if self.ttl_seconds > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._value = value
+                    self._expires_at = self._clock() + self.ttl_seconds
+        return dict(value)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._value = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"cached": self._value is not None, "ttl_seconds": self.ttl_seconds}
+
+
+dashboard_stats_cache = DashboardStatsCache(ttl_seconds=settings.dashboard_stats_ttl_seconds)
+
+
+def get_dashboard_stats(db: Session) -> Dict[str, int]:
+    return dashboard_stats_cache.get(db)
+
+
+def invalidate_dashboard_stats() -> None:
+    dashboard_stats_cache.invalidate()
@@ -0,0 +1,570 @@
+import asyncio
+import logging
+import smtplib
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from threading import Condition, Thread
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.confing import settings
+from app.core.database import SessionLocal
+from app.models.email_outbox import EmailOutboxMessage
+
+try:
+    import aiosmtplib
+except ImportError:  # only EMAIL_OUTBOX_MODE=async needs it
+    aiosmtplib = None
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+
+def _is_connection_error(exc: BaseException) -> bool:
+    # SMTPException subclasses OSError, so plain socket errors have to be told apart explicitly.
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if aiosmtplib is not None and isinstance(exc, (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError)):
+        return True
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+class SMTPSender:
+    """One authenticated SMTP connection, opened lazily and reused for every message.
+
+    A connection idle for longer than ``keepalive_seconds`` is probed with NOOP
+    before reuse; a send that finds the server gone is retried once on a fresh
+    connection.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        timeout: float = 10.0,
+        keepalive_seconds: float = 60.0,
+        smtp_factory: Callable[..., Any] = smtplib.SMTP,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.keepalive_seconds = keepalive_seconds
+        self.smtp_factory = smtp_factory
+        self._clock = clock
+        self._smtp = None
+        self._last_used = 0.0
+        self.connections = 0
+        self.sent = 0
+
+    def _connect(self):
+        smtp = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connections += 1
+        return smtp
+
+    def _connection(self):
+        if self._smtp is not None and self._clock() - self._last_used > self.keepalive_seconds:
+            try:
+                self._smtp.noop()
+            except Exception:
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def send(self, message: EmailMessage) -> None:
+        try:
+            self._connection().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connection().send_message(message)
+        self._last_used = self._clock()
+        self.sent += 1
+
+    def close_if_idle(self) -> None:
+        if self._smtp is not None and self._clock() - self._last_used > self.keepalive_seconds:
+            self.close()
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+
+def _aiosmtplib_client(host: str, port: int, timeout: float):
+    if aiosmtplib is None:
+        raise RuntimeError("EMAIL_OUTBOX_MODE=async requires the aiosmtplib package.")
+    # STARTTLS is issued explicitly below, as in the thread sender.
+    return aiosmtplib.SMTP(hostname=host, port=port, timeout=timeout, start_tls=False)
+
+
+class AsyncSMTPSender:
+    """The :class:`SMTPSender` contract on an asyncio (aiosmtplib-style) client."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        timeout: float = 10.0,
+        keepalive_seconds: float = 60.0,
+        smtp_factory: Callable[..., Any] = _aiosmtplib_client,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.keepalive_seconds = keepalive_seconds
+        self.smtp_factory = smtp_factory
+        self._clock = clock
+        self._smtp = None
+        self._last_used = 0.0
+        self.connections = 0
+        self.sent = 0
+
+    async def _connect(self):
+        smtp = self.smtp_factory(self.host, self.port, self.timeout)
+        await smtp.connect()
+        try:
+            if self.starttls:
+                await smtp.starttls()
+            if self.username and self.password:
+                await smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connections += 1
+        return smtp
+
+    async def _connection(self):
+        if self._smtp is not None and self._clock() - self._last_used > self.keepalive_seconds:
+            try:
+                await self._smtp.noop()
+            except Exception:
+                await self.close()
+        if self._smtp is None:
+            self._smtp = await self._connect()
+        return self._smtp
+
+    async def send(self, message: EmailMessage) -> None:
+        try:
+            await (await self._connection()).send_message(message)
+        except Exception as exc:
+            if not _is_connection_error(exc):
+                raise
+            await self.close()
+            await (await self._connection()).send_message(message)
+        self._last_used = self._clock()
+        self.sent += 1
+
+    async def close_if_idle(self) -> None:
+        if self._smtp is not None and self._clock() - self._last_used > self.keepalive_seconds:
+            await self.close()
+
+    async def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+
+@dataclass(frozen=True)
+class OutboxItem:
+    id: int
+    to_email: str
+    subject: str
+    body: str
+
+
+class EmailOutbox:
+    """Durable email queue: rows are written in the request, one worker delivers them.
+
+    The worker claims up to ``batch_size`` due rows at a time under a claim
+    token, sends them over a single reused SMTP connection and reschedules
+    failures with exponential backoff until ``max_attempts``. A claim is a lease
+    of ``claim_seconds``, so rows held by a crashed process are picked up again,
+    and several processes can share one outbox without sending a row twice.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        sender_factory: Callable[[], SMTPSender],
+        *,
+        async_sender_factory: Optional[Callable[[], AsyncSMTPSender]] = None,
+        email_from: str = "noreply@example.com",
+        batch_size: int = 20,
+        poll_interval: float = 5.0,
+        max_attempts: int = 5,
+        backoff_seconds: float = 30.0,
+        max_backoff_seconds: float = 3600.0,
+        claim_seconds: float = 300.0,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.session_factory = session_factory
+        self.sender_factory = sender_factory
+        self.async_sender_factory = async_sender_factory
+        self.email_from = email_from
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = max(0.01, poll_interval)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.claim_seconds = claim_seconds
+        self._clock = clock
+
+        self._sender: Optional[SMTPSender] = None
+        self._async_sender: Optional[AsyncSMTPSender] = None
+        self._condition = Condition()
+        self._wake = False
+        self._thread: Optional[Thread] = None
+        self._task: Optional[asyncio.Task] = None
+        self._async_wakeup: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = None
+        self._running = False
+        self._counters = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "batches": 0}
+
+    # Writing -----------------------------------------------------------------
+
+    def add(self, db: Session, to_email: str, subject: str, body: str) -> EmailOutboxMessage:
+        """Stage a message in ``db``; it is sent once the caller commits and calls :meth:`notify`."""
+        message = EmailOutboxMessage(
+            to_email=to_email,
+            subject=subject,
+            body=body,
+            status=PENDING,
+            attempts=0,
+            next_attempt_at=self._clock(),
+        )
+        db.add(message)
+        return message
+
+    def queue(self, to_email: str, subject: str, body: str) -> int:
+        """Write one message in its own transaction and wake the worker."""
+        db = self.session_factory()
+        try:
+            message = self.add(db, to_email, subject, body)
+            db.commit()
+            message_id = message.id
+        finally:
+            db.close()
+        with self._condition:
+            self._counters["queued"] += 1
+        self.notify()
+        return message_id
+
+    def send_now(self, to_email: str, subject: str, body: str) -> None:
+        """Deliver one message on a fresh connection without touching the table, for when no worker runs."""
+        sender = self.sender_factory()
+        try:
+            sender.send(self._build_message(OutboxItem(0, to_email, subject, body)))
+        finally:
+            sender.close()
+        with self._condition:
+            self._counters["sent"] += 1
+
+    def notify(self) -> None:
+        with self._condition:
+            self._wake = True
+            self._condition.notify_all()
+            wakeup = self._async_wakeup
+        if wakeup is not None:
+            loop, event = wakeup
+            loop.call_soon_threadsafe(event.set)
+
+    # Delivery ----------------------------------------------------------------
+
+    def _claim_batch(self) -> List[OutboxItem]:
+        now = self._clock()
+        token = str(uuid.uuid4())
+        due = (EmailOutboxMessage.status.in_((PENDING, SENDING)), EmailOutboxMessage.next_attempt_at <= now)
+        db = self.session_factory()
+        try:
+            ids = (
+                db.execute(
+                    select(EmailOutboxMessage.id)
+                    .where(*due)
+                    .order_by(EmailOutboxMessage.next_attempt_at, EmailOutboxMessage.id)
+                    .limit(self.batch_size)
+                )
+                .scalars()
+                .all()
+            )
+            if not ids:
+                return []
+            # Re-checking "due" in the UPDATE makes the claim atomic against other processes.
+            db.execute(
+                update(EmailOutboxMessage)
+                .where(EmailOutboxMessage.id.in_(ids), *due)
+                .values(
+                    status=SENDING,
+                    claim_token=token,
+                    next_attempt_at=now + timedelta(seconds=self.claim_seconds),
+                )
+            )
+            db.commit()
+            rows = db.execute(
+                select(
+                    EmailOutboxMessage.id,
+                    EmailOutboxMessage.to_email,
+                    EmailOutboxMessage.subject,
+                    EmailOutboxMessage.body,
+                )
+                .where(EmailOutboxMessage.claim_token == token)
+                .order_by(EmailOutboxMessage.id)
+            )
+            return [OutboxItem(*row) for row in rows]
+        finally:
+            db.close()
+
+    def _backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempts - 1)))
+
+    def _record_results(self, results: Sequence[Tuple[OutboxItem, Optional[BaseException]]]) -> None:
+        now = self._clock()
+        counts = {"sent": 0, "retried": 0, "failed": 0}
+        db = self.session_factory()
+        try:
+            for item, error in results:
+                row = db.get(EmailOutboxMessage, item.id)
+                if row is None:
+                    continue
+                row.attempts += 1
+                row.claim_token = None
+                if error is None:
+                    row.status, row.sent_at, row.last_error = SENT, now, None
+                    counts["sent"] += 1
+                elif row.attempts >= self.max_attempts:
+                    row.status, row.last_error = FAILED, str(error)[:500]
+                    counts["failed"] += 1
+                else:
+                    row.status, row.last_error = PENDING, str(error)[:500]
+                    row.next_attempt_at = now + self._backoff(row.attempts)
+                    counts["retried"] += 1
+            db.commit()
+        finally:
+            db.close()
+        with self._condition:
+            self._counters["batches"] += 1
+            for name, count in counts.items():
+                self._counters[name] += count
+
+    def _build_message(self, item: OutboxItem) -> EmailMessage:
+        message = EmailMessage()
+        message["Subject"] = item.subject
+        message["From"] = self.email_from
+        message["To"] = item.to_email
+        message.set_content(item.body)
+        return message
+
+    def _sender_for_thread(self) -> SMTPSender:
+        if self._sender is None:
+            self._sender = self.sender_factory()
+        return self._sender
+
+    def deliver_due(self) -> int:
+        """Send every due message, batch by batch, on one connection; returns how many were sent."""
+        delivered = 0
+        while True:
+            items = self._claim_batch()
+            if not items:
+                return delivered
+            sender = self._sender_for_thread()
+            results: List[Tuple[OutboxItem, Optional[BaseException]]] = []
+            connection_error: Optional[BaseException] = None
+            for item in items:
+                if connection_error is not None:
+                    # The server is unreachable; back the rest of the batch off instead of hammering it.
+                    results.append((item, connection_error))
+                    continue
+                try:
+                    sender.send(self._build_message(item))
+                except Exception as exc:
+                    logger.warning("Failed to send outbox email %s to %s: %s", item.id, item.to_email, exc)
+                    if _is_connection_error(exc):
+                        sender.close()
+                        connection_error = exc
+                    results.append((item, exc))
+                else:
+                    results.append((item, None))
+                    delivered += 1
+            self._record_results(results)
+            if connection_error is not None:
+                return delivered
+
+    async def deliver_due_async(self) -> int:
+        """:meth:`deliver_due` on the asyncio sender; database work runs in a thread."""
+        if self._async_sender is None:
+            self._async_sender = self.async_sender_factory()
+        sender = self._async_sender
+        delivered = 0
+        while True:
+            items = await asyncio.to_thread(self._claim_batch)
+            if not items:
+                return delivered
+            results: List[Tuple[OutboxItem, Optional[BaseException]]] = []
+            connection_error: Optional[BaseException] = None
+            for item in items:
+                if connection_error is not None:
+                    results.append((item, connection_error))
+                    continue
+                try:
+                    await sender.send(self._build_message(item))
+                except Exception as exc:
+                    logger.warning("Failed to send outbox email %s to %s: %s", item.id, item.to_email, exc)
+                    if _is_connection_error(exc):
+                        await sender.close()
+                        connection_error = exc
+                    results.append((item, exc))
+                else:
+                    results.append((item, None))
+                    delivered += 1
+            await asyncio.to_thread(self._record_results, results)
+            if connection_error is not None:
+                return delivered
+
+    # Workers -----------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._wake = True
+            self._thread = Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+        logger.info("Email outbox worker started (batch_size=%s)", self.batch_size)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._wake and self._running:
+                    self._condition.wait(self.poll_interval)
+                if not self._running:
+                    return
+                self._wake = False
+            try:
+                self.deliver_due()
+            except Exception:
+                logger.exception("Email outbox delivery round failed")
+            if self._sender is not None:
+                self._sender.close_if_idle()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._condition:
+            if not self._running or self._thread is None:
+                return
+            self._running = False
+            self._condition.notify_all()
+            thread, self._thread = self._thread, None
+        thread.join(timeout)
+        if self._sender is not None:
+            self._sender.close()
+        logger.info("Email outbox worker stopped: %s", self.stats())
+
+    def start_async(self) -> None:
+        if self._running:
+            return
+        event = asyncio.Event()
+        event.set()
+        self._async_wakeup = (asyncio.get_running_loop(), event)
+        self._running = True
+        self._task = asyncio.create_task(self._run_async(event))
+        logger.info("Email outbox async worker started (batch_size=%s)", self.batch_size)
+
+    async def _run_async(self, event: asyncio.Event) -> None:
+        while self._running:
+            try:
+                await asyncio.wait_for(event.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            event.clear()
+            try:
+                await self.deliver_due_async()
+            except Exception:
+                logger.exception("Email outbox delivery round failed")
+            if self._async_sender is not None:
+                await self._async_sender.close_if_idle()
+
+    async def stop_async(self) -> None:
+        if not self._running or self._task is None:
+            return
+        self._running = False
+        task, self._task = self._task, None
+        self._async_wakeup = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        if self._async_sender is not None:
+            await self._async_sender.close()
+        logger.info("Email outbox async worker stopped: %s", self.stats())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            stats = {**self._counters, "running": self._running}
+        sender = self._async_sender or self._sender
+        stats["smtp_connections"] = sender.connections if sender else 0
+        return stats
+
+
+def _smtp_options() -> Dict[str, Any]:
+    return {
+        "username": settings.smtp_username,
+        "password": settings.smtp_password,
+        "starttls": settings.smtp_starttls,
+        "keepalive_seconds": settings.smtp_keepalive_seconds,
+    }
+
+
+email_outbox = EmailOutbox(
+    SessionLocal,
+    lambda: SMTPSender(settings.smtp_host, settings.smtp_port, **_smtp_options()),
+    async_sender_factory=lambda: AsyncSMTPSender(settings.smtp_host, settings.smtp_port, **_smtp_options()),
+    email_from=settings.email_from,
+    batch_size=settings.email_outbox_batch_size,
+    poll_interval=settings.email_outbox_poll_interval_ms / 1000,
+    max_attempts=settings.email_outbox_max_attempts,
+    backoff_seconds=settings.email_outbox_backoff_seconds,
+)
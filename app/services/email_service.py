@@ -1,39 +1,46 @@
 import logging
-import smtplib
-from email.message import EmailMessage
 
 from app.core.confing import settings
+from app.core.database import ensure_runtime_schema
+from app.services.email_outbox import email_outbox
 
 logger = logging.getLogger(__name__)
 
 
+def registration_confirmation_email(full_name: str) -> tuple[str, str]:
+    """Subject and body of the registration confirmation email."""
+    return (
+        "Registration successful",
+        (
+            f"Hello {full_name},\n\n"
+            "Thank you for registering. Your account request was received successfully.\n"
+            "If you did not submit this request, please ignore this email.\n\n"
+            "Regards,\nSupport Team"
+        ),
+    )
+
+
 def send_registration_confirmation_email(to_email: str, full_name: str) -> None:
-    """Send a registration confirmation email using configured SMTP settings."""
+    """Queue a registration confirmation email in the outbox; the outbox worker delivers it.
+
+    With ``EMAIL_OUTBOX_ENABLED=false`` no worker runs, so the email is sent directly instead.
+    """
     if not settings.smtp_host:
         logger.info(
             "SMTP is not configured. Skipping confirmation email for %s", to_email
         )
         return
 
-    message = EmailMessage()
-    message["Subject"] = "Registration successful"
-    message["From"] = settings.email_from
-    message["To"] = to_email
-    message.set_content(
-        (
-            f"Hello {full_name},\n\n"
-            "Thank you for registering. Your account request was received successfully.\n"
-            "If you did not submit this request, please ignore this email.\n\n"
-            "Regards,\nSupport Team"
-        )
-    )
+    subject, body = registration_confirmation_email(full_name)
+    if not settings.email_outbox_enabled:
+        try:
+            email_outbox.send_now(to_email, subject, body)
+        except Exception:
+            logger.exception("Failed to send registration confirmation email to %s", to_email)
+        return
 
     try:
-        with smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=10) as smtp:
-            if settings.smtp_starttls:
-                smtp.starttls()
-            if settings.smtp_username and settings.smtp_password:
-                smtp.login(settings.smtp_username, settings.smtp_password)
-            smtp.send_message(message)
+        ensure_runtime_schema()
+        email_outbox.queue(to_email, subject, body)
     except Exception:
-        logger.exception("Failed to send registration confirmation email to %s", to_email)
\ No newline at end of file
+        logger.exception("Failed to queue registration confirmation email to %s", to_email)
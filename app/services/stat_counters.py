@@ -0,0 +1,125 @@
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Mapping
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.audit_log import AuditLog
+from app.models.noor_program import LightPathStudent, QuranClassRequest
+from app.models.stat_counter import StatCounter
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+USERS = "users"
+LIGHT_PATH_STUDENTS = "light_path_students"
+QURAN_CLASS_REQUESTS = "quran_class_requests"
+AUDIT_LOGS = "audit_logs"
+AUDIT_DELETED_NOOR_EVENTS = "audit_logs.deleted_noor_events"
+AUDIT_ACTION_PREFIX = "audit_logs.action."
+
+DELETED_NOOR_ENTITIES = ("light_path_student", "quran_scholar")
+
+_ROW_COUNTERS = {
+    User: USERS,
+    LightPathStudent: LIGHT_PATH_STUDENTS,
+    QuranClassRequest: QURAN_CLASS_REQUESTS,
+}
+
+
+def audit_action_counter(action: str) -> str:
+    return f"{AUDIT_ACTION_PREFIX}{action}"
+
+
+def audit_log_deltas(records: Iterable[Mapping], sign: int = 1) -> Counter:
+    """Counter deltas for audit rows given as mappings (the shape the audit sink inserts)."""
+    deltas: Counter = Counter()
+    for record in records:
+        action = record.get("action")
+        deltas[AUDIT_LOGS] += sign
+        if action:
+            deltas[audit_action_counter(action)] += sign
+        if action == "delete" and record.get("entity") in DELETED_NOOR_ENTITIES:
+            deltas[AUDIT_DELETED_NOOR_EVENTS] += sign
+    return deltas
+
+
+def _instance_deltas(instances: Iterable, sign: int) -> Counter:
+    deltas: Counter = Counter()
+    audit_records = []
+    for instance in instances:
+        if isinstance(instance, AuditLog):
+            audit_records.append({"action": instance.action, "entity": instance.entity})
+            continue
+        name = _ROW_COUNTERS.get(type(instance))
+        if name:
+            deltas[name] += sign
+    deltas.update(audit_log_deltas(audit_records, sign))
+    return deltas
+
+
+def apply_counter_deltas(connection, deltas: Mapping[str, int]) -> None:
+    """Add ``deltas`` to the counters on ``connection``, inside whatever transaction it is in."""
+    for name, amount in sorted(deltas.items()):
+        if not amount:
+            continue
+        result = connection.execute(
+            update(StatCounter)
+            .where(StatCounter.name == name)
+            .values(value=StatCounter.value + amount, updated_at=func.now())
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(StatCounter).values(name=name, value=amount))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_counted_rows(session: Session, flush_context) -> None:
+    # Runs for every ORM flush (sync and async sessions), so the counters commit or roll
+    # back together with the rows they count.
+    deltas = _instance_deltas(session.new, 1)
+    deltas.update(_instance_deltas(session.deleted, -1))
+    if any(deltas.values()):
+        apply_counter_deltas(session.connection(), deltas)
+
+
+def compute_counters(db: Session) -> Dict[str, int]:
+    """Recount every counter from the source tables."""
+    counters = {
+        USERS: db.execute(select(func.count()).select_from(User)).scalar_one(),
+        LIGHT_PATH_STUDENTS: db.execute(select(func.count()).select_from(LightPathStudent)).scalar_one(),
+        QURAN_CLASS_REQUESTS: db.execute(select(func.count()).select_from(QuranClassRequest)).scalar_one(),
+        AUDIT_LOGS: db.execute(select(func.count()).select_from(AuditLog)).scalar_one(),
+        AUDIT_DELETED_NOOR_EVENTS: db.execute(
+            select(func.count())
+            .select_from(AuditLog)
+            .where(AuditLog.action == "delete", AuditLog.entity.in_(DELETED_NOOR_ENTITIES))
+        ).scalar_one(),
+    }
+    for action, count in db.execute(
+        select(AuditLog.action, func.count()).where(AuditLog.action.is_not(None)).group_by(AuditLog.action)
+    ):
+        counters[audit_action_counter(action)] = count
+    return counters
+
+
+def rebuild_counters(db: Session) -> Dict[str, int]:
+    """Replace the stored counters with a fresh recount, in one transaction."""
+    counters = compute_counters(db)
+    db.execute(delete(StatCounter))
+    db.execute(insert(StatCounter), [{"name": name, "value": value} for name, value in counters.items()])
+    db.commit()
+    return counters
+
+
+def read_counters(db: Session) -> Dict[str, int]:
+    return {name: int(value) for name, value in db.execute(select(StatCounter.name, StatCounter.value))}
+
+
+def ensure_stat_counters(db: Session) -> bool:
+    """Seed the counters from the source tables when the table is empty; returns True if it did."""
+    if db.execute(select(StatCounter.name).limit(1)).first() is not None:
+        return False
+    counters = rebuild_counters(db)
+    logger.info("Seeded %s stat counters", len(counters))
+    return True
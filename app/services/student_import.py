@@ -0,0 +1,390 @@
+import asyncio
+import csv
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice, repeat
+from threading import Lock
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import load_workbook
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.confing import settings
+from app.core.database import SessionLocal
+from app.core.password_pool import bcrypt_hash
+from app.core.security import normalize_password, password_policy
+from app.core.validators import validate_many
+from app.models.role import Role
+from app.models.student_profile import StudentProfile
+from app.models.user import User
+from app.schemas.student import AdminStudentUpdate
+from app.services.uniqueness import student_probe
+from app.services.user_service import _translate_integrity_error
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "xlsx")
+
+# Header aliases accepted in the first row of an upload (English field names or the Persian labels).
+COLUMN_ALIASES = {
+    "first_name": "first_name",
+    "نام": "first_name",
+    "last_name": "last_name",
+    "نام خانوادگی": "last_name",
+    "student_number": "student_number",
+    "شماره دانشجویی": "student_number",
+    "national_code": "national_code",
+    "کد ملی": "national_code",
+    "phone_number": "phone_number",
+    "شماره تماس": "phone_number",
+    "gender": "gender",
+    "جنسیت": "gender",
+    "address": "address",
+    "آدرس": "address",
+}
+REQUIRED_COLUMNS = ("first_name", "last_name", "student_number", "national_code", "phone_number", "gender")
+UNIQUE_FIELDS = student_probe.messages
+DUPLICATE_IN_FILE_MESSAGES = {
+    "student_number": "شماره دانشجویی در فایل تکراری است",
+    "national_code": "کد ملی در فایل تکراری است",
+    "phone_number": "شماره تماس در فایل تکراری است",
+}
+# Spreadsheet cells typed as numbers lose their leading zeros; these columns are fixed-width.
+NUMERIC_CELL_WIDTHS = {"national_code": 10, "phone_number": 11}
+# Stay well below SQLite's bound-parameter limit for the IN (...) probes.
+LOOKUP_CHUNK_SIZE = 300
+
+
+class StudentImportError(ValueError):
+    """The upload itself is unusable (unknown format, missing columns, too many rows)."""
+
+
+@dataclass
+class StudentImportReport:
+    total_rows: int = 0
+    created: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, row_number: int, student_number: Optional[str], messages: Sequence[str]) -> None:
+        self.errors.append({"row": row_number, "student_number": student_number, "errors": list(messages)})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_rows": self.total_rows,
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+        }
+
+
+def detect_import_format(filename: Optional[str]) -> str:
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension not in IMPORT_FORMATS:
+        raise StudentImportError("فرمت فایل باید CSV یا XLSX باشد")
+    return extension
+
+
+def _header_map(header: Sequence[Any]) -> Dict[int, str]:
+    columns = {}
+    for index, name in enumerate(header):
+        key = COLUMN_ALIASES.get(str(name or "").strip().lower())
+        if key:
+            columns[index] = key
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns.values()]
+    if missing:
+        raise StudentImportError(f"ستون‌های الزامی در فایل وجود ندارد: {', '.join(missing)}")
+    return columns
+
+
+def _raw_rows(upload: BinaryIO, import_format: str) -> Iterator[Sequence[Any]]:
+    if import_format == "csv":
+        text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.reader(text)
+        finally:
+            text.detach()
+        return
+
+    workbook = load_workbook(upload, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_import_rows(upload: BinaryIO, import_format: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Stream ``(row_number, fields)`` pairs from an upload; row numbers match the spreadsheet."""
+    rows = _raw_rows(upload, import_format)
+    header = next(rows, None)
+    if header is None:
+        raise StudentImportError("فایل خالی است")
+    columns = _header_map(header)
+    for row_number, values in enumerate(rows, start=2):
+        if not any(value not in (None, "") for value in values):
+            continue
+        yield row_number, {
+            key: values[index] if index < len(values) else None for index, key in columns.items()
+        }
+
+
+def _cell_text(key: str, value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, int) and key in NUMERIC_CELL_WIDTHS:
+        return str(value).zfill(NUMERIC_CELL_WIDTHS[key])
+    return str(value).strip()
+
+
+def _row_text(fields: Dict[str, Any]) -> Dict[str, Any]:
+    cleaned = {key: _cell_text(key, value) for key, value in fields.items()}
+    cleaned["address"] = cleaned.get("address") or None
+    return cleaned
+
+
+def _validate_rows(
+    rows: Sequence[Tuple[int, Dict[str, Any]]],
+) -> Iterator[Tuple[int, Dict[str, Any], Optional[AdminStudentUpdate], List[str]]]:
+    """``(row_number, cleaned, item, messages)`` per row; ``item`` is None when the row is invalid.
+
+    validate_many normalizes the digit columns and the gender column (so Persian
+    labels such as «برادر» are accepted) for the whole chunk first; the model then
+    only sees normalized values. A failing row reports one message per bad field.
+    """
+    for (row_number, _), (cleaned, errors) in zip(rows, validate_many(_row_text(fields) for _, fields in rows)):
+        try:
+            item = AdminStudentUpdate(**cleaned)
+        except ValidationError as exc:
+            # The model re-checks fields validate_many already rejected; keep the first message for those.
+            model_messages = [error["msg"] for error in exc.errors() if error["loc"][0] not in errors]
+            messages = list(dict.fromkeys([*errors.values(), *model_messages]))
+            yield row_number, cleaned, None, messages
+            continue
+        yield row_number, cleaned, item, []
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _read_chunks(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _collect_candidate(
+    report: StudentImportReport,
+    candidates: List[Tuple[int, AdminStudentUpdate]],
+    seen: Dict[str, set],
+    row_number: int,
+    item: AdminStudentUpdate,
+) -> None:
+    duplicates = [
+        DUPLICATE_IN_FILE_MESSAGES[name]
+        for name in UNIQUE_FIELDS
+        if getattr(item, name) in seen[name]
+    ]
+    if duplicates:
+        report.add_error(row_number, item.student_number, duplicates)
+        return
+    for name in UNIQUE_FIELDS:
+        seen[name].add(getattr(item, name))
+    candidates.append((row_number, item))
+
+
+def find_existing_values(db: Session, candidates: Sequence[AdminStudentUpdate]) -> Dict[str, set]:
+    """Which student numbers, national codes and phones of ``candidates`` already exist, via IN probes."""
+    existing: Dict[str, set] = {name: set() for name in UNIQUE_FIELDS}
+    for chunk in _chunks(candidates, LOOKUP_CHUNK_SIZE):
+        student_numbers = [item.student_number for item in chunk]
+        national_codes = [item.national_code for item in chunk]
+        phone_numbers = [item.phone_number for item in chunk]
+        for row in db.execute(
+            select(StudentProfile.student_number, StudentProfile.national_code, StudentProfile.phone_number).where(
+                or_(
+                    StudentProfile.student_number.in_(student_numbers),
+                    StudentProfile.national_code.in_(national_codes),
+                    StudentProfile.phone_number.in_(phone_numbers),
+                )
+            )
+        ):
+            existing["student_number"].add(row.student_number)
+            existing["national_code"].add(row.national_code)
+            existing["phone_number"].add(row.phone_number)
+        existing["student_number"].update(
+            db.execute(select(User.student_number).where(User.student_number.in_(student_numbers))).scalars()
+        )
+    return existing
+
+
+def hash_initial_passwords(student_numbers: Sequence[str], workers: int) -> List[str]:
+    """bcrypt every initial password (the student number, as in admin_create_student) across processes."""
+    passwords = [normalize_password(number).encode("utf-8") for number in student_numbers]
+    rounds = password_policy.rounds_for("user")
+    if workers <= 1 or len(passwords) <= 1:
+        return [bcrypt_hash(password, rounds) for password in passwords]
+    # Spawn, not fork: forking the server would copy locks held by its audit, outbox and bcrypt threads.
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(passwords)),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        return list(
+            executor.map(
+                bcrypt_hash,
+                passwords,
+                repeat(rounds, len(passwords)),
+                chunksize=max(1, len(passwords) // (workers * 4)),
+            )
+        )
+
+
+def _user_role(db: Session) -> Role:
+    role = db.execute(select(Role).where(Role.name == "user")).scalars().first()
+    if role is None:
+        role = Role(name="user", description="کاربر عادی")
+        db.add(role)
+        db.flush()
+    return role
+
+
+def _insert_batch(db: Session, role_id: int, batch: Sequence[Tuple[int, AdminStudentUpdate, str]]) -> None:
+    users = [
+        User(student_number=item.student_number, hashed_password=hashed, role_id=role_id)
+        for _, item, hashed in batch
+    ]
+    db.add_all(users)
+    db.flush()
+    db.add_all(
+        StudentProfile(
+            user_id=user.id,
+            first_name=item.first_name,
+            last_name=item.last_name,
+            student_number=item.student_number,
+            national_code=item.national_code,
+            phone_number=item.phone_number,
+            gender=item.gender.value if hasattr(item.gender, "value") else item.gender,
+            address=item.address,
+        )
+        for user, (_, item, _) in zip(users, batch)
+    )
+    db.commit()
+
+
+def import_students(
+    db: Session,
+    rows: Iterable[Tuple[int, Dict[str, Any]]],
+    *,
+    batch_size: Optional[int] = None,
+    hash_workers: Optional[int] = None,
+    max_rows: Optional[int] = None,
+) -> StudentImportReport:
+    """Validate, de-duplicate and insert students in batches; failures are reported per row."""
+    batch_size = max(1, batch_size or settings.student_import_batch_size)
+    hash_workers = hash_workers if hash_workers is not None else settings.student_import_hash_workers
+    hash_workers = hash_workers or os.cpu_count() or 1
+    max_rows = max_rows or settings.student_import_max_rows
+
+    report = StudentImportReport()
+    candidates: List[Tuple[int, AdminStudentUpdate]] = []
+    seen: Dict[str, set] = {name: set() for name in UNIQUE_FIELDS}
+
+    for chunk in _read_chunks(rows, LOOKUP_CHUNK_SIZE):
+        report.total_rows += len(chunk)
+        if report.total_rows > max_rows:
+            raise StudentImportError(f"حداکثر {max_rows} ردیف در هر فایل مجاز است")
+        for row_number, cleaned, item, messages in _validate_rows(chunk):
+            if item is None:
+                report.add_error(row_number, cleaned.get("student_number"), messages)
+            else:
+                _collect_candidate(report, candidates, seen, row_number, item)
+
+    existing = find_existing_values(db, [item for _, item in candidates])
+    accepted = []
+    for row_number, item in candidates:
+        conflicts = [message for name, message in UNIQUE_FIELDS.items() if getattr(item, name) in existing[name]]
+        if conflicts:
+            report.add_error(row_number, item.student_number, conflicts)
+        else:
+            accepted.append((row_number, item))
+
+    if not accepted:
+        return report
+
+    hashes = hash_initial_passwords([item.student_number for _, item in accepted], hash_workers)
+    role_id = _user_role(db).id
+    prepared = [(row_number, item, hashed) for (row_number, item), hashed in zip(accepted, hashes)]
+    for batch in _chunks(prepared, batch_size):
+        try:
+            _insert_batch(db, role_id, batch)
+        except IntegrityError as exc:
+            # Someone inserted a clashing row since the probe; report the batch instead of guessing.
+            db.rollback()
+            message = _translate_integrity_error(exc).detail
+            for row_number, item, _ in batch:
+                report.add_error(row_number, item.student_number, [message])
+            continue
+        report.created += len(batch)
+
+    logger.info(
+        "Student import finished: %s rows, %s created, %s failed",
+        report.total_rows,
+        report.created,
+        len(report.errors),
+    )
+    return report
+
+
+_import_executor: Optional[ThreadPoolExecutor] = None
+_import_executor_lock = Lock()
+
+
+def _get_import_executor() -> ThreadPoolExecutor:
+    global _import_executor
+    with _import_executor_lock:
+        if _import_executor is None:
+            # One import at a time, off the shared request threadpool.
+            _import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="student-import")
+        return _import_executor
+
+
+def import_upload(
+    upload: BinaryIO,
+    import_format: str,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> StudentImportReport:
+    db = session_factory()
+    try:
+        return import_students(db, iter_import_rows(upload, import_format))
+    finally:
+        db.close()
+
+
+async def import_upload_async(
+    upload: BinaryIO,
+    import_format: str,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> StudentImportReport:
+    """Run :func:`import_upload` on the dedicated import thread without holding a request worker."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_import_executor(), import_upload, upload, import_format, session_factory)
+
+
+def shutdown_import_executor() -> None:
+    global _import_executor
+    with _import_executor_lock:
+        executor, _import_executor = _import_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 
+from app.core.principal_cache import principal_cache
 from app.models.student_profile import StudentProfile
 from app.models.user import User
 from app.schemas.student import StudentProfileOut, StudentProfileUpdate
@@ -71,6 +72,7 @@ def update_my_profile(
         db.rollback()
         raise HTTPException(status_code=400, detail="اطلاعات وارد شده تکراری است") from exc
 
+    principal_cache.invalidate(current_user.student_number)
     db.refresh(profile)
 
     return StudentProfileOut.from_orm(profile)
@@ -0,0 +1,124 @@
+from typing import List, Mapping, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.student_profile import StudentProfile
+from app.models.user import User
+
+# Order in which conflicts are reported when several fields clash at once.
+UNIQUE_FIELDS = ("student_number", "national_code", "phone_number")
+
+
+class UniquenessProbe:
+    """Finds every clashing unique field of a student in one ``UNION ALL`` round-trip.
+
+    Each caller keeps its own wording through ``messages`` (field -> detail);
+    :meth:`ensure_unique` raises a 400 for the first conflicting field.
+    """
+
+    def __init__(self, messages: Mapping[str, str]):
+        self.messages = dict(messages)
+
+    @staticmethod
+    def statement(
+        *,
+        student_number: Optional[str] = None,
+        national_code: Optional[str] = None,
+        phone_number: Optional[str] = None,
+        exclude_user_id: Optional[int] = None,
+    ):
+        def branch(field: str, model, column, value, owner_column):
+            query = select(literal(field).label("field")).select_from(model).where(column == value)
+            if exclude_user_id is not None:
+                query = query.where(owner_column != exclude_user_id)
+            return query
+
+        branches = []
+        if student_number is not None:
+            branches.append(branch("student_number", User, User.student_number, student_number, User.id))
+            branches.append(
+                branch(
+                    "student_number",
+                    StudentProfile,
+                    StudentProfile.student_number,
+                    student_number,
+                    StudentProfile.user_id,
+                )
+            )
+        if national_code is not None:
+            branches.append(
+                branch(
+                    "national_code",
+                    StudentProfile,
+                    StudentProfile.national_code,
+                    national_code,
+                    StudentProfile.user_id,
+                )
+            )
+        if phone_number is not None:
+            branches.append(
+                branch(
+                    "phone_number",
+                    StudentProfile,
+                    StudentProfile.phone_number,
+                    phone_number,
+                    StudentProfile.user_id,
+                )
+            )
+        if not branches:
+            return None
+        return union_all(*branches) if len(branches) > 1 else branches[0]
+
+    @staticmethod
+    def _ordered(fields) -> List[str]:
+        found = set(fields)
+        return [field for field in UNIQUE_FIELDS if field in found]
+
+    def conflicts(self, db: Session, **values) -> List[str]:
+        statement = self.statement(**values)
+        if statement is None:
+            return []
+        return self._ordered(db.execute(statement).scalars())
+
+    async def conflicts_async(self, db: AsyncSession, **values) -> List[str]:
+        statement = self.statement(**values)
+        if statement is None:
+            return []
+        return self._ordered((await db.execute(statement)).scalars())
+
+    def conflict_exception(self, conflicts: List[str]) -> Optional[HTTPException]:
+        if not conflicts:
+            return None
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=self.messages[conflicts[0]])
+
+    def ensure_unique(self, db: Session, **values) -> None:
+        exception = self.conflict_exception(self.conflicts(db, **values))
+        if exception:
+            raise exception
+
+    async def ensure_unique_async(self, db: AsyncSession, **values) -> None:
+        exception = self.conflict_exception(await self.conflicts_async(db, **values))
+        if exception:
+            raise exception
+
+
+# Wording used by public registration.
+registration_probe = UniquenessProbe(
+    {
+        "student_number": "این شماره دانشجویی قبلاً ثبت شده است",
+        "national_code": "این کد ملی قبلاً ثبت شده است",
+        "phone_number": "این شماره تلفن قبلاً ثبت شده است",
+    }
+)
+
+# Wording used by admin student management and profile edits.
+student_probe = UniquenessProbe(
+    {
+        "student_number": "شماره دانشجویی قبلاً ثبت شده است",
+        "national_code": "کد ملی قبلاً ثبت شده است",
+        "phone_number": "شماره تماس قبلاً ثبت شده است",
+    }
+)
@@ -1,4 +1,6 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
@@ -6,7 +8,10 @@ from app.models.student_profile import StudentProfile
 from app.models.user import User
 from app.models.role import Role
 from app.schemas.student import StudentProfileUpdate, AdminStudentUpdate
+from app.core.pagination import keyset_paginate
+from app.core.principal_cache import principal_cache
 from app.core.security import hash_password
+from app.services.uniqueness import student_probe
 
 
 def _check_uniqueness(
@@ -16,48 +21,13 @@ def _check_uniqueness(
     exclude_user_id: int,
     phone_number: str | None = None,
 ):
-
-    conflict = (
-        db.query(StudentProfile)
-        .filter(
-            StudentProfile.user_id != exclude_user_id,
-            (StudentProfile.national_code == national_code)
-            | (StudentProfile.student_number == student_number),
-        )
-        .first()
-    )
-    if conflict:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="کد ملی یا شماره دانشجویی تکراری است",
-        )
-
-    user_conflict = (
-        db.query(User)
-        .filter(User.student_number == student_number, User.id != exclude_user_id)
-        .first()
+    student_probe.ensure_unique(
+        db,
+        student_number=student_number,
+        national_code=national_code,
+        phone_number=phone_number,
+        exclude_user_id=exclude_user_id,
     )
-    if user_conflict:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="شماره دانشجویی تکراری است",
-        )
-
-
-    if phone_number is not None:
-        phone_conflict = (
-            db.query(StudentProfile)
-            .filter(
-                StudentProfile.phone_number == phone_number,
-                StudentProfile.user_id != exclude_user_id,
-            )
-            .first()
-        )
-        if phone_conflict:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="شماره تماس قبلاً ثبت شده است",
-            )
 
 def _translate_integrity_error(exc: IntegrityError) -> HTTPException:
     message = str(exc.orig).lower() if getattr(exc, "orig", None) else str(exc).lower()
@@ -122,15 +92,49 @@ def update_my_profile(
 
 
 
+async def get_user_with_profile_async(db: AsyncSession, student_number: str) -> User | None:
+    result = await db.execute(
+        select(User)
+        .options(joinedload(User.profile), joinedload(User.role))
+        .where(User.student_number == student_number)
+    )
+    return result.scalars().first()
+
+
+async def is_phone_number_taken_async(db: AsyncSession, phone_number: str, exclude_user_id: int) -> bool:
+    conflicts = await student_probe.conflicts_async(db, phone_number=phone_number, exclude_user_id=exclude_user_id)
+    return bool(conflicts)
+
+
 def get_all_students(db: Session):
     return db.query(StudentProfile).order_by(StudentProfile.student_number.asc()).all()
 
 
-def get_students_paginated(db: Session, *, skip: int = 0, limit: int = 50):
-    query = db.query(StudentProfile).order_by(StudentProfile.student_number.asc())
-    total = query.count()
-    students = query.offset(skip).limit(limit).all()
-    return {"total": total, "students": students}
+STUDENTS_CURSOR_SCOPE = "students"
+
+
+def get_students_paginated(
+    db: Session,
+    *,
+    cursor: str | None = None,
+    limit: int = 50,
+    include_total: bool = True,
+):
+    """Keyset page over ``(student_number, id)``; the total is counted on the first page only."""
+    page = keyset_paginate(
+        db.query(StudentProfile),
+        (StudentProfile.student_number, StudentProfile.id),
+        scope=STUDENTS_CURSOR_SCOPE,
+        cursor=cursor,
+        limit=limit,
+        include_total=include_total,
+    )
+    return {
+        "total": page.total,
+        "students": page.items,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+    }
 
 
 def get_student_by_id(db: Session, student_id: int) -> StudentProfile:
@@ -161,6 +165,7 @@ def admin_update_student(
         data.phone_number,
     )
 
+    previous_student_number = profile.user.student_number if profile.user else None
     for field, value in data.dict(exclude_unset=True).items():
         setattr(profile, field, value)
     if profile.user:
@@ -171,6 +176,7 @@ def admin_update_student(
     except IntegrityError as exc:
         db.rollback()
         raise _translate_integrity_error(exc) from exc
+    principal_cache.invalidate(previous_student_number, data.student_number)
     db.refresh(profile)
     return profile
 
@@ -183,15 +189,6 @@ def admin_create_student(db: Session, data: AdminStudentUpdate) -> StudentProfil
         phone_number=data.phone_number,
     )
 
-
-    existing_phone = (
-        db.query(StudentProfile)
-        .filter(StudentProfile.phone_number == data.phone_number)
-        .first()
-    )
-    if existing_phone:
-        raise HTTPException(status_code=400, detail="شماره تماس قبلاً ثبت شده است")
-
     user_role = db.query(Role).filter(Role.name == "user").first()
     if not user_role:
         user_role = Role(name="user", description="کاربر عادی")
@@ -200,7 +197,7 @@ def admin_create_student(db: Session, data: AdminStudentUpdate) -> StudentProfil
 
     user = User(
         student_number=data.student_number,
-        hashed_password=hash_password(data.student_number),
+        hashed_password=hash_password(data.student_number, "user"),
         role_id=user_role.id,
     )
     db.add(user)
@@ -229,10 +226,12 @@ def admin_create_student(db: Session, data: AdminStudentUpdate) -> StudentProfil
 def admin_delete_student(db: Session, student_id: int) -> None:
     profile = get_student_by_id(db, student_id)
     user = profile.user
+    student_number = user.student_number if user else None
     db.delete(profile)
     if user:
         db.delete(user)
     db.commit()
+    principal_cache.invalidate(student_number)
 
 
 
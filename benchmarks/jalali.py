@@ -0,0 +1,66 @@
+"""Jalali formatting against the month-by-month loop kept in test/test_jalali.py.
+
+Run from the repository root: ``python -m benchmarks.jalali``.
+"""
+
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from app.core import jalali
+from app.core.jalali import format_jalali, format_jalali_many
+from test.test_jalali import reference_gregorian_to_jalali
+
+
+def legacy_format(value, include_time=False):
+    """format_persian_datetime as it was before app.core.jalali."""
+    if not value:
+        return ""
+    jy, jm, jd = reference_gregorian_to_jalali(value.year, value.month, value.day)
+    date_part = f"{jy:04d}-{jm:02d}-{jd:02d}"
+    if include_time:
+        return f"{date_part} {value.strftime('%H:%M:%S')}"
+    return date_part
+
+
+def sample(count=500, days=5 * 365, seed=1403):
+    """``count`` timestamps spread over ``days`` — roughly one dashboard or export page."""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    return [start + timedelta(days=rng.randrange(days), seconds=rng.randrange(86400)) for _ in range(count)]
+
+
+def clear_caches():
+    jalali._from_ordinal.cache_clear()
+    jalali._date_part.cache_clear()
+
+
+def best_ms(function, number=20, repeat=7):
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1000
+
+
+def cold_ms(function, repeat=7):
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        timings.append(timeit.timeit(function, number=1))
+    return min(timings) * 1000
+
+
+def main():
+    values = sample()
+    assert [legacy_format(value) for value in values] == [format_jalali(value) for value in values]
+
+    results = {
+        "old": best_ms(lambda: [legacy_format(value) for value in values]),
+        "new, cold cache": cold_ms(lambda: [format_jalali(value) for value in values]),
+        "new, warm cache": best_ms(lambda: [format_jalali(value) for value in values]),
+        "batch": best_ms(lambda: format_jalali_many(values)),
+    }
+    print(f"{len(values)} datetimes over ~5 years")
+    for name, milliseconds in results.items():
+        print(f"  {name:<16}{milliseconds:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Digit validators against the pre-fast-path implementation kept in test/test_validators.py.
+
+Run from the repository root: ``python -m benchmarks.validators``.
+"""
+
+import timeit
+
+from app.core import validators
+from app.core.validators import validate_many
+from test.test_validators import (
+    legacy_national_code,
+    legacy_normalize_digits,
+    legacy_phone_number,
+    legacy_student_number,
+)
+
+CASES = [
+    ("normalize_digits", validators.normalize_digits, legacy_normalize_digits, ["0012345678", "0912 345 6789"]),
+    ("validate_national_code", validators.validate_national_code, legacy_national_code, ["0012345678", "1234567890"]),
+    ("validate_student_number", validators.validate_student_number, legacy_student_number, ["400123456", "401987654"]),
+    ("validate_phone_number", validators.validate_phone_number, legacy_phone_number, ["09123456789", "09351234567"]),
+]
+
+
+def best_of(function, values, number=20000):
+    return min(timeit.repeat(lambda: [function(value) for value in values], number=number, repeat=5))
+
+
+def import_rows(count):
+    return [
+        {
+            "student_number": f"4000{index:05d}",
+            "national_code": f"{index:010d}",
+            "phone_number": f"0912{index:07d}",
+            "gender": "برادر" if index % 2 else "خواهر",
+        }
+        for index in range(count)
+    ]
+
+
+def main():
+    print(f"{'validator':<26}{'legacy':>12}{'current':>12}{'speedup':>10}")
+    for name, current, legacy, values in CASES:
+        legacy_seconds = best_of(legacy, values)
+        current_seconds = best_of(current, values)
+        print(f"{name:<26}{legacy_seconds:>11.4f}s{current_seconds:>11.4f}s{legacy_seconds / current_seconds:>9.2f}x")
+
+    rows = import_rows(10000)
+    seconds = min(timeit.repeat(lambda: validate_many(rows), number=1, repeat=5))
+    print(f"validate_many, {len(rows)} import rows: {seconds * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import asyncio
+import sqlite3
+import uuid
+
+from starlette.requests import Request
+
+from app.core.password_pool import bcrypt_hash
+from app.core.state_store import SQLiteStateStore
+from app.services import admin_auth_service
+from app.services.admin_auth_service import BUSY_MESSAGE, MAX_ADMIN_LOGIN_ATTEMPTS, AdminPasswordVerifier
+
+
+def make_request(cookie=None):
+    headers = [(b"cookie", f"admin_access_token={cookie}".encode())] if cookie else []
+    return Request({"type": "http", "headers": headers, "client": (f"client-{uuid.uuid4()}", 5000)})
+
+
+def make_verifier(calls=None):
+    def resolve():
+        if calls is not None:
+            calls.append("resolve")
+        return bcrypt_hash(b"secret-pass", 4)
+
+    return AdminPasswordVerifier(resolve_hash=resolve)
+
+
+def test_hash_is_resolved_lazily_and_once():
+    calls = []
+    verifier = make_verifier(calls)
+    assert calls == []
+
+    request = make_request()
+    assert verifier.authenticate(request, " secret-pass ") == (True, None)
+    assert verifier.authenticate(request, "secret-pass") == (True, None)
+    assert calls == ["resolve"]
+
+
+def test_locked_out_client_costs_no_bcrypt():
+    verifier = make_verifier()
+    request = make_request()
+
+    for _ in range(MAX_ADMIN_LOGIN_ATTEMPTS):
+        authenticated, _ = verifier.authenticate(request, "wrong")
+        assert not authenticated
+    calls_at_lockout = verifier.stats()["bcrypt_calls"]
+
+    authenticated, message = verifier.authenticate(request, "secret-pass")
+
+    assert not authenticated
+    assert "قفل" in message
+    assert verifier.stats()["bcrypt_calls"] == calls_at_lockout == MAX_ADMIN_LOGIN_ATTEMPTS
+    assert verifier.stats()["locked_out"] == 1
+
+
+def test_success_resets_the_failure_budget():
+    verifier = make_verifier()
+    request = make_request()
+
+    verifier.authenticate(request, "wrong")
+    assert verifier.authenticate(request, "secret-pass") == (True, None)
+    _, message = verifier.authenticate(request, "wrong")
+
+    assert str(MAX_ADMIN_LOGIN_ATTEMPTS - 1) in message
+
+
+def test_remembered_token_skips_bcrypt():
+    verifier = make_verifier()
+    token = f"token-{uuid.uuid4()}"
+    verifier.remember(token, "secret-pass")
+
+    assert verifier.authenticate(make_request(cookie=token), "secret-pass") == (True, None)
+    assert verifier.stats()["cache_hits"] == 1
+    assert verifier.stats()["bcrypt_calls"] == 0
+
+    # A different password with the same token still goes through bcrypt.
+    authenticated, _ = verifier.authenticate(make_request(cookie=token), "wrong")
+    assert not authenticated
+    assert verifier.stats()["bcrypt_calls"] == 1
+
+    verifier.forget(token)
+    assert verifier.authenticate(make_request(cookie=token), "secret-pass") == (True, None)
+    assert verifier.stats()["cache_hits"] == 1
+
+
+def test_async_verification_records_timing():
+    verifier = make_verifier()
+
+    assert asyncio.run(verifier.authenticate_async(make_request(), "secret-pass")) == (True, None)
+    authenticated, _ = asyncio.run(verifier.authenticate_async(make_request(), "wrong"))
+
+    stats = verifier.stats()
+    assert not authenticated
+    assert stats["verified"] == 1
+    assert stats["rejected"] == 1
+    assert stats["bcrypt_calls"] == 2
+    assert stats["bcrypt_max_ms"] >= stats["bcrypt_avg_ms"] > 0
+
+
+
+def test_async_verification_waits_for_a_locked_store_off_the_event_loop(monkeypatch, tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    store = SQLiteStateStore(path, busy_timeout_ms=300)
+    monkeypatch.setattr(admin_auth_service, "state_store", store)
+    verifier = make_verifier()
+
+    async def scenario():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        result = await verifier.authenticate_async(make_request(), "secret-pass")
+        ticker.cancel()
+        return result, ticks
+
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        result, ticks = asyncio.run(scenario())
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+        store.close()
+
+    assert result == (False, BUSY_MESSAGE)
+    assert ticks >= 5
+    assert verifier.stats()["bcrypt_calls"] == 0
+
+def test_health_keeps_attack_metrics_behind_admin_auth():
+    from fastapi.testclient import TestClient
+
+    import app.main as main_module
+    from app.core.security import get_current_admin
+
+    client = TestClient(main_module.app)
+    public = client.get("/health").json()
+    anonymous = client.get("/health/metrics")
+    main_module.app.dependency_overrides[get_current_admin] = lambda: None
+    try:
+        metrics = client.get("/health/metrics")
+    finally:
+        main_module.app.dependency_overrides.clear()
+
+    assert public["status"] == "healthy"
+    assert not {"admin_verifier", "rate_limit", "login"} & set(public)
+    assert anonymous.status_code == 401
+    assert metrics.status_code == 200
+    assert {"admin_verifier", "rate_limit", "login"} <= set(metrics.json())
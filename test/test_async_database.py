@@ -0,0 +1,106 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, to_async_database_url
+from app.models.student_profile import StudentProfile
+from app.schemas.auth import RegisterRequest
+from app.services.auth_service import (
+    authenticate_user_async,
+    enforce_single_national_id_authentication_async,
+    register_user_async,
+)
+from app.services.user_service import get_user_with_profile_async, is_phone_number_taken_async
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.audit_log  # noqa: F401
+import app.models.role  # noqa: F401
+import app.models.user  # noqa: F401
+
+
+def run_with_async_session(scenario):
+    async def runner():
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        try:
+            async with session_factory() as db:
+                return await scenario(db)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(runner())
+
+
+def valid_payload(**overrides):
+    payload = {
+        "first_name": "علی",
+        "last_name": "رضایی",
+        "student_number": "123456789",
+        "national_code": "0123456789",
+        "phone_number": "09123456789",
+        "gender": "brother",
+        "address": "تهران",
+    }
+    payload.update(overrides)
+    return RegisterRequest(**payload)
+
+
+def test_to_async_database_url_maps_known_drivers():
+    assert to_async_database_url("sqlite:///./basij.db") == "sqlite+aiosqlite:///./basij.db"
+    assert to_async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert to_async_database_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert to_async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_register_then_authenticate_with_async_session():
+    async def scenario(db):
+        registered = await register_user_async(db, valid_payload())
+        authenticated = await authenticate_user_async(db, "0123456789", "123456789")
+        rejected = await authenticate_user_async(db, "0123456789", "000000000")
+        return registered, authenticated, rejected
+
+    registered, authenticated, rejected = run_with_async_session(scenario)
+
+    assert registered.role.name == "user"
+    assert authenticated is not None
+    assert authenticated.profile.national_code == "0123456789"
+    assert rejected is None
+
+
+def test_register_user_async_rejects_duplicate_phone_number():
+    async def scenario(db):
+        await register_user_async(db, valid_payload())
+        try:
+            await register_user_async(
+                db,
+                valid_payload(student_number="987654321", national_code="9876543210"),
+            )
+        except Exception as exc:
+            return exc
+        return None
+
+    error = run_with_async_session(scenario)
+
+    assert error is not None
+    assert error.detail == "این شماره تلفن قبلاً ثبت شده است"
+
+
+def test_enforce_single_national_id_authentication_async_marks_profile():
+    async def scenario(db):
+        user = await register_user_async(db, valid_payload())
+        await enforce_single_national_id_authentication_async(db, user)
+        await enforce_single_national_id_authentication_async(db, user)
+        profile = await db.get(StudentProfile, user.profile.id)
+        loaded = await get_user_with_profile_async(db, "123456789")
+        phone_taken = await is_phone_number_taken_async(db, "09123456789", exclude_user_id=0)
+        phone_own = await is_phone_number_taken_async(db, "09123456789", exclude_user_id=user.id)
+        return profile.has_authenticated, loaded.profile.first_name, phone_taken, phone_own
+
+    assert run_with_async_session(scenario) == (True, "علی", True, False)
@@ -0,0 +1,104 @@
+import csv
+from datetime import datetime, timedelta
+from io import BytesIO, StringIO
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.audit_log import AuditLog
+from app.services.audit_export import (
+    AUDIT_EXPORT_HEADERS,
+    audit_log_export_statement,
+    build_audit_log_xlsx,
+    iter_audit_log_chunks,
+    iter_audit_log_csv,
+    iter_file,
+    write_audit_log_xlsx,
+)
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.role  # noqa: F401
+import app.models.student_profile  # noqa: F401
+import app.models.user  # noqa: F401
+
+
+def make_db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return testing_session_local()
+
+
+def seed_logs(db, count: int):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    for index in range(count):
+        db.add(
+            AuditLog(
+                action="delete" if index % 2 else "create",
+                entity="light_path_student",
+                entity_id=index,
+                description="توضیح",
+                ip_address="127.0.0.1",
+                created_at=start + timedelta(minutes=index),
+            )
+        )
+    db.commit()
+
+
+def test_csv_export_streams_one_block_per_chunk():
+    db = make_db_session()
+    seed_logs(db, 7)
+
+    blocks = list(iter_audit_log_csv(db, audit_log_export_statement(), chunk_size=3))
+
+    assert len(blocks) == 1 + 3
+    rows = list(csv.reader(StringIO(b"".join(blocks).decode("utf-8"))))
+    assert rows[0] == AUDIT_EXPORT_HEADERS
+    assert [row[4] for row in rows[1:]] == ["6", "5", "4", "3", "2", "1", "0"]
+    assert rows[1][5] == "توضیح"
+
+
+def test_export_statement_applies_filters_and_returns_tuples():
+    db = make_db_session()
+    seed_logs(db, 6)
+
+    statement = audit_log_export_statement(
+        action="delete",
+        date_from=datetime(2024, 1, 1, 8, 2),
+    )
+    chunks = list(iter_audit_log_chunks(db, statement, chunk_size=10))
+
+    assert len(chunks) == 1
+    assert [row[4] for row in chunks[0]] == [5, 3]
+    assert not isinstance(chunks[0][0], AuditLog)
+
+
+def test_excel_export_splits_sheets_at_row_cap():
+    from openpyxl import load_workbook
+
+    db = make_db_session()
+    seed_logs(db, 5)
+    target = BytesIO()
+
+    written = write_audit_log_xlsx(db, audit_log_export_statement(), target, chunk_size=2, max_rows_per_sheet=3)
+
+    workbook = load_workbook(BytesIO(target.getvalue()), read_only=True)
+    assert written == 5
+    assert workbook.sheetnames == ["Audit Logs", "Audit Logs 2", "Audit Logs 3"]
+    first_sheet = list(workbook["Audit Logs"].values)
+    assert list(first_sheet[0]) == AUDIT_EXPORT_HEADERS
+    assert first_sheet[1][4] == 4
+    assert first_sheet[1][7] == "2024-01-01 08:04"
+    assert len(list(workbook["Audit Logs 3"].values)) == 2
+
+
+def test_build_audit_log_xlsx_returns_rewound_spooled_file():
+    db = make_db_session()
+    seed_logs(db, 3)
+
+    spool = build_audit_log_xlsx(db, audit_log_export_statement())
+    content = b"".join(iter_file(spool, block_size=128))
+
+    assert content.startswith(b"PK")
+    assert spool.closed
@@ -0,0 +1,136 @@
+import csv
+import gzip
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+
+from openpyxl import load_workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.audit_log import AuditLog
+from app.services.audit_export_jobs import JOB_DONE, ExportJobManager, export_cache_key
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.role  # noqa: F401
+import app.models.student_profile  # noqa: F401
+import app.models.user  # noqa: F401
+
+
+def make_session_factory(count: int):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = factory()
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    for index in range(count):
+        db.add(
+            AuditLog(
+                action="delete" if index % 2 else "create",
+                entity="light_path_student",
+                entity_id=index,
+                created_at=start + timedelta(minutes=index),
+            )
+        )
+    db.commit()
+    db.close()
+    return factory
+
+
+def wait_for(manager, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.status in {"done", "failed"}:
+            return job
+        time.sleep(0.02)
+    raise AssertionError("export job did not finish in time")
+
+
+def make_manager(tmp_path, count=25):
+    return ExportJobManager(make_session_factory(count), str(tmp_path), chunk_size=10)
+
+
+def test_csv_job_writes_artifact_and_reports_progress(tmp_path):
+    manager = make_manager(tmp_path)
+    try:
+        job = wait_for(manager, manager.submit("csv", {"action": "create"}).id)
+    finally:
+        manager.shutdown()
+
+    assert job.status == JOB_DONE
+    assert job.total_rows == 13
+    assert job.rows_written == 13
+    assert job.to_dict()["progress"] == 1.0
+    with open(job.artifact_path, encoding="utf-8") as artifact:
+        rows = list(csv.reader(artifact))
+    assert len(rows) == 14
+    assert {row[2] for row in rows[1:]} == {"create"}
+
+
+def test_gzip_and_xlsx_jobs(tmp_path):
+    manager = make_manager(tmp_path)
+    try:
+        gz_job = wait_for(manager, manager.submit("csv.gz", {}).id)
+        xlsx_job = wait_for(manager, manager.submit("xlsx", {}).id)
+    finally:
+        manager.shutdown()
+
+    with gzip.open(gz_job.artifact_path, "rt", encoding="utf-8") as artifact:
+        assert len(list(csv.reader(StringIO(artifact.read())))) == 26
+    assert gz_job.filename == "audit_logs.csv.gz"
+
+    workbook = load_workbook(xlsx_job.artifact_path)
+    assert workbook["Audit Logs"].max_row == 26
+
+
+def test_identical_request_reuses_fresh_artifact(tmp_path):
+    manager = make_manager(tmp_path)
+    filters = {"user_id": None, "action": "delete", "date_from": datetime(2024, 1, 1), "date_to": None}
+    try:
+        first = wait_for(manager, manager.submit("csv", filters).id)
+        second = manager.submit("csv", dict(filters))
+    finally:
+        manager.shutdown()
+
+    assert not first.reused
+    assert second.reused
+    assert second.status == JOB_DONE
+    assert second.artifact_path == first.artifact_path
+    assert export_cache_key("csv", filters) != export_cache_key("csv.gz", filters)
+
+
+def test_job_state_is_readable_from_another_manager(tmp_path):
+    manager = make_manager(tmp_path)
+    try:
+        job = wait_for(manager, manager.submit("csv", {}).id)
+    finally:
+        manager.shutdown()
+
+    other = ExportJobManager(manager.session_factory, str(tmp_path))
+    restored = other.get(job.id)
+
+    assert restored is not None
+    assert restored.status == JOB_DONE
+    assert restored.artifact_path == job.artifact_path
+    assert other.get("../etc") is None
+    assert other.get("missing") is None
+
+
+def test_purge_removes_expired_artifacts(tmp_path):
+    manager = make_manager(tmp_path)
+    try:
+        job = wait_for(manager, manager.submit("csv", {}).id)
+    finally:
+        manager.shutdown()
+
+    manager.artifact_ttl = 0
+    assert manager.purge_expired() >= 2
+    assert manager.get(job.id) is None
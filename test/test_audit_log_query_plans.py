@@ -0,0 +1,149 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.core.database import Base, ensure_audit_log_indexes
+from app.models.audit_log import AuditLog
+from app.routers import admin_ui
+from app.services.audit_export import audit_log_export_statement, iter_audit_log_csv
+from app.services.audit_service import get_simple_audit_stats
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.role  # noqa: F401
+import app.models.student_profile  # noqa: F401
+import app.models.user  # noqa: F401
+
+FILTER_CASES = [
+    {},
+    {"user_id": 7},
+    {"action": "LOGIN"},
+    {"date_from": datetime(2024, 1, 1), "date_to": datetime(2024, 2, 1)},
+    {"user_id": 7, "date_from": datetime(2024, 1, 1)},
+    {"action": "LOGIN", "date_to": datetime(2024, 2, 1)},
+    {"user_id": 7, "action": "LOGIN", "date_from": datetime(2024, 1, 1), "date_to": datetime(2024, 2, 1)},
+]
+
+
+def make_engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@contextmanager
+def capture_audit_queries(engine):
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "audit_logs" in statement and not statement.lstrip().upper().startswith("EXPLAIN"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def plan_problems(engine, captured):
+    """Run EXPLAIN QUERY PLAN on each captured statement and list table scans / sort spills."""
+    problems = []
+    with engine.connect() as connection:
+        for statement, parameters in captured:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            for row in plan:
+                detail = row[-1]
+                full_scan = detail.startswith("SCAN audit_logs") and "INDEX" not in detail
+                if full_scan or "USE TEMP B-TREE" in detail:
+                    problems.append((detail, " ".join(statement.split())))
+    return problems
+
+
+def make_request(query_string: str = ""):
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "path": "/audit-logs",
+        "raw_path": b"/audit-logs",
+        "query_string": query_string.encode(),
+        "headers": [(b"host", b"testserver")],
+        "scheme": "http",
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    return Request(scope)
+
+
+@pytest.mark.parametrize("filters", FILTER_CASES)
+def test_audit_log_page_queries_use_indexes(filters):
+    engine = make_engine()
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        AuditLog(action="LOGIN", user_id=7, created_at=datetime(2024, 1, 1 + index % 20)) for index in range(30)
+    )
+    db.commit()
+
+    page_args = {"user_id": None, "action": None, "date_from": None, "date_to": None, **filters}
+    with capture_audit_queries(engine) as captured:
+        first = admin_ui.audit_logs_page(make_request(), db=db, _=None, cursor=None, limit=10, **page_args)
+        next_cursor = first.context["next_url"].split("cursor=")[1]
+        admin_ui.audit_logs_page(make_request(), db=db, _=None, cursor=next_cursor, limit=10, **page_args)
+
+    assert len(captured) == 2
+    assert plan_problems(engine, captured) == []
+
+
+@pytest.mark.parametrize("filters", FILTER_CASES)
+def test_audit_log_export_queries_use_indexes(filters):
+    engine = make_engine()
+    db = sessionmaker(bind=engine)()
+
+    with capture_audit_queries(engine) as captured:
+        list(iter_audit_log_csv(db, audit_log_export_statement(**filters)))
+
+    assert captured
+    assert plan_problems(engine, captured) == []
+
+
+def test_audit_stats_queries_use_indexes():
+    engine = make_engine()
+    db = sessionmaker(bind=engine)()
+
+    with capture_audit_queries(engine) as captured:
+        get_simple_audit_stats(db)
+
+    assert len(captured) == 2
+    assert plan_problems(engine, captured) == []
+
+
+def test_harness_flags_unindexed_filters():
+    engine = make_engine()
+    with capture_audit_queries(engine) as captured:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT id FROM audit_logs WHERE description = 'x' ORDER BY ip_address"))
+
+    problems = plan_problems(engine, captured)
+    assert any(detail.startswith("SCAN audit_logs") for detail, _ in problems)
+
+
+def test_bootstrap_adds_missing_indexes_to_existing_table():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE audit_logs (id INTEGER PRIMARY KEY, user_id INTEGER, action VARCHAR(50), "
+                "entity VARCHAR(50), entity_id INTEGER, description VARCHAR(255), "
+                "ip_address VARCHAR(45), created_at DATETIME)"
+            )
+        )
+
+    ensure_audit_log_indexes(engine)
+    ensure_audit_log_indexes(engine)
+
+    index_names = {index["name"] for index in inspect(engine).get_indexes("audit_logs")}
+    assert {index.name for index in AuditLog.__table__.indexes} <= index_names
@@ -0,0 +1,124 @@
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.audit_log import AuditLog
+from app.services.audit_service import create_audit_log
+from app.services.audit_sink import AuditSink
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.role  # noqa: F401
+import app.models.student_profile  # noqa: F401
+import app.models.user  # noqa: F401
+
+
+def make_session_factory():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def make_record(index: int) -> dict:
+    return {
+        "user_id": None,
+        "action": "create",
+        "entity": "light_path_student",
+        "entity_id": index,
+        "description": None,
+        "ip_address": "127.0.0.1",
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def count_logs(session_factory) -> int:
+    db = session_factory()
+    try:
+        return db.query(AuditLog).count()
+    finally:
+        db.close()
+
+
+def test_sink_flushes_full_batches_in_background():
+    session_factory = make_session_factory()
+    sink = AuditSink(session_factory, batch_size=5, flush_interval=60)
+    sink.start()
+    try:
+        for index in range(10):
+            sink.enqueue(make_record(index))
+        deadline = time.monotonic() + 5
+        while sink.stats()["flushed"] < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        sink.stop()
+
+    assert count_logs(session_factory) == 10
+    assert sink.stats()["batches"] == 2
+
+
+def test_sink_flushes_partial_batch_after_interval():
+    session_factory = make_session_factory()
+    sink = AuditSink(session_factory, batch_size=100, flush_interval=0.05)
+    sink.start()
+    try:
+        sink.enqueue(make_record(1))
+        deadline = time.monotonic() + 5
+        while sink.stats()["flushed"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert count_logs(session_factory) == 1
+    finally:
+        sink.stop()
+
+
+def test_stop_flushes_remaining_records():
+    session_factory = make_session_factory()
+    sink = AuditSink(session_factory, batch_size=100, flush_interval=60)
+    sink.start()
+    for index in range(3):
+        sink.enqueue(make_record(index))
+    sink.stop()
+
+    assert count_logs(session_factory) == 3
+    assert sink.stats()["buffered"] == 0
+
+
+def test_drop_oldest_policy_keeps_newest_records():
+    session_factory = make_session_factory()
+    sink = AuditSink(session_factory, batch_size=2, max_buffer=2, overflow_policy="drop_oldest")
+    for index in range(4):
+        sink.enqueue(make_record(index))
+    sink.flush()
+
+    db = session_factory()
+    assert sorted(entity_id for (entity_id,) in db.query(AuditLog.entity_id)) == [2, 3]
+    assert sink.stats()["dropped"] == 2
+
+
+def test_drop_newest_policy_rejects_new_records():
+    session_factory = make_session_factory()
+    sink = AuditSink(session_factory, batch_size=2, max_buffer=2, overflow_policy="drop_newest")
+
+    accepted = [sink.enqueue(make_record(index)) for index in range(3)]
+
+    assert accepted == [True, True, False]
+    assert sink.stats()["dropped"] == 1
+
+
+def test_create_audit_log_writes_inline_when_sink_is_not_running():
+    session_factory = make_session_factory()
+    db = session_factory()
+    request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.1"))
+
+    create_audit_log(db=db, action="delete", request=request, entity="quran_scholar", entity_id=7)
+
+    log = db.query(AuditLog).one()
+    assert log.ip_address == "10.0.0.1"
+    assert log.entity_id == 7
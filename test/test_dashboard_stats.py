@@ -0,0 +1,107 @@
+from datetime import date
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.audit_log import AuditLog
+from app.models.noor_program import LightPathStudent, QuranClassRequest
+from app.models.role import Role
+from app.models.user import User
+from app.services.dashboard_stats import DashboardStatsCache, compute_dashboard_stats
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.student_profile  # noqa: F401
+
+
+def make_db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return testing_session_local()
+
+
+def seed(db):
+    role = Role(name="user", description="کاربر")
+    db.add(role)
+    db.flush()
+    db.add_all(
+        [
+            User(student_number="400000001", hashed_password="x", role_id=role.id),
+            User(student_number="400000002", hashed_password="x", role_id=role.id),
+            LightPathStudent(
+                first_name="علی",
+                last_name="رضایی",
+                email="a@light-path.local",
+                phone_number="09120000000",
+                enrollment_date=date(2024, 1, 1),
+            ),
+            QuranClassRequest(first_name="محمد", last_name="کریمی", level=2),
+            QuranClassRequest(first_name="حسن", last_name="احمدی", level=3),
+            QuranClassRequest(first_name="رضا", last_name="موسوی", level=4),
+            AuditLog(action="create", entity="light_path_student"),
+            AuditLog(action="update", entity="student_profile"),
+            AuditLog(action="delete", entity="quran_scholar"),
+            AuditLog(action="delete", entity="student_profile"),
+            AuditLog(action="login", entity="user"),
+        ]
+    )
+    db.commit()
+
+
+def capture_statements(db):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def test_all_counters_come_from_one_query():
+    db = make_db_session()
+    seed(db)
+    statements = capture_statements(db)
+
+    stats = compute_dashboard_stats(db)
+
+    assert len(statements) == 1
+    assert stats == {
+        "users_count": 2,
+        "light_path_students_count": 1,
+        "quran_class_requests_count": 3,
+        "total_logs": 5,
+        "total_changes": 4,
+        "deleted_events": 1,
+    }
+
+
+def test_empty_tables_report_zero():
+    db = make_db_session()
+
+    assert set(compute_dashboard_stats(db).values()) == {0}
+
+
+def test_cache_serves_repeat_reads_until_ttl_or_invalidation():
+    db = make_db_session()
+    seed(db)
+    now = [0.0]
+    cache = DashboardStatsCache(ttl_seconds=5, clock=lambda: now[0])
+    statements = capture_statements(db)
+
+    assert cache.get(db)["quran_class_requests_count"] == 3
+    db.add(QuranClassRequest(first_name="مهدی", last_name="نوری", level=1))
+    db.commit()
+    statements.clear()
+
+    assert cache.get(db)["quran_class_requests_count"] == 3
+    assert statements == []
+
+    cache.invalidate()
+    assert cache.get(db)["quran_class_requests_count"] == 4
+
+    db.add(QuranClassRequest(first_name="امیر", last_name="صادقی", level=1))
+    db.commit()
+    now[0] += 6
+    assert cache.get(db)["quran_class_requests_count"] == 5
@@ -0,0 +1,342 @@
+import asyncio
+import dataclasses
+import smtplib
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.email_outbox import EmailOutboxMessage
+from app.services import email_service
+from app.services.email_outbox import AsyncSMTPSender, EmailOutbox, OutboxItem, SMTPSender
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.audit_log  # noqa: F401
+import app.models.role  # noqa: F401
+import app.models.student_profile  # noqa: F401
+import app.models.user  # noqa: F401
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Just enough SMTP to accept mail: EHLO, MAIL, RCPT, DATA, NOOP, RSET, QUIT."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, drop_after_messages=None):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+        self.drop_after_messages = drop_after_messages
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stand-in ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(" ", 1)[0].upper()
+            if command in {"EHLO", "HELO"}:
+                self.reply("250 stand-in")
+            elif command == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                recipients.append(line.split(":", 1)[1].strip(" <>"))
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                data = []
+                while True:
+                    data_line = self.rfile.readline().decode()
+                    if data_line in {".\r\n", ".\n", ""}:
+                        break
+                    data.append(data_line)
+                self.server.messages.append((recipients, "".join(data)))
+                self.reply("250 queued")
+                if self.server.drop_after_messages and len(self.server.messages) % self.server.drop_after_messages == 0:
+                    return
+            elif command in {"NOOP", "RSET"}:
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+def make_session_factory():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def make_outbox(session_factory, sender_factory, **kwargs):
+    return EmailOutbox(session_factory, sender_factory, email_from="noreply@example.com", **kwargs)
+
+
+def statuses(session_factory):
+    db = session_factory()
+    try:
+        return [row.status for row in db.query(EmailOutboxMessage).order_by(EmailOutboxMessage.id)]
+    finally:
+        db.close()
+
+
+def test_sender_reuses_one_connection_and_reconnects_when_dropped():
+    server = SMTPStandIn(drop_after_messages=2)
+    sender = SMTPSender("127.0.0.1", server.port, starttls=False)
+    try:
+        outbox = make_outbox(make_session_factory(), lambda: sender)
+        for number in range(3):
+            sender.send(outbox._build_message(OutboxItem(number, f"user{number}@example.com", "Hi", "Body")))
+    finally:
+        sender.close()
+        server.close()
+
+    assert [recipients for recipients, _ in server.messages] == [
+        ["user0@example.com"],
+        ["user1@example.com"],
+        ["user2@example.com"],
+    ]
+    # The stand-in hung up after two messages; the third went over a fresh connection.
+    assert sender.connections == 2
+
+
+def test_outbox_delivers_batches_over_a_single_connection():
+    server = SMTPStandIn()
+    session_factory = make_session_factory()
+    outbox = make_outbox(
+        session_factory,
+        lambda: SMTPSender("127.0.0.1", server.port, starttls=False),
+        batch_size=2,
+    )
+    try:
+        for number in range(5):
+            outbox.queue(f"user{number}@example.com", "Registration successful", f"Hello {number}")
+        delivered = outbox.deliver_due()
+    finally:
+        outbox._sender.close()
+        server.close()
+
+    assert delivered == 5
+    assert server.connections == 1
+    assert len(server.messages) == 5
+    assert statuses(session_factory) == ["sent"] * 5
+    assert outbox.stats()["batches"] == 3
+
+
+class FlakySender:
+    def __init__(self, refuse=(), unreachable=False):
+        self.refuse = set(refuse)
+        self.unreachable = unreachable
+        self.sent = []
+        self.connections = 0
+        self.closed = 0
+
+    def send(self, message):
+        if self.unreachable:
+            raise ConnectionRefusedError("connection refused")
+        if message["To"] in self.refuse:
+            raise smtplib.SMTPRecipientsRefused({message["To"]: (550, b"no such user")})
+        self.sent.append(message["To"])
+
+    def close(self):
+        self.closed += 1
+
+    def close_if_idle(self):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def __call__(self):
+        return self.now
+
+
+def test_failed_messages_back_off_then_give_up():
+    clock = FakeClock()
+    session_factory = make_session_factory()
+    sender = FlakySender(refuse={"bad@example.com"})
+    outbox = make_outbox(session_factory, lambda: sender, max_attempts=2, backoff_seconds=30, clock=clock)
+    outbox.queue("good@example.com", "Hi", "Body")
+    outbox.queue("bad@example.com", "Hi", "Body")
+
+    assert outbox.deliver_due() == 1
+    assert statuses(session_factory) == ["sent", "pending"]
+    # Not due again until the backoff has passed.
+    assert outbox.deliver_due() == 0
+    assert sender.sent == ["good@example.com"]
+
+    clock.now += timedelta(seconds=31)
+    outbox.deliver_due()
+
+    db = session_factory()
+    bad = db.query(EmailOutboxMessage).filter(EmailOutboxMessage.to_email == "bad@example.com").one()
+    assert (bad.status, bad.attempts) == ("failed", 2)
+    assert "no such user" in bad.last_error
+    db.close()
+
+
+
+def test_registration_email_is_sent_directly_when_the_outbox_is_disabled(monkeypatch):
+    session_factory = make_session_factory()
+    sender = FlakySender()
+    outbox = make_outbox(session_factory, lambda: sender)
+    monkeypatch.setattr(email_service, "email_outbox", outbox)
+    monkeypatch.setattr(
+        email_service,
+        "settings",
+        dataclasses.replace(email_service.settings, smtp_host="smtp.example.com", email_outbox_enabled=False),
+    )
+
+    email_service.send_registration_confirmation_email("new@example.com", "Ali Rezaei")
+
+    assert sender.sent == ["new@example.com"]
+    assert sender.closed == 1
+    assert statuses(session_factory) == []
+    assert outbox.stats()["sent"] == 1
+
+def test_unreachable_server_backs_off_the_whole_batch():
+    clock = FakeClock()
+    session_factory = make_session_factory()
+    sender = FlakySender(unreachable=True)
+    outbox = make_outbox(session_factory, lambda: sender, backoff_seconds=60, clock=clock)
+    for number in range(3):
+        outbox.queue(f"user{number}@example.com", "Hi", "Body")
+
+    assert outbox.deliver_due() == 0
+    assert sender.closed == 1
+
+    db = session_factory()
+    rows = db.query(EmailOutboxMessage).all()
+    assert {(row.status, row.attempts) for row in rows} == {("pending", 1)}
+    assert all(row.next_attempt_at.replace(tzinfo=timezone.utc) == clock.now + timedelta(seconds=60) for row in rows)
+    db.close()
+
+
+def test_expired_claims_are_picked_up_again():
+    clock = FakeClock()
+    session_factory = make_session_factory()
+    sender = FlakySender()
+    outbox = make_outbox(session_factory, lambda: sender, claim_seconds=300, clock=clock)
+    outbox.queue("user@example.com", "Hi", "Body")
+
+    # A worker that claimed the row and then died.
+    assert len(outbox._claim_batch()) == 1
+    assert outbox.deliver_due() == 0
+
+    clock.now += timedelta(seconds=301)
+    assert outbox.deliver_due() == 1
+    assert statuses(session_factory) == ["sent"]
+
+
+def test_worker_thread_sends_queued_mail():
+    server = SMTPStandIn()
+    outbox = make_outbox(
+        make_session_factory(),
+        lambda: SMTPSender("127.0.0.1", server.port, starttls=False),
+        poll_interval=5,
+    )
+    outbox.start()
+    try:
+        outbox.queue("user@example.com", "Hi", "Body")
+        deadline = time.monotonic() + 5
+        while not server.messages and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        outbox.stop()
+        server.close()
+
+    assert len(server.messages) == 1
+    assert outbox.stats()["sent"] == 1
+
+
+class FakeAsyncSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout):
+        self.calls = []
+        FakeAsyncSMTP.instances.append(self)
+
+    async def connect(self):
+        self.calls.append("connect")
+
+    async def starttls(self):
+        self.calls.append("starttls")
+
+    async def login(self, username, password):
+        self.calls.append("login")
+
+    async def send_message(self, message):
+        self.calls.append(("send", message["To"]))
+
+    async def noop(self):
+        self.calls.append("noop")
+
+    async def quit(self):
+        self.calls.append("quit")
+
+    def close(self):
+        self.calls.append("close")
+
+
+def test_async_sender_delivers_the_outbox_on_one_connection():
+    FakeAsyncSMTP.instances = []
+    session_factory = make_session_factory()
+    outbox = make_outbox(
+        session_factory,
+        lambda: None,
+        async_sender_factory=lambda: AsyncSMTPSender(
+            "smtp.example.com", 587, username="mailer", password="secret", smtp_factory=FakeAsyncSMTP
+        ),
+        batch_size=2,
+    )
+    for number in range(3):
+        outbox.queue(f"user{number}@example.com", "Hi", "Body")
+
+    async def scenario():
+        delivered = await outbox.deliver_due_async()
+        await outbox._async_sender.close()
+        return delivered
+
+    assert asyncio.run(scenario()) == 3
+    assert len(FakeAsyncSMTP.instances) == 1
+    assert FakeAsyncSMTP.instances[0].calls == [
+        "connect",
+        "starttls",
+        "login",
+        ("send", "user0@example.com"),
+        ("send", "user1@example.com"),
+        ("send", "user2@example.com"),
+        "quit",
+    ]
+    assert statuses(session_factory) == ["sent"] * 3
@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+
+from app.core.jalali import format_jalali, format_jalali_many, gregorian_to_jalali, to_jalali, to_jalali_many
+from app.core.templates import templates
+from app.services.audit_service import format_persian_datetime
+
+
+def reference_gregorian_to_jalali(gy, gm, gd):
+    """The month-by-month loop format_persian_datetime used before the lookup table."""
+    g_days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    j_days_in_month = [31, 31, 31, 31, 31, 31, 30, 30, 30, 30, 30, 29]
+
+    gy -= 1600
+    gm -= 1
+    gd -= 1
+
+    g_day_no = 365 * gy + (gy + 3) // 4 - (gy + 99) // 100 + (gy + 399) // 400
+    for i in range(gm):
+        g_day_no += g_days_in_month[i]
+    if gm > 1 and ((gy % 4 == 0 and gy % 100 != 0) or (gy % 400 == 0)):
+        g_day_no += 1
+    g_day_no += gd
+
+    j_day_no = g_day_no - 79
+    j_np = j_day_no // 12053
+    j_day_no %= 12053
+
+    jy = 979 + 33 * j_np + 4 * (j_day_no // 1461)
+    j_day_no %= 1461
+
+    if j_day_no >= 366:
+        jy += (j_day_no - 1) // 365
+        j_day_no = (j_day_no - 1) % 365
+
+    jm = 0
+    while jm < 11 and j_day_no >= j_days_in_month[jm]:
+        j_day_no -= j_days_in_month[jm]
+        jm += 1
+
+    return jy, jm + 1, j_day_no + 1
+
+
+def test_matches_reference_for_every_day_from_1900_to_2100():
+    day = date(1900, 1, 1)
+    while day <= date(2100, 12, 31):
+        assert to_jalali(day) == reference_gregorian_to_jalali(day.year, day.month, day.day), day
+        day += timedelta(days=1)
+
+
+def test_matches_reference_outside_the_lookup_table():
+    for day in (date(1, 1, 1), date(1600, 3, 20), date(1600, 3, 21), date(2500, 3, 20), date(9999, 12, 31)):
+        assert gregorian_to_jalali(day.year, day.month, day.day) == reference_gregorian_to_jalali(
+            day.year, day.month, day.day
+        )
+
+
+def test_known_dates():
+    assert to_jalali(date(2024, 3, 20)) == (1403, 1, 1)
+    assert to_jalali(date(2025, 3, 20)) == (1403, 12, 30)
+    assert to_jalali(datetime(1979, 2, 11, 23, 59)) == (1357, 11, 22)
+
+
+def test_formatting_keeps_the_existing_output():
+    moment = datetime(2024, 3, 20, 8, 30, 5)
+
+    assert format_persian_datetime(moment) == "1403-01-01"
+    assert format_persian_datetime(moment, include_time=True) == "1403-01-01 08:30:05"
+    assert format_persian_datetime(None) == ""
+    assert format_jalali(date(2024, 3, 20), include_time=True) == "1403-01-01"
+
+
+def test_batch_conversion():
+    values = [datetime(2024, 3, 20, 1), None, date(2024, 3, 20), datetime(2025, 3, 20, 23)]
+
+    assert to_jalali_many(values) == [(1403, 1, 1), None, (1403, 1, 1), (1403, 12, 30)]
+    assert format_jalali_many(values, include_time=True, default="-") == [
+        "1403-01-01 01:00:00",
+        "-",
+        "1403-01-01",
+        "1403-12-30 23:00:00",
+    ]
+
+
+def test_jinja_filter_is_registered():
+    template = templates.env.from_string("{{ value | jalali }}|{{ value | jalali(True) }}|{{ missing | jalali }}")
+
+    assert template.render(value=datetime(2024, 3, 20, 8, 30, 5), missing=None) == (
+        "1403-01-01|1403-01-01 08:30:05|-"
+    )
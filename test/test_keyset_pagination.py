@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+
+import html
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.routing import Match
+
+from app.core.database import Base
+from app.core.deps import get_db
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_paginate
+from app.models.audit_log import AuditLog
+from app.models.student_profile import StudentProfile
+from app.models.user import User
+from app.routers import admin_ui
+from app.services import user_service
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.role  # noqa: F401
+
+
+def make_db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return testing_session_local()
+
+
+def seed_students(db, count: int):
+    for index in range(count):
+        user = User(student_number=f"4000{index:04d}", hashed_password="x", role_id=1)
+        db.add(user)
+        db.flush()
+        db.add(
+            StudentProfile(
+                user_id=user.id,
+                first_name="نام",
+                last_name="خانوادگی",
+                national_code=f"{index:010d}",
+                student_number=f"4000{index:04d}",
+                phone_number=f"0912{index:07d}",
+                gender="brother",
+            )
+        )
+    db.commit()
+
+
+def seed_logs(db, count: int):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    for index in range(count):
+        # Pairs share a timestamp so the id tiebreaker is exercised.
+        db.add(AuditLog(action="create", created_at=start + timedelta(minutes=index // 2)))
+    db.commit()
+
+
+def walk_forward(fetch):
+    pages, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        pages.append(page)
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+def test_students_keyset_pages_cover_every_row_once():
+    db = make_db_session()
+    seed_students(db, 23)
+
+    seen, cursor, totals = [], None, []
+    while True:
+        result = user_service.get_students_paginated(db, cursor=cursor, limit=10)
+        seen.extend(student.student_number for student in result["students"])
+        totals.append(result["total"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == 23
+    assert totals == [23, 23, 23]
+
+
+def test_audit_logs_descending_with_timestamp_ties_and_back_navigation():
+    db = make_db_session()
+    seed_logs(db, 15)
+
+    def fetch(cursor):
+        return keyset_paginate(
+            db.query(AuditLog),
+            (AuditLog.created_at, AuditLog.id),
+            scope="audit_logs",
+            cursor=cursor,
+            limit=4,
+            descending=True,
+        )
+
+    pages = walk_forward(fetch)
+    ids = [log.id for page in pages for log in page.items]
+
+    assert ids == list(range(15, 0, -1))
+    assert pages[0].prev_cursor is None
+    assert pages[-1].next_cursor is None
+
+    back = fetch(pages[2].prev_cursor)
+    assert [log.id for log in back.items] == [log.id for log in pages[1].items]
+    assert back.next_cursor is not None
+    first = fetch(back.prev_cursor)
+    assert [log.id for log in first.items] == [log.id for log in pages[0].items]
+    assert first.prev_cursor is None
+
+
+def test_total_is_only_counted_when_requested():
+    db = make_db_session()
+    seed_students(db, 3)
+
+    result = user_service.get_students_paginated(db, limit=2, include_total=False)
+
+    assert result["total"] is None
+    assert len(result["students"]) == 2
+
+
+def test_cursor_round_trip_and_rejection():
+    token = encode_cursor("audit_logs", "next", [datetime(2024, 1, 1, 8, 30), 7], total=40)
+    state = decode_cursor(token, "audit_logs")
+
+    assert state == {"keys": [datetime(2024, 1, 1, 8, 30), 7], "direction": "next", "total": 40}
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, "students")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor", "audit_logs")
+
+
+def make_admin_ui_client(db):
+    # Only the router: Starlette 0.19's TestClient template extension trips the app's HTTP middlewares.
+    app = FastAPI()
+    app.include_router(admin_ui.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[admin_ui.get_current_admin_from_cookie] = lambda: None
+    return TestClient(app)
+
+
+def test_student_management_page_links_to_the_next_page():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    seed_students(db, 5)
+    client = make_admin_ui_client(db)
+
+    first = client.get("/admin/students/manage?limit=3")
+    next_url = re.search(r'href="([^"]*cursor=[^"]*)">صفحه بعد', first.text)
+    second = client.get(html.unescape(next_url.group(1)))
+
+    assert first.status_code == 200
+    assert "40000002" in first.text and "40000003" not in first.text
+    assert second.status_code == 200
+    assert "40000003" in second.text and "40000004" in second.text and "40000000" not in second.text
+    assert "صفحه قبل" in second.text and "صفحه بعد" not in second.text
+
+
+def test_student_management_page_is_not_shadowed_by_the_api_router():
+    import app.main as main_module
+
+    scope = {"type": "http", "method": "GET", "path": "/admin/students/manage"}
+    route = next(route for route in main_module.app.router.routes if route.matches(scope)[0] == Match.FULL)
+
+    assert route.endpoint is admin_ui.manage_students_page
@@ -0,0 +1,191 @@
+import asyncio
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.student_profile import StudentProfile
+from app.schemas.auth import RegisterRequest
+from app.services import auth_service
+from app.services.auth_service import LoginMetrics, login_user, login_user_async, register_user
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.audit_log  # noqa: F401
+import app.models.role  # noqa: F401
+import app.models.user  # noqa: F401
+
+
+def make_db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return testing_session_local()
+
+
+def payload(**overrides):
+    values = {
+        "first_name": "علی",
+        "last_name": "رضایی",
+        "student_number": "123456789",
+        "national_code": "0123456789",
+        "phone_number": "09123456789",
+        "gender": "brother",
+        "address": "تهران",
+    }
+    values.update(overrides)
+    return RegisterRequest(**values)
+
+
+def record_statements(engine):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    return statements
+
+
+def count_bcrypt(monkeypatch):
+    calls = []
+    verify = auth_service.verify_password
+
+    def counting_verify(password, hashed_password):
+        calls.append(password)
+        return verify(password, hashed_password)
+
+    monkeypatch.setattr(auth_service, "verify_password", counting_verify)
+    return calls
+
+
+def test_first_login_is_one_select_one_update_and_one_bcrypt(monkeypatch):
+    db = make_db_session()
+    register_user(db, payload())
+    db.expire_all()
+    bcrypt_calls = count_bcrypt(monkeypatch)
+    statements = record_statements(db.get_bind())
+
+    result = login_user(db, "0123456789", "123456789")
+
+    assert result.authenticated and result.is_active and result.first_authentication
+    assert result.role_name == "user"
+    assert result.claims == {
+        "sub": "123456789",
+        "user_id": result.claims["user_id"],
+        "national_code": "0123456789",
+        "role": "user",
+    }
+    assert result.token()["token_type"] == "bearer"
+    assert statements == ["SELECT", "UPDATE"]
+    assert len(bcrypt_calls) == 1
+    assert db.query(StudentProfile).one().has_authenticated is True
+
+
+def test_repeat_login_skips_the_write(monkeypatch):
+    db = make_db_session()
+    register_user(db, payload())
+    assert login_user(db, "0123456789", "123456789").first_authentication
+    db.expire_all()
+    statements = record_statements(db.get_bind())
+
+    result = login_user(db, "0123456789", "123456789")
+
+    assert result.authenticated and not result.first_authentication
+    assert statements == ["SELECT"]
+
+
+def test_conditional_update_only_flips_the_flag_once():
+    db = make_db_session()
+    user = register_user(db, payload())
+    user_id = user.id
+
+    first = db.execute(auth_service._mark_authenticated_statement(user_id)).rowcount
+    second = db.execute(auth_service._mark_authenticated_statement(user_id)).rowcount
+    db.commit()
+
+    assert (first, second) == (1, 0)
+
+
+def test_wrong_password_or_unknown_code_is_rejected_without_writes(monkeypatch):
+    db = make_db_session()
+    register_user(db, payload())
+    db.expire_all()
+    bcrypt_calls = count_bcrypt(monkeypatch)
+    statements = record_statements(db.get_bind())
+
+    assert not login_user(db, "0123456789", "000000000").authenticated
+    assert not login_user(db, "9999999999", "123456789").authenticated
+
+    assert statements == ["SELECT", "SELECT"]
+    assert len(bcrypt_calls) == 1
+    assert db.query(StudentProfile).one().has_authenticated is False
+
+
+def test_inactive_user_is_not_flagged():
+    db = make_db_session()
+    user = register_user(db, payload())
+    user.is_active = False
+    db.commit()
+
+    result = login_user(db, "0123456789", "123456789")
+
+    assert result.authenticated and not result.is_active
+    assert not result.first_authentication
+    assert db.query(StudentProfile).one().has_authenticated is False
+
+
+def test_mark_authenticated_false_leaves_the_flag_alone():
+    db = make_db_session()
+    register_user(db, payload())
+
+    result = login_user(db, "0123456789", "123456789", mark_authenticated=False)
+
+    assert result.authenticated and not result.first_authentication
+    assert db.query(StudentProfile).one().has_authenticated is False
+
+
+def test_login_user_async_marks_first_authentication_once():
+    async def scenario():
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        try:
+            async with session_factory() as db:
+                await auth_service.register_user_async(db, payload())
+                first = await login_user_async(db, "0123456789", "123456789")
+                second = await login_user_async(db, "0123456789", "123456789")
+                rejected = await login_user_async(db, "0123456789", "000000000")
+                profile = await db.get(StudentProfile, first.user.profile.id)
+                return first, second, rejected, profile.has_authenticated
+        finally:
+            await engine.dispose()
+
+    first, second, rejected, has_authenticated = asyncio.run(scenario())
+
+    assert first.first_authentication and not second.first_authentication
+    assert second.authenticated and not rejected.authenticated
+    assert has_authenticated is True
+
+
+def test_login_metrics_time_each_stage():
+    ticks = iter([0.0, 0.004, 0.010, 0.030])
+    metrics = LoginMetrics(clock=lambda: next(ticks))
+
+    metrics.count("attempts")
+    lookup_started = metrics.now()
+    metrics.record("lookup", lookup_started)
+    verify_started = metrics.now()
+    metrics.record("verify", verify_started)
+    stats = metrics.stats()
+
+    assert stats["attempts"] == 1
+    assert stats["stages"]["lookup"] == {"calls": 1, "total_ms": 4.0, "max_ms": 4.0, "avg_ms": 4.0}
+    assert stats["stages"]["verify"]["total_ms"] == 20.0
+    assert stats["stages"]["rehash"]["calls"] == 0
@@ -0,0 +1,57 @@
+import asyncio
+import dataclasses
+
+import pytest
+
+from app.core import validators
+from app.core.validators import national_code_checksum_ok, national_code_checksum_rejections, validate_national_code
+from app.services import auth_service
+
+
+class ForbiddenSession:
+    """Fails the test if the login pipeline touches the database."""
+
+    def execute(self, *args, **kwargs):
+        raise AssertionError("the database must not be queried for an invalid national code")
+
+
+@pytest.fixture
+def checksum_enabled(monkeypatch):
+    monkeypatch.setattr(validators, "settings", dataclasses.replace(validators.settings, national_code_checksum=True))
+
+
+def test_checksum_accepts_valid_codes():
+    # Remainder >= 2 (check digit is 11 - remainder) and remainder < 2 (check digit is the remainder).
+    assert national_code_checksum_ok("0499370899")
+    assert national_code_checksum_ok("1234567891")
+    assert national_code_checksum_ok("0010350829")
+
+
+def test_checksum_rejects_bad_and_repeated_codes():
+    assert not national_code_checksum_ok("0499370898")
+    assert not national_code_checksum_ok("1234567890")
+    assert not national_code_checksum_ok("123456789")
+    for digit in "0123456789":
+        assert not national_code_checksum_ok(digit * 10)
+
+
+def test_validate_national_code_checks_the_digit_only_when_enabled(checksum_enabled):
+    assert validate_national_code("۰۴۹۹۳۷۰۸۹۹") == "0499370899"
+    with pytest.raises(ValueError, match="کد ملی معتبر نیست"):
+        validate_national_code("0499370898")
+
+
+def test_validate_national_code_keeps_length_only_check_by_default():
+    assert validate_national_code("0499370898") == "0499370898"
+
+
+def test_login_short_circuits_before_the_database(checksum_enabled):
+    before = national_code_checksum_rejections()
+
+    assert auth_service.authenticate_user(ForbiddenSession(), "1111111111", "400123456") is None
+
+    async def attempt():
+        return await auth_service.authenticate_user_async(ForbiddenSession(), "0499370898", "400123456")
+
+    assert asyncio.run(attempt()) is None
+    assert national_code_checksum_rejections() == before + 2
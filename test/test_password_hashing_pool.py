@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.core.password_pool import PasswordHashingBusyError, PasswordHashingPool, bcrypt_check, bcrypt_hash
+from app.core.security import ahash_password, averify_password, verify_password
+
+
+def test_async_hash_is_compatible_with_sync_verify():
+    hashed = asyncio.run(ahash_password("123456789"))
+
+    assert verify_password("123456789", hashed)
+    assert asyncio.run(averify_password("123456789", hashed))
+    assert not asyncio.run(averify_password("987654321", hashed))
+
+
+def test_async_verify_rejects_oversized_password_without_hashing():
+    hashed = asyncio.run(ahash_password("secret"))
+
+    assert not asyncio.run(averify_password("x" * 100, hashed))
+
+
+def test_pool_tracks_completed_jobs_and_queue_depth():
+    pool = PasswordHashingPool(max_workers=1)
+
+    async def run_many():
+        hashed = await pool.run(bcrypt_hash, b"secret")
+        results = await asyncio.gather(*(pool.run(bcrypt_check, b"secret", hashed.encode()) for _ in range(3)))
+        return results
+
+    try:
+        assert asyncio.run(run_many()) == [True, True, True]
+        stats = pool.stats()
+    finally:
+        pool.shutdown()
+
+    assert stats["completed"] == 4
+    assert stats["in_flight"] == 0
+    assert stats["peak_queue_depth"] == 2
+
+
+def test_pool_rejects_work_beyond_max_pending():
+    pool = PasswordHashingPool(max_workers=1, max_pending=1)
+
+    async def run_many():
+        return await asyncio.gather(
+            pool.run(bcrypt_hash, b"first"),
+            pool.run(bcrypt_hash, b"second"),
+            return_exceptions=True,
+        )
+
+    try:
+        results = asyncio.run(run_many())
+    finally:
+        pool.shutdown()
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], PasswordHashingBusyError)
+    assert pool.stats()["rejected"] == 1
+
+
+def test_unknown_executor_kind_is_rejected():
+    with pytest.raises(ValueError):
+        PasswordHashingPool(executor_kind="fiber")
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.password_policy import PasswordPolicy, bcrypt_rounds, calibrate_rounds, parse_role_rounds
+from app.core.state_store import SQLiteStateStore
+from app.core.password_pool import bcrypt_hash
+from app.core.security import password_policy
+from app.models.role import Role
+from app.models.student_profile import StudentProfile
+from app.models.user import User
+from app.services.auth_service import authenticate_user, authenticate_user_async
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.audit_log  # noqa: F401
+
+
+def make_db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return testing_session_local()
+
+
+def seed_student(db, rounds=4):
+    role = Role(name="user", description="کاربر")
+    db.add(role)
+    db.flush()
+    user = User(student_number="400123456", hashed_password=bcrypt_hash(b"400123456", rounds), role_id=role.id)
+    db.add(user)
+    db.flush()
+    db.add(
+        StudentProfile(
+            user_id=user.id,
+            first_name="علی",
+            last_name="رضایی",
+            national_code="0012345678",
+            student_number="400123456",
+            phone_number="09123456789",
+            gender="brother",
+        )
+    )
+    db.commit()
+    return user
+
+
+def test_policy_applies_role_overrides():
+    policy = PasswordPolicy(default_rounds=11, role_rounds={"admin": 13})
+
+    assert policy.rounds_for("admin") == 13
+    assert policy.rounds_for("user") == 11
+    assert policy.rounds_for(None) == 11
+    assert policy.needs_rehash(bcrypt_hash(b"x", 4), "user")
+    assert not policy.needs_rehash("not-a-bcrypt-hash", "user")
+
+
+def test_rounds_are_read_from_the_hash():
+    assert bcrypt_rounds(bcrypt_hash(b"x", 5)) == 5
+    assert bcrypt_rounds("plain") is None
+
+
+def test_parse_role_rounds():
+    assert parse_role_rounds(("admin:13", " user : 11")) == {"admin": 13, "user": 11}
+    with pytest.raises(ValueError):
+        parse_role_rounds(("admin",))
+
+
+def test_calibration_extrapolates_from_the_floor():
+    measured = []
+
+    def measure(rounds):
+        measured.append(rounds)
+        return 50.0
+
+    assert calibrate_rounds(250, floor=10, ceiling=16, measure=measure) == 12
+    assert calibrate_rounds(10_000, floor=10, ceiling=13, measure=measure) == 13
+    assert calibrate_rounds(1, floor=10, ceiling=16, measure=measure) == 10
+    assert measured == [10, 10, 10]
+
+
+
+def test_workers_share_the_first_calibrated_cost(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    stores = [SQLiteStateStore(path), SQLiteStateStore(path)]
+    fast, slow = PasswordPolicy(default_rounds=12), PasswordPolicy(default_rounds=12)
+    try:
+        fast.calibrate(250, floor=10, ceiling=16, store=stores[0], measure=lambda rounds: 60.0)
+        slow.calibrate(250, floor=10, ceiling=16, store=stores[1], measure=lambda rounds: 70.0)
+    finally:
+        for store in stores:
+            store.close()
+
+    assert fast.default_rounds == slow.default_rounds == 12
+
+def test_login_rehashes_to_the_policy_cost(monkeypatch):
+    monkeypatch.setattr(password_policy, "role_rounds", {"user": 5})
+    db = make_db_session()
+    seed_student(db, rounds=4)
+
+    user = authenticate_user(db, "0012345678", "400123456")
+
+    assert bcrypt_rounds(user.hashed_password) == 5
+    db.expire_all()
+    stored = db.query(User).filter(User.student_number == "400123456").one()
+    assert bcrypt_rounds(stored.hashed_password) == 5
+    assert authenticate_user(db, "0012345678", "400123456") is not None
+
+
+def test_failed_login_does_not_rehash(monkeypatch):
+    monkeypatch.setattr(password_policy, "role_rounds", {"user": 5})
+    db = make_db_session()
+    original = seed_student(db, rounds=4).hashed_password
+
+    assert authenticate_user(db, "0012345678", "999999999") is None
+    assert db.query(User).one().hashed_password == original
+
+
+def test_async_login_rehashes_to_the_policy_cost(monkeypatch):
+    monkeypatch.setattr(password_policy, "role_rounds", {"user": 5})
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    async def scenario():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with factory() as session:
+            await session.run_sync(seed_student)
+        async with factory() as session:
+            await authenticate_user_async(session, "0012345678", "400123456")
+        async with factory() as session:
+            stored = await session.run_sync(lambda db: db.query(User).one().hashed_password)
+        await engine.dispose()
+        return stored
+
+    assert bcrypt_rounds(asyncio.run(scenario())) == 5
@@ -0,0 +1,167 @@
+import asyncio
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.principal_cache import PrincipalCache, load_principal, load_principal_async, principal_cache
+from app.models.role import Role
+from app.models.student_profile import StudentProfile
+from app.models.user import User
+from app.schemas.student import AdminStudentUpdate
+from app.services import user_service
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.audit_log  # noqa: F401
+
+
+def make_db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return testing_session_local()
+
+
+def seed_user(db, student_number="400123456", national_code="0012345678"):
+    role = Role(name="admin", description="مدیر")
+    db.add(role)
+    db.flush()
+    user = User(student_number=student_number, hashed_password="x", role_id=role.id)
+    db.add(user)
+    db.flush()
+    db.add(
+        StudentProfile(
+            user_id=user.id,
+            first_name="علی",
+            last_name="رضایی",
+            national_code=national_code,
+            student_number=student_number,
+            phone_number="09123456789",
+            gender="brother",
+        )
+    )
+    db.commit()
+    return user.id
+
+
+def count_user_queries(db):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def test_cache_expires_entries_after_ttl():
+    now = [100.0]
+    cache = PrincipalCache(ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", "user-a", cache.version("a"))
+
+    assert cache.get("a") == "user-a"
+    now[0] += 11
+    assert cache.get("a") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PrincipalCache(ttl_seconds=60, max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, key, cache.version(key))
+    cache.get("a")
+    cache.put("c", "c", cache.version("c"))
+
+    assert cache.get("a") == "a"
+    assert cache.get("b") is None
+    assert cache.get("c") == "c"
+
+
+def test_stale_fill_after_invalidation_is_not_cached():
+    cache = PrincipalCache(ttl_seconds=60)
+    version = cache.version("a")
+    cache.invalidate("a")
+
+    assert cache.put("a", "stale", version) is False
+    assert cache.get("a") is None
+
+
+def test_disabled_cache_never_stores():
+    cache = PrincipalCache(ttl_seconds=0)
+
+    assert cache.put("a", "user-a", cache.version("a")) is False
+    assert cache.get("a") is None
+
+
+def test_load_principal_skips_the_query_on_a_warm_cache():
+    db = make_db_session()
+    seed_user(db)
+    principal_cache.clear()
+    queries = count_user_queries(db)
+
+    first = load_principal(db, "400123456")
+    second = load_principal(db, "400123456")
+
+    assert first is second
+    assert len(queries) == 1
+    assert first not in db
+    assert first.role.name == "admin"
+    assert first.profile.national_code == "0012345678"
+    principal_cache.clear()
+
+
+def test_admin_update_invalidates_old_and_new_student_numbers():
+    db = make_db_session()
+    user_id = seed_user(db)
+    principal_cache.clear()
+    cached = load_principal(db, "400123456")
+
+    profile = db.query(StudentProfile).filter(StudentProfile.user_id == user_id).first()
+    user_service.admin_update_student(
+        db,
+        profile.id,
+        AdminStudentUpdate(
+            first_name="علی",
+            last_name="محمدی",
+            student_number="400999999",
+            national_code="0012345678",
+            phone_number="09123456789",
+            gender="brother",
+        ),
+    )
+
+    assert principal_cache.get("400123456") is None
+    refreshed = load_principal(db, "400999999")
+    assert refreshed is not cached
+    assert refreshed.profile.last_name == "محمدی"
+    principal_cache.clear()
+
+
+def test_load_principal_async_uses_the_same_cache():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    async def scenario():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with factory() as session:
+            await session.run_sync(seed_user)
+        principal_cache.clear()
+        async with factory() as session:
+            first = await load_principal_async(session, "400123456")
+        async with factory() as session:
+            second = await load_principal_async(session, "400123456")
+        await engine.dispose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert first.profile.first_name == "علی"
+    principal_cache.clear()
@@ -1,7 +1,6 @@
 import asyncio
 import os
 
-from fastapi import BackgroundTasks
 from starlette.requests import Request
 
 os.environ.setdefault("ADMIN_LOGIN_PASSWORD", "test-admin")
@@ -37,7 +36,6 @@ def test_submit_public_registration_rejects_invalid_email():
     response = asyncio.run(
         public_registration.submit_public_registration(
             request=request,
-            background_tasks=BackgroundTasks(),
             full_name="John Doe",
             email="invalid-email",
             password="Strong!123",
@@ -53,7 +51,6 @@ def test_submit_public_registration_redirects_on_success():
     response = asyncio.run(
         public_registration.submit_public_registration(
             request=request,
-            background_tasks=BackgroundTasks(),
             full_name="John Doe",
             email="john@example.com",
             password="Strong!123",
@@ -0,0 +1,135 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.core.rate_limit import RateLimitRule, TokenBucketLimiter, TrustedProxies, default_rules, parse_rate
+from app.core.state_store import InMemoryStateStore, SQLiteStateStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_rate():
+    assert parse_rate("20/60") == (20, 60.0)
+    for invalid in ("20", "0/60", "x/60", "5/0"):
+        with pytest.raises(ValueError):
+            parse_rate(invalid)
+
+
+def test_rule_matching():
+    login = RateLimitRule("login", 5, 60, paths=("/auth/login",))
+    public = RateLimitRule("public_forms", 5, 60, prefixes=("/public/",))
+
+    assert login.matches("POST", "/auth/login/")
+    assert not login.matches("GET", "/auth/login")
+    assert not login.matches("POST", "/auth/login-help")
+    assert public.matches("POST", "/public/contact")
+    assert not public.matches("POST", "/publicity")
+
+
+def test_every_password_checking_route_is_in_the_login_group():
+    login = next(rule for rule in default_rules() if rule.name == "login")
+
+    for path in ("/auth/login", "/ui-auth/login", "/admin/student-login", "/admin/login", "/ui-auth/admin/login"):
+        assert login.matches("POST", path), path
+
+
+def test_bucket_allows_a_burst_then_refills():
+    clock = FakeClock()
+    rule = RateLimitRule("login", 3, 30, paths=("/auth/login",))
+    limiter = TokenBucketLimiter(InMemoryStateStore(), [rule], clock=clock)
+
+    assert [limiter.take(rule, "1.2.3.4")[0] for _ in range(3)] == [True, True, True]
+    assert limiter.take(rule, "1.2.3.4") == (False, 10)
+    # Other clients have their own bucket.
+    assert limiter.take(rule, "5.6.7.8")[0]
+
+    clock.now += 10
+    assert limiter.take(rule, "1.2.3.4")[0]
+    assert not limiter.take(rule, "1.2.3.4")[0]
+    assert limiter.stats()["login"]["rejected"] == 2
+
+
+def test_sqlite_backend_shares_buckets_between_workers(tmp_path):
+    clock = FakeClock()
+    rule = RateLimitRule("register", 2, 60, paths=("/auth/register",))
+    path = str(tmp_path / "rate-limit.sqlite3")
+    first = TokenBucketLimiter(SQLiteStateStore(path), [rule], clock=clock)
+    second = TokenBucketLimiter(SQLiteStateStore(path), [rule], clock=clock)
+    try:
+        assert first.take(rule, "1.2.3.4")[0]
+        assert second.take(rule, "1.2.3.4")[0]
+        assert not first.take(rule, "1.2.3.4")[0]
+        assert not second.take(rule, "1.2.3.4")[0]
+    finally:
+        first.store.close()
+        second.store.close()
+
+
+def test_forwarded_for_is_ignored_unless_the_peer_is_a_trusted_proxy():
+    proxies = TrustedProxies(["10.0.0.0/8", "proxy.internal"])
+
+    assert proxies.client_for("198.51.100.7", "203.0.113.9") == "203.0.113.9"
+    assert proxies.client_for(None, None) == "unknown"
+    assert proxies.client_for("198.51.100.7", "10.1.2.3") == "198.51.100.7"
+    assert proxies.client_for("198.51.100.7", "proxy.internal") == "198.51.100.7"
+    # Only the hop the trusted proxy appended counts; a spoofed prefix does not.
+    assert proxies.client_for("1.1.1.1, 198.51.100.7, 10.0.0.2", "10.1.2.3") == "198.51.100.7"
+    assert proxies.client_for("not-an-ip", "10.1.2.3") == "10.1.2.3"
+
+
+def test_middleware_rejects_before_the_route_runs(monkeypatch):
+    rule = RateLimitRule("register", 1, 60, paths=("/auth/register",))
+    limiter = TokenBucketLimiter(InMemoryStateStore(), [rule], trusted_proxies=["testclient"])
+    monkeypatch.setattr(main_module, "rate_limiter", limiter)
+    client = TestClient(main_module.app)
+    headers = {"x-forwarded-for": "198.51.100.7"}
+
+    first = client.post("/auth/register", json={}, headers=headers)
+    second = client.post("/auth/register", json={}, headers=headers)
+    other_client = client.post("/auth/register", json={}, headers={"x-forwarded-for": "198.51.100.8"})
+
+    assert first.status_code == 422
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "60"
+    assert other_client.status_code != 429
+    assert client.get("/auth/register", headers=headers).status_code != 429
+
+
+def test_spoofed_forwarded_for_from_an_untrusted_peer_shares_one_bucket(monkeypatch):
+    rule = RateLimitRule("register", 1, 60, paths=("/auth/register",))
+    monkeypatch.setattr(main_module, "rate_limiter", TokenBucketLimiter(InMemoryStateStore(), [rule]))
+    client = TestClient(main_module.app)
+
+    first = client.post("/auth/register", json={}, headers={"x-forwarded-for": "198.51.100.7"})
+    spoofed = client.post("/auth/register", json={}, headers={"x-forwarded-for": "198.51.100.8"})
+    no_header = client.post("/auth/register", json={})
+
+    assert first.status_code == 422
+    assert spoofed.status_code == 429
+    assert no_header.status_code == 429
+
+
+def test_middleware_fails_open_while_the_sqlite_store_is_locked(monkeypatch, tmp_path):
+    path = str(tmp_path / "rate-limit.sqlite3")
+    rule = RateLimitRule("register", 1, 60, paths=("/auth/register",))
+    limiter = TokenBucketLimiter(SQLiteStateStore(path, busy_timeout_ms=50), [rule])
+    monkeypatch.setattr(main_module, "rate_limiter", limiter)
+    client = TestClient(main_module.app)
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        response = client.post("/auth/register", json={})
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+        limiter.store.close()
+
+    assert response.status_code == 422
@@ -0,0 +1,38 @@
+from dataclasses import replace
+
+from jinja2 import FileSystemBytecodeCache
+
+from app.core.templates import create_templates, precompile_templates, templates
+from app.routers import admin_auth_ui, admin_dashboard, admin_ui, public_registration, ui_auth, ui_dashboard
+
+
+def test_routers_share_one_template_environment():
+    for module in (admin_auth_ui, admin_dashboard, public_registration, ui_auth, ui_dashboard):
+        assert module.templates is templates
+    assert admin_ui.get_templates() is templates
+
+
+def test_environment_uses_bytecode_cache_without_auto_reload(tmp_path, monkeypatch):
+    from app.core import templates as templates_module
+
+    monkeypatch.setattr(
+        templates_module,
+        "settings",
+        replace(templates_module.settings, template_bytecode_cache_dir=str(tmp_path)),
+    )
+    fresh = create_templates()
+
+    assert fresh.env.auto_reload is False
+    assert isinstance(fresh.env.bytecode_cache, FileSystemBytecodeCache)
+
+    compiled = precompile_templates(fresh)
+    assert compiled == len(fresh.env.list_templates(extensions=["html"]))
+    assert list(tmp_path.glob("basij-*.cache"))
+
+
+def test_precompile_fills_the_in_memory_cache():
+    fresh = create_templates()
+    precompile_templates(fresh)
+
+    assert len(fresh.env.cache) >= 1
+    assert fresh.get_template("base.html") is fresh.get_template("base.html")
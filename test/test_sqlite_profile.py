@@ -0,0 +1,67 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.database import (
+    async_engine_options,
+    configure_sqlite_engine,
+    describe_database,
+    engine_options,
+    sqlite_pragmas,
+)
+
+
+def test_sqlite_profile_is_applied_to_new_connections(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'profile.db'}"
+    test_engine = create_engine(database_url, **engine_options(database_url))
+    configure_sqlite_engine(test_engine)
+
+    with test_engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+        synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+        busy_timeout = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        temp_store = connection.exec_driver_sql("PRAGMA temp_store").scalar()
+
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == sqlite_pragmas()["busy_timeout"]
+    assert temp_store == 2  # MEMORY
+    test_engine.dispose()
+
+
+def test_file_database_uses_configured_queue_pool():
+    options = engine_options("sqlite:///./basij.db")
+
+    assert options["connect_args"] == {"check_same_thread": False}
+    assert options["pool_size"] >= 1
+    assert "pool_size" not in engine_options("sqlite:///:memory:")
+
+
+def test_async_file_database_accepts_pool_options(tmp_path):
+    database_url = f"sqlite+aiosqlite:///{tmp_path / 'async.db'}"
+    async_engine = create_async_engine(database_url, **async_engine_options(database_url))
+
+    async def probe():
+        async with async_engine.connect() as connection:
+            value = (await connection.exec_driver_sql("SELECT 1")).scalar()
+        await async_engine.dispose()
+        return value
+
+    assert isinstance(async_engine.pool, AsyncAdaptedQueuePool)
+    assert asyncio.run(probe()) == 1
+
+
+def test_non_sqlite_url_does_not_receive_sqlite_connect_args():
+    options = engine_options("postgresql://user:secret@db/app")
+
+    assert "connect_args" not in options
+    assert options["pool_pre_ping"] is True
+
+
+def test_describe_database_reports_active_pragmas():
+    info = describe_database()
+
+    assert info["dialect"] == "sqlite"
+    assert set(info["pragmas"]) == set(sqlite_pragmas())
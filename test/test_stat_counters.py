@@ -0,0 +1,134 @@
+import asyncio
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.audit_log import AuditLog
+from app.models.noor_program import QuranClassRequest
+from app.models.role import Role
+from app.models.stat_counter import StatCounter
+from app.models.student_profile import StudentProfile
+from app.models.user import User
+from app.services import stat_counters
+from app.services.audit_sink import AuditSink
+from app.services.stat_counters import ensure_stat_counters, read_counters, rebuild_counters
+from app.services.user_service import admin_delete_student
+
+
+def make_session_factory():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def make_db_session():
+    return make_session_factory()()
+
+
+def seed_student(db, student_number="400123456"):
+    role = db.query(Role).filter(Role.name == "user").first() or Role(name="user", description="کاربر")
+    db.add(role)
+    db.flush()
+    user = User(student_number=student_number, hashed_password="x", role_id=role.id)
+    db.add(user)
+    db.flush()
+    profile = StudentProfile(
+        user_id=user.id,
+        first_name="علی",
+        last_name="رضایی",
+        national_code=student_number[:10].rjust(10, "0"),
+        student_number=student_number,
+        phone_number="0912" + student_number[-7:],
+        gender="brother",
+    )
+    db.add(profile)
+    db.commit()
+    return profile
+
+
+def test_inserts_and_deletes_move_the_counters():
+    db = make_db_session()
+    seed_student(db, "400000001")
+    profile = seed_student(db, "400000002")
+    db.add_all(
+        [
+            QuranClassRequest(first_name="محمد", last_name="کریمی", level=2),
+            AuditLog(action="delete", entity="quran_scholar"),
+            AuditLog(action="login", entity="user"),
+        ]
+    )
+    db.commit()
+
+    admin_delete_student(db, profile.id)
+
+    counters = read_counters(db)
+    assert counters[stat_counters.USERS] == 1
+    assert counters[stat_counters.QURAN_CLASS_REQUESTS] == 1
+    assert counters[stat_counters.AUDIT_LOGS] == 2
+    assert counters[stat_counters.audit_action_counter("delete")] == 1
+    assert counters[stat_counters.AUDIT_DELETED_NOOR_EVENTS] == 1
+    recounted = rebuild_counters(db)
+    assert counters == {name: value for name, value in recounted.items() if value}
+
+
+def test_rolled_back_writes_leave_counters_untouched():
+    db = make_db_session()
+    seed_student(db)
+    db.add(QuranClassRequest(first_name="محمد", last_name="کریمی", level=2))
+    db.flush()
+    db.rollback()
+
+    assert stat_counters.QURAN_CLASS_REQUESTS not in read_counters(db)
+    assert read_counters(db)[stat_counters.USERS] == 1
+
+
+def test_audit_sink_batches_are_counted():
+    factory = make_session_factory()
+    sink = AuditSink(factory, batch_size=10, flush_interval=60)
+    for _ in range(3):
+        sink.enqueue({"action": "create", "entity": "light_path_student"})
+
+    assert sink.flush() == 3
+    counters = read_counters(factory())
+    assert counters[stat_counters.AUDIT_LOGS] == 3
+    assert counters[stat_counters.audit_action_counter("create")] == 3
+
+
+def test_async_sessions_are_counted():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    async def scenario():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with factory() as session:
+            session.add(QuranClassRequest(first_name="محمد", last_name="کریمی", level=2))
+            await session.commit()
+            counters = await session.run_sync(read_counters)
+        await engine.dispose()
+        return counters
+
+    assert asyncio.run(scenario())[stat_counters.QURAN_CLASS_REQUESTS] == 1
+
+
+def test_rebuild_repairs_drift_and_seeding_only_runs_once():
+    db = make_db_session()
+    seed_student(db)
+    db.execute(update(StatCounter).where(StatCounter.name == stat_counters.USERS).values(value=42))
+    db.commit()
+
+    assert ensure_stat_counters(db) is False
+    assert read_counters(db)[stat_counters.USERS] == 42
+    rebuild_counters(db)
+    assert read_counters(db)[stat_counters.USERS] == 1
@@ -0,0 +1,190 @@
+import sqlite3
+import threading
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.state_store import InMemoryStateStore, SQLiteStateStore, create_state_store
+from app.routers import admin_access
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    stores = []
+
+    def factory(clock):
+        if request.param == "memory":
+            store = InMemoryStateStore(clock=clock)
+        else:
+            store = SQLiteStateStore(str(tmp_path / "state.sqlite3"), clock=clock)
+        stores.append(store)
+        return store
+
+    yield factory
+    for store in stores:
+        store.close()
+
+
+def test_entries_expire_after_ttl(make_store):
+    now = [1000.0]
+    store = make_store(lambda: now[0])
+    store.set("sessions", "abc", {"user": "admin"}, ttl_seconds=10)
+    store.set("sessions", "unread", True, ttl_seconds=10)
+
+    assert store.get("sessions", "abc") == {"user": "admin"}
+    assert store.get("other", "abc") is None
+    now[0] += 11
+    assert store.sweep() == 2
+    assert store.get("sessions", "abc") is None
+
+
+def test_get_or_set_keeps_the_first_value(make_store):
+    store = make_store(lambda: 1000.0)
+
+    assert store.get_or_set("csrf", "client", "first", ttl_seconds=60) == "first"
+    assert store.get_or_set("csrf", "client", "second", ttl_seconds=60) == "first"
+    store.delete("csrf", "client")
+    assert store.get_or_set("csrf", "client", "third", ttl_seconds=60) == "third"
+
+
+def test_incr_keeps_the_original_window(make_store):
+    now = [1000.0]
+    store = make_store(lambda: now[0])
+
+    assert store.incr("failures", "1.2.3.4", ttl_seconds=60) == 1
+    now[0] += 50
+    assert store.incr("failures", "1.2.3.4", ttl_seconds=60) == 2
+    now[0] += 11
+    assert store.incr("failures", "1.2.3.4", ttl_seconds=60) == 1
+
+
+def test_sqlite_store_is_shared_and_atomic_across_instances(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    workers = [SQLiteStateStore(path), SQLiteStateStore(path)]
+
+    def hammer(store):
+        for _ in range(50):
+            store.incr("failures", "client", ttl_seconds=60)
+
+    threads = [threading.Thread(target=hammer, args=(store,)) for store in workers for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert workers[0].get("failures", "client") == 200
+    workers[0].set("sessions", "token", True, ttl_seconds=60)
+    assert workers[1].get("sessions", "token") is True
+    for store in workers:
+        store.close()
+
+
+def test_sqlite_reads_do_not_wait_for_the_write_lock(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    writer = SQLiteStateStore(path)
+    reader = SQLiteStateStore(path, busy_timeout_ms=50)
+    writer.set("sessions", "token", True, ttl_seconds=60)
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        assert reader.get("sessions", "token") is True
+        assert reader.get_or_set("sessions", "token", False, ttl_seconds=60) is True
+        assert reader.count("sessions") == 1
+        with pytest.raises(sqlite3.OperationalError):
+            reader.incr("failures", "client", ttl_seconds=60)
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+        writer.close()
+        reader.close()
+
+
+def test_memory_store_bounds_each_namespace():
+    store = InMemoryStateStore(max_entries=2)
+    for key in ("a", "b", "c"):
+        store.set("csrf", key, key, ttl_seconds=60)
+
+    assert store.get("csrf", "a") is None
+    assert store.get("csrf", "c") == "c"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_state_store("redis")
+
+
+def test_admin_interface_session_round_trip():
+    app = FastAPI()
+
+    @app.get("/guarded")
+    def guarded(request: Request):
+        redirect = admin_access.ensure_admin_interface_auth(request)
+        return {"allowed": redirect is None}
+
+    client = TestClient(app)
+    token = admin_access.create_admin_session()
+
+    assert client.get("/guarded", cookies={admin_access.ADMIN_AUTH_COOKIE: token}).json() == {"allowed": True}
+    assert client.get("/guarded", cookies={admin_access.ADMIN_AUTH_COOKIE: "forged"}).json() == {"allowed": False}
+    admin_access.state_store.delete(admin_access.SESSIONS_NAMESPACE, token)
+    assert client.get("/guarded", cookies={admin_access.ADMIN_AUTH_COOKIE: token}).json() == {"allowed": False}
+
+
+def test_namespace_limit_evicts_the_stalest_session(make_store):
+    now = [1000.0]
+    store = make_store(lambda: now[0])
+    store.limit_namespace("sessions", 2)
+    for key in ("a", "b", "c"):
+        store.set("sessions", key, True, ttl_seconds=60)
+        now[0] += 1
+
+    assert store.get("sessions", "a") is None
+    assert store.count("sessions") == 2
+    store.set("csrf", "a", "token", ttl_seconds=60)
+    assert store.count("csrf") == 1
+
+
+def test_count_ignores_expired_entries(make_store):
+    now = [1000.0]
+    store = make_store(lambda: now[0])
+    store.set("sessions", "short", True, ttl_seconds=5)
+    store.set("sessions", "long", True, ttl_seconds=60)
+
+    now[0] += 10
+    assert store.count("sessions") == 1
+
+
+def test_memory_store_reads_refresh_recency():
+    store = InMemoryStateStore()
+    store.limit_namespace("sessions", 2)
+    store.set("sessions", "a", True, ttl_seconds=60)
+    store.set("sessions", "b", True, ttl_seconds=60)
+    store.get("sessions", "a")
+    store.set("sessions", "c", True, ttl_seconds=60)
+
+    assert store.get("sessions", "a") is True
+    assert store.get("sessions", "b") is None
+
+
+def test_memory_store_purges_expired_entries_in_batches():
+    now = [1000.0]
+    store = InMemoryStateStore(purge_batch_size=10, clock=lambda: now[0])
+    for index in range(25):
+        store.set("sessions", str(index), True, ttl_seconds=5)
+
+    now[0] += 10
+    store.set("sessions", "fresh", True, ttl_seconds=60)
+    assert store.stats()["namespaces"]["sessions"] == 16
+    assert store.sweep() == 15
+    assert store.stats()["heap_size"] == 1
+
+
+def test_admin_session_metrics_report_live_sessions():
+    before = admin_access.admin_session_metrics()["live_sessions"]
+    token = admin_access.create_admin_session()
+
+    metrics = admin_access.admin_session_metrics()
+    assert metrics["live_sessions"] == before + 1
+    assert metrics["max_sessions"] == admin_access.settings.admin_max_sessions
+    admin_access.state_store.delete(admin_access.SESSIONS_NAMESPACE, token)
@@ -0,0 +1,161 @@
+import asyncio
+import io
+import threading
+
+import bcrypt
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.role import Role
+from app.models.student_profile import StudentProfile
+from app.models.user import User
+from app.services import student_import
+from app.services.student_import import (
+    StudentImportError,
+    hash_initial_passwords,
+    import_students,
+    iter_import_rows,
+)
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.audit_log  # noqa: F401
+
+HEADER = "first_name,last_name,student_number,national_code,phone_number,gender,address\n"
+
+
+def make_db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return testing_session_local()
+
+
+def csv_rows(body: str):
+    return iter_import_rows(io.BytesIO((HEADER + body).encode("utf-8")), "csv")
+
+
+def test_csv_import_creates_valid_rows_and_reports_the_rest():
+    db = make_db_session()
+    role = Role(name="user", description="کاربر")
+    db.add(role)
+    db.flush()
+    existing = User(student_number="400000009", hashed_password="x", role_id=role.id)
+    db.add(existing)
+    db.commit()
+
+    report = import_students(
+        db,
+        csv_rows(
+            "علی,رضایی,400000001,0012345678,09120000001,brother,\n"
+            "زهرا,احمدی,۴۰۰۰۰۰۰۰۲,0012345679,09120000002,sister,کرمان\n"
+            "بد,ردیف,12,0012345680,09120000003,brother,\n"
+            "تکرار,فایل,400000003,0012345678,09120000004,brother,\n"
+            "\n"
+            "موجود,قبلی,400000009,0012345681,09120000005,sister,\n"
+        ),
+        batch_size=1,
+        hash_workers=1,
+    ).as_dict()
+
+    assert report["total_rows"] == 5
+    assert report["created"] == 2
+    assert [error["row"] for error in report["errors"]] == [4, 5, 7]
+    assert report["errors"][0]["errors"] == ["شماره دانشجویی باید 9 رقم باشد"]
+    assert report["errors"][1]["errors"] == ["کد ملی در فایل تکراری است"]
+    assert report["errors"][2]["errors"] == ["شماره دانشجویی قبلاً ثبت شده است"]
+
+    created = db.query(User).filter(User.student_number == "400000002").one()
+    assert created.profile.address == "کرمان"
+    assert bcrypt.checkpw(b"400000002", created.hashed_password.encode("utf-8"))
+    assert db.query(StudentProfile).count() == 2
+
+
+def test_xlsx_numeric_cells_keep_leading_zeros():
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["نام", "نام خانوادگی", "شماره دانشجویی", "کد ملی", "شماره تماس", "جنسیت"])
+    sheet.append(["علی", "رضایی", 400000001, 12345678, 9120000001, "brother"])
+    upload = io.BytesIO()
+    workbook.save(upload)
+    upload.seek(0)
+
+    db = make_db_session()
+    report = import_students(db, iter_import_rows(upload, "xlsx"), hash_workers=1)
+
+    assert report.created == 1
+    profile = db.query(StudentProfile).one()
+    assert profile.national_code == "0012345678"
+    assert profile.phone_number == "09120000001"
+
+
+def test_persian_gender_labels_and_digits_are_normalized_in_bulk():
+    db = make_db_session()
+
+    report = import_students(
+        db,
+        csv_rows(
+            "علی,رضایی,۴۰۰۰۰۰۰۱۱,۰۰۱۲۳۴۵۶۷۸,۰۹۱۲۰۰۰۰۰۱۱,برادر,\n"
+            "زهرا,احمدی,400000012,0012345679,09120000012,خواهر,\n"
+            "بد,ردیف,12,0012345680,09120000013,نامشخص,\n"
+        ),
+        hash_workers=1,
+    ).as_dict()
+
+    assert report["created"] == 2
+    assert report["errors"][0]["errors"] == [
+        "شماره دانشجویی باید 9 رقم باشد",
+        "gender must be 'sister' or 'brother'",
+    ]
+    genders = dict(db.query(StudentProfile.student_number, StudentProfile.gender))
+    assert genders == {"400000011": "brother", "400000012": "sister"}
+
+
+def test_missing_columns_are_rejected():
+    with pytest.raises(StudentImportError):
+        list(iter_import_rows(io.BytesIO(b"first_name,last_name\n"), "csv"))
+
+
+def test_row_limit_is_enforced():
+    db = make_db_session()
+    rows = csv_rows("علی,رضایی,400000001,0012345678,09120000001,brother,\n" * 3)
+
+    with pytest.raises(StudentImportError):
+        import_students(db, rows, max_rows=2, hash_workers=1)
+
+
+def test_process_pool_hashes_match_inline_hashing():
+    hashes = hash_initial_passwords(["400000001", "400000002", "400000003"], workers=2)
+
+    assert len(hashes) == 3
+    assert bcrypt.checkpw(b"400000003", hashes[2].encode("utf-8"))
+
+
+def test_import_upload_async_runs_on_the_import_thread(monkeypatch):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    upload = io.BytesIO((HEADER + "علی,رضایی,400000001,0012345678,09120000001,brother,\n").encode("utf-8"))
+    threads = []
+    original = student_import.import_students
+
+    def recording_import(db, rows, **kwargs):
+        threads.append(threading.current_thread().name)
+        return original(db, rows, hash_workers=1, **kwargs)
+
+    monkeypatch.setattr(student_import, "import_students", recording_import)
+    try:
+        report = asyncio.run(student_import.import_upload_async(upload, "csv", session_factory))
+    finally:
+        student_import.shutdown_import_executor()
+
+    assert report.created == 1
+    assert threads[0].startswith("student-import")
+    assert session_factory().query(StudentProfile).count() == 1
@@ -0,0 +1,103 @@
+from dataclasses import replace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.schemas.auth import RegisterRequest
+from app.services import auth_service
+from app.services.auth_service import register_user
+from app.services.uniqueness import registration_probe, student_probe
+
+# Ensure SQLAlchemy relationships are fully registered for tests
+import app.models.audit_log  # noqa: F401
+
+
+def make_db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return testing_session_local()
+
+
+def payload(**overrides):
+    values = {
+        "first_name": "علی",
+        "last_name": "رضایی",
+        "student_number": "123456789",
+        "national_code": "0123456789",
+        "phone_number": "09123456789",
+        "gender": "brother",
+    }
+    values.update(overrides)
+    return RegisterRequest(**values)
+
+
+def capture_statements(db, prefix="SELECT"):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(prefix):
+            statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def test_probe_reports_every_conflict_in_one_query():
+    db = make_db_session()
+    user = register_user(db, payload())
+    statements = capture_statements(db)
+
+    conflicts = student_probe.conflicts(
+        db,
+        student_number="123456789",
+        national_code="0123456789",
+        phone_number="09123456789",
+    )
+
+    assert conflicts == ["student_number", "national_code", "phone_number"]
+    assert len(statements) == 1
+    assert student_probe.conflicts(
+        db,
+        student_number="123456789",
+        national_code="0123456789",
+        phone_number="09123456789",
+        exclude_user_id=user.id,
+    ) == []
+
+
+def test_callers_keep_their_own_messages():
+    db = make_db_session()
+    register_user(db, payload())
+
+    with pytest.raises(HTTPException) as registration_error:
+        registration_probe.ensure_unique(db, phone_number="09123456789")
+    with pytest.raises(HTTPException) as student_error:
+        student_probe.ensure_unique(db, phone_number="09123456789")
+
+    assert registration_error.value.detail == "این شماره تلفن قبلاً ثبت شده است"
+    assert student_error.value.detail == "شماره تماس قبلاً ثبت شده است"
+
+
+def test_optimistic_registration_translates_integrity_errors(monkeypatch):
+    monkeypatch.setattr(
+        auth_service,
+        "settings",
+        replace(auth_service.settings, registration_uniqueness_mode="optimistic"),
+    )
+    db = make_db_session()
+    register_user(db, payload())
+    statements = capture_statements(db, prefix="")
+
+    with pytest.raises(HTTPException) as error:
+        register_user(db, payload(student_number="987654321", phone_number="09111111111"))
+
+    assert error.value.status_code == 400
+    assert error.value.detail == "این کد ملی قبلاً ثبت شده است"
+    # The probe only runs after the insert has already failed.
+    first_insert = next(index for index, statement in enumerate(statements) if statement.startswith("INSERT"))
+    probes = [index for index, statement in enumerate(statements) if "UNION ALL" in statement]
+    assert len(probes) == 1 and probes[0] > first_insert
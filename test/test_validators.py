@@ -0,0 +1,132 @@
+import re
+import unicodedata
+
+import pytest
+
+from app.core import validators
+from app.core.validators import validate_many
+
+_PERSIAN_DIGITS = "۰۱۲۳۴۵۶۷۸۹"
+_ARABIC_DIGITS = "٠١٢٣٤٥٦٧٨٩"
+_DIGIT_TRANSLATION = str.maketrans(
+    {**{ord(d): str(i) for i, d in enumerate(_PERSIAN_DIGITS)},
+     **{ord(d): str(i) for i, d in enumerate(_ARABIC_DIGITS)}}
+)
+
+
+# The validators as they were before the fast path, kept as the behavioural reference.
+def legacy_normalize_digits(value):
+    if value is None:
+        return None
+    text_value = value if isinstance(value, str) else str(value)
+    normalized = unicodedata.normalize("NFKC", text_value).translate(_DIGIT_TRANSLATION).strip()
+    return re.sub(r"[\s\u200c\u200f\-_()]+", "", normalized)
+
+
+def legacy_fixed_digits(value, *, length, field_name, invalid_message=None):
+    text_value = None if value is None else (value if isinstance(value, str) else str(value))
+    normalized = legacy_normalize_digits(text_value) if text_value is not None else None
+    if normalized is None or normalized == "":
+        raise ValueError(f"{field_name} الزامی است")
+    if re.fullmatch(r"\d+", normalized) and len(normalized) != length:
+        raise ValueError(f"{field_name} باید {length} رقم باشد")
+    if not re.fullmatch(rf"\d{{{length}}}", normalized):
+        if invalid_message:
+            raise ValueError(invalid_message)
+        persian_length = str(length).translate(str.maketrans("0123456789", _PERSIAN_DIGITS))
+        raise ValueError(f"{field_name} باید {persian_length} رقم باشد")
+    return normalized
+
+
+def legacy_student_number(value):
+    if value is None:
+        return value
+    return legacy_fixed_digits(value, length=9, field_name="شماره دانشجویی")
+
+
+def legacy_national_code(value):
+    if value is None:
+        return value
+    return legacy_fixed_digits(value, length=10, field_name="کد ملی", invalid_message="کد ملی معتبر نیست")
+
+
+def legacy_phone_number(value):
+    if value is None:
+        return value
+    text_value = value if isinstance(value, str) else str(value)
+    value = unicodedata.normalize("NFKC", text_value).translate(_DIGIT_TRANSLATION)
+    if not re.fullmatch(r"\d{11}", value):
+        raise ValueError("شماره تماس باید ۱۱ رقم باشد")
+    return value
+
+
+CORPUS = [
+    None,
+    "",
+    "   ",
+    "0012345678",
+    " 0012345678 ",
+    "001-234-5678",
+    "(001) 234_5678",
+    "۰۰۱۲۳۴۵۶۷۸",
+    "٠٠١٢٣٤٥٦٧٨",
+    "۰۰۱ ۲۳۴\u200c۵۶۷۸",
+    "００１２３４５６７８",
+    "४००१२३४५६",
+    "400123456",
+    "40012345",
+    "4001234567",
+    "40012345a",
+    "abcdefghi",
+    "09123456789",
+    "0912 345 6789",
+    "۰۹۱۲۳۴۵۶۷۸۹",
+    "0912345678\u200f",
+    "+989123456789",
+    "\x1c400123456\x1f",
+    400123456,
+    12345678901,
+    123,
+]
+
+
+def outcome(function, value):
+    try:
+        return "ok", function(value)
+    except ValueError as exc:
+        return "error", str(exc)
+
+
+@pytest.mark.parametrize(
+    "current, legacy",
+    [
+        (validators.normalize_digits, legacy_normalize_digits),
+        (validators.validate_student_number, legacy_student_number),
+        (validators.validate_national_code, legacy_national_code),
+        (validators.validate_phone_number, legacy_phone_number),
+    ],
+)
+def test_results_and_messages_match_the_previous_implementation(current, legacy):
+    for value in CORPUS:
+        assert outcome(current, value) == outcome(legacy, value), value
+
+
+def test_validate_many_reports_errors_per_row():
+    rows = [
+        {"student_number": "۴۰۰۱۲۳۴۵۶", "national_code": "0012345678", "gender": "خواهر", "first_name": "سارا"},
+        {"student_number": "4001", "national_code": "00123x5678", "gender": "خواهر"},
+        {"phone_number": "0912"},
+    ]
+
+    results = validate_many(rows)
+
+    assert results[0] == (
+        {"student_number": "400123456", "national_code": "0012345678", "gender": "sister", "first_name": "سارا"},
+        {},
+    )
+    assert results[1][1] == {
+        "student_number": "شماره دانشجویی باید 9 رقم باشد",
+        "national_code": "کد ملی معتبر نیست",
+    }
+    assert results[1][0]["gender"] == "sister"
+    assert results[2][1] == {"phone_number": "شماره تماس باید ۱۱ رقم باشد"}